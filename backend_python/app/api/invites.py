@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.models.invite import Invite
+from app.models.user import User
+from app.schemas.invite import (
+    InviteBulkCreate, InviteBulkResponse, InviteRedeem, InviteRedeemResponse, InviteStatusResponse,
+)
+from app.services.invites import InviteUnavailable, create_invites, normalize_code, redeem_invite
+from app.utils.serialization import json_response
+from datetime import datetime, timedelta
+
+router = APIRouter()
+
+REDEEM_ERRORS = {
+    "not found": status.HTTP_404_NOT_FOUND,
+    "already used": status.HTTP_409_CONFLICT,
+    "expired": status.HTTP_410_GONE,
+}
+
+@router.post("/bulk", response_model=InviteBulkResponse, status_code=status.HTTP_201_CREATED)
+async def create_invites_bulk(body: InviteBulkCreate, db: AsyncSession = Depends(get_async_db)):
+    """Generate invite codes for a cohort in one transaction"""
+    emails = body.emails if body.emails is not None else [body.email] * body.count
+    expires_at = datetime.utcnow() + timedelta(days=body.expires_in_days)
+    invites = await create_invites(db, emails, body.role, expires_at)
+    await db.commit()
+    
+    return json_response({
+        "created": len(invites),
+        "role": body.role,
+        "expires_at": expires_at,
+        "invites": [{"email": email, "code": code} for email, code in invites],
+    }, status_code=status.HTTP_201_CREATED)
+
+@router.post("/redeem", response_model=InviteRedeemResponse)
+async def redeem(body: InviteRedeem, db: AsyncSession = Depends(get_async_db)):
+    """Claim an invite code for a registered user"""
+    user_id = await db.scalar(select(User.id).where(User.wallet_address == body.wallet_address))
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    try:
+        invite = await redeem_invite(db, body.code, user_id)
+    except InviteUnavailable as exc:
+        await db.rollback()
+        raise HTTPException(
+            status_code=REDEEM_ERRORS[exc.reason],
+            detail=str(exc)
+        )
+    await db.commit()
+    
+    return {"code": normalize_code(body.code), "email": invite.email, "role": invite.role, "used_at": invite.used_at}
+
+@router.get("/{code}", response_model=InviteStatusResponse)
+async def get_invite_status(code: str, db: AsyncSession = Depends(get_async_db)):
+    """Whether an invite code is valid, used or expired"""
+    code = normalize_code(code)
+    invite = (await db.execute(
+        select(Invite.role, Invite.is_used, Invite.expires_at).where(Invite.code == code)
+    )).first()
+    if invite is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Invite not found"
+        )
+    if invite.is_used:
+        invite_status = "used"
+    elif invite.expires_at <= datetime.utcnow():
+        invite_status = "expired"
+    else:
+        invite_status = "valid"
+    return {"code": code, "role": invite.role, "status": invite_status, "expires_at": invite.expires_at}
@@ -0,0 +1,205 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.broker import EVICTED, Broker, Subscription, chat_topic, get_broker
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_async_db
+from app.models.message import ConversationMember, Message, conversation_key
+from app.models.user import User
+from app.schemas.message import (
+    ConversationResponse, MessageCreate, MessageReadResult, MessageResponse, MessageUnreadResponse,
+    conversation_row_to_dict, message_row_to_dict, select_conversation_response, select_message_response,
+)
+from app.services.chat import ChatError, chat_writer
+from app.services.messaging import conversation_unread, mark_conversation_read, send_messages
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.serialization import dumps, json_response
+from typing import List, Optional
+import asyncio
+import orjson
+
+router = APIRouter()
+
+def _decode_id_cursor(cursor: str) -> int:
+    try:
+        last_id, = decode_cursor(cursor, int)
+        return last_id
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+@router.post("/", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
+async def send_message(message_data: MessageCreate, db: AsyncSession = Depends(get_async_db)):
+    """Send a message, update both participants' inboxes and push it to the receiver's sockets"""
+    if message_data.sender_id == message_data.receiver_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot message yourself"
+        )
+    found = (await db.scalars(
+        select(User.id).where(
+            User.id.in_([message_data.sender_id, message_data.receiver_id]),
+            User.is_active == True
+        )
+    )).all()
+    if len(found) != 2:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Sender or receiver not found"
+        )
+    
+    message, = await db.run_sync(send_messages, [message_data.model_dump()])
+    await db.commit()
+    get_broker().publish(chat_topic(message["receiver_id"]), {"type": "message", "message": message})
+    return json_response(message, status_code=status.HTTP_201_CREATED)
+
+@router.get("/inbox", response_model=List[ConversationResponse])
+async def get_inbox(
+    user_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """A user's conversations, most recently active first
+
+    Each entry carries the other participant, the latest message and the
+    unread count, all from one query. The `X-Next-Cursor` header carries the
+    next cursor.
+    """
+    query = select_conversation_response().where(ConversationMember.user_id == user_id)
+    if cursor:
+        query = query.where(ConversationMember.last_message_id < _decode_id_cursor(cursor))
+    
+    rows = (await db.execute(
+        query.order_by(ConversationMember.last_message_id.desc()).limit(limit + 1)
+    )).all()
+    headers = {}
+    conversations = [conversation_row_to_dict(row) for row in rows[:limit]]
+    if len(rows) > limit:
+        headers["X-Next-Cursor"] = encode_cursor(conversations[-1]["last_message"]["id"])
+    
+    return json_response(conversations, headers=headers)
+
+@router.get("/unread-count", response_model=MessageUnreadResponse)
+async def get_unread_count(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    """A user's unread messages across all conversations"""
+    unread = await db.scalar(
+        select(func.coalesce(func.sum(ConversationMember.unread_count), 0))
+        .where(ConversationMember.user_id == user_id)
+    )
+    return {"user_id": user_id, "unread": unread}
+
+@router.get("/conversations/{other_user_id}", response_model=List[MessageResponse])
+async def get_conversation(
+    other_user_id: int,
+    user_id: int,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Messages between two users, newest first
+
+    Pages walk backwards through the thread; the `X-Next-Cursor` header
+    carries the cursor for older messages.
+    """
+    query = select_message_response().where(
+        Message.conversation_key == conversation_key(user_id, other_user_id)
+    )
+    if cursor:
+        query = query.where(Message.id < _decode_id_cursor(cursor))
+    
+    rows = (await db.execute(query.order_by(Message.id.desc()).limit(limit + 1))).all()
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].id)
+    
+    return json_response([message_row_to_dict(row) for row in rows], headers=headers)
+
+@router.post("/conversations/{other_user_id}/read", response_model=MessageReadResult)
+async def mark_conversation_as_read(
+    other_user_id: int,
+    user_id: int,
+    up_to_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Mark messages received from `other_user_id` read (all, or up to `up_to_id`)"""
+    key = conversation_key(user_id, other_user_id)
+    changed = await db.run_sync(mark_conversation_read, user_id, key, up_to_id)
+    unread = await db.run_sync(conversation_unread, user_id, key)
+    await db.commit()
+    return {"count": changed, "unread": unread}
+
+@router.get("/ws/stats")
+async def get_chat_stats(broker: Broker = Depends(get_broker)):
+    """Broker and batched-writer counters for the chat sockets"""
+    return {"broker": broker.stats(), "writer": chat_writer.stats()}
+
+async def _pump(websocket: WebSocket, subscription: Subscription):
+    """Send queued frames to the socket; the only task writing to it"""
+    while True:
+        frame = await subscription.get()
+        if frame is EVICTED:
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+            return
+        await websocket.send_text(dumps(frame).decode())
+
+@router.websocket("/ws")
+async def chat_socket(websocket: WebSocket, user_id: int, broker: Broker = Depends(get_broker)):
+    """Live chat for `user_id`
+
+    Client frames: `{"type": "send", "to": <user id>, "content": "...", "client_id": "..."}`
+    and `{"type": "ping"}`. Server frames: `ack` (with the stored message and
+    the client_id), `message` (a message addressed to this user), `error` and
+    `pong`. Outgoing frames share a bounded buffer of CHAT_SEND_BUFFER; a
+    client that lets it fill up is disconnected with code 1013 and should
+    reconnect and reload the thread.
+    """
+    async with AsyncSessionLocal() as db:
+        found = await db.scalar(select(User.id).where(User.id == user_id, User.is_active == True))
+    if found is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    subscription = broker.subscribe(chat_topic(user_id), settings.CHAT_SEND_BUFFER)
+    pump = asyncio.create_task(_pump(websocket, subscription))
+    
+    def reply(frame: dict):
+        if not subscription.offer(frame):
+            broker.evict(subscription)
+    
+    try:
+        while not pump.done():
+            try:
+                frame = orjson.loads(await websocket.receive_text())
+            except orjson.JSONDecodeError:
+                reply({"type": "error", "detail": "Invalid JSON"})
+                continue
+            kind = frame.get("type") if isinstance(frame, dict) else None
+            if kind == "ping":
+                reply({"type": "pong"})
+            elif kind == "send":
+                client_id = frame.get("client_id")
+                receiver_id, content = frame.get("to"), frame.get("content")
+                if (
+                    not isinstance(receiver_id, int) or receiver_id == user_id
+                    or not isinstance(content, str) or not 0 < len(content) <= 5000
+                ):
+                    reply({"type": "error", "client_id": client_id, "detail": "Invalid message"})
+                    continue
+                try:
+                    message = await chat_writer.submit(user_id, receiver_id, content)
+                except ChatError as exc:
+                    reply({"type": "error", "client_id": client_id, "detail": str(exc)})
+                    continue
+                reply({"type": "ack", "client_id": client_id, "message": message})
+            else:
+                reply({"type": "error", "detail": "Unknown frame type"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        broker.unsubscribe(subscription)
+        pump.cancel()
@@ -0,0 +1,161 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.broker import EVICTED, Broker, get_broker, notification_topic
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_async_db
+from app.models.notification import Notification, NotificationCounter
+from app.schemas.notification import (
+    NotificationBroadcast, NotificationMarkRead, NotificationResponse, NotificationWriteResult,
+    UnreadCountResponse, notification_row_to_dict, select_notification_response,
+)
+from app.services.notifications import UnknownUsers, mark_read, notify_active_users, notify_role, unread_count
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.serialization import dumps, json_response
+from typing import List, Optional
+
+router = APIRouter()
+
+# Missed notifications replayed to a reconnecting stream (Last-Event-ID)
+MAX_REPLAY = 100
+SSE_RETRY_MS = 3000
+
+def _sse_event(notification: dict) -> str:
+    return f"id: {notification['id']}\nevent: notification\ndata: {dumps(notification).decode()}\n\n"
+
+@router.get("/", response_model=List[NotificationResponse])
+async def list_notifications(
+    user_id: int,
+    unread_only: bool = False,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List a user's notifications, newest first
+
+    Pages are keyed on id; the `X-Next-Cursor` header carries the next cursor.
+    """
+    query = select_notification_response().where(Notification.user_id == user_id)
+    if unread_only:
+        query = query.where(Notification.is_read == False)
+    if cursor:
+        try:
+            last_id, = decode_cursor(cursor, int)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        query = query.where(Notification.id < last_id)
+    
+    rows = (await db.execute(query.order_by(Notification.id.desc()).limit(limit + 1))).all()
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].id)
+    
+    return json_response([notification_row_to_dict(row) for row in rows], headers=headers)
+
+@router.get("/stream")
+async def stream_notifications(
+    user_id: int,
+    last_event_id: Optional[str] = Header(None),
+    broker: Broker = Depends(get_broker)
+):
+    """Server-Sent Events stream of a user's new notifications
+
+    On reconnect the browser sends `Last-Event-ID` and up to MAX_REPLAY missed
+    notifications are replayed first. A comment line is sent every
+    SSE_HEARTBEAT_INTERVAL seconds to keep proxies from closing idle streams.
+    The stream ends if the client falls too far behind (see app.core.broker).
+    """
+    try:
+        last_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_id = None
+    
+    async def events():
+        # Subscribe before reading the backlog so nothing committed in between is lost
+        subscription = broker.subscribe(notification_topic(user_id))
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            sent_id = last_id or 0
+            if last_id is not None:
+                # Short-lived session: streams must not hold a pooled connection
+                async with AsyncSessionLocal() as db:
+                    rows = (await db.execute(
+                        select_notification_response()
+                        .where(Notification.user_id == user_id, Notification.id > last_id)
+                        .order_by(Notification.id)
+                        .limit(MAX_REPLAY)
+                    )).all()
+                for row in rows:
+                    notification = notification_row_to_dict(row)
+                    sent_id = notification["id"]
+                    yield _sse_event(notification)
+            while True:
+                message = await subscription.get(settings.SSE_HEARTBEAT_INTERVAL)
+                if message is EVICTED:
+                    break
+                if message is None:
+                    yield ": keepalive\n\n"
+                elif message["id"] > sent_id:
+                    sent_id = message["id"]
+                    yield _sse_event(message)
+        finally:
+            broker.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/stream/stats")
+async def get_stream_stats(broker: Broker = Depends(get_broker)):
+    """Open streams and broker delivery counters"""
+    return broker.stats()
+
+@router.get("/unread-count", response_model=UnreadCountResponse)
+async def get_unread_count(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    """A user's unread notification count (primary-key lookup on the maintained counter)"""
+    counter = await db.get(NotificationCounter, user_id)
+    return {"user_id": user_id, "unread": counter.unread_count if counter else 0}
+
+@router.post("/read", response_model=NotificationWriteResult)
+async def mark_notifications_read(body: NotificationMarkRead, db: AsyncSession = Depends(get_async_db)):
+    """Mark the given notifications (or all of the user's) as read"""
+    changed = await db.run_sync(mark_read, body.user_id, body.ids)
+    unread = await db.run_sync(unread_count, body.user_id)
+    await db.commit()
+    return {"count": changed, "unread": unread}
+
+@router.post("/read-all", response_model=NotificationWriteResult)
+async def mark_all_notifications_read(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Mark all of a user's notifications as read"""
+    changed = await db.run_sync(mark_read, user_id)
+    unread = await db.run_sync(unread_count, user_id)
+    await db.commit()
+    return {"count": changed, "unread": unread}
+
+@router.post("/broadcast", response_model=NotificationWriteResult, status_code=status.HTTP_201_CREATED)
+async def broadcast_notification(body: NotificationBroadcast, db: AsyncSession = Depends(get_async_db)):
+    """Send one notification to a list of users or to every active user of a role"""
+    if body.user_ids is not None:
+        # Deactivated users are skipped; `count` is what was sent
+        try:
+            count = await db.run_sync(
+                notify_active_users, body.user_ids, body.type, body.title, body.message, body.data
+            )
+        except UnknownUsers as exc:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown user in user_ids: {exc.user_ids[:20]}"
+            )
+    else:
+        count = await db.run_sync(
+            notify_role, body.role, body.type, body.title, body.message, body.data
+        )
+    await db.commit()
+    return json_response({"count": count}, status_code=status.HTTP_201_CREATED)
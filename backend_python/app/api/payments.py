@@ -1,8 +1,137 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.models.payment import MentorPaymentTotals, Payment, PaymentStatus, SessionPaymentTotals, UserPaymentTotals
+from app.models.session import Session
+from app.models.user import User
+from app.schemas.payment import (
+    PaymentCreate, PaymentResponse, PaymentStatusUpdate, PaymentTotalsResponse,
+    payment_row_to_dict, payment_to_dict, select_payment_response,
+)
+from app.services.ledger import InvalidTransition, TOTAL_COLUMNS, record_payment, transition_payment
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.serialization import json_response
+from typing import List, Optional
 
 router = APIRouter()
 
-@router.get("/")
-async def get_payments():
-    """Get all payments (placeholder)"""
-    return {"message": "Payments endpoint - to be implemented"}
+def _totals_to_dict(totals) -> dict:
+    if totals is None:
+        return PaymentTotalsResponse().model_dump()
+    return {column: getattr(totals, column) for column in TOTAL_COLUMNS + ("updated_at",)}
+
+@router.get("/", response_model=List[PaymentResponse])
+async def list_payments(
+    user_id: int,
+    status_filter: Optional[PaymentStatus] = Query(None, alias="status"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List a user's payments, newest first
+
+    Pages are keyed on id; the `X-Next-Cursor` header carries the next cursor.
+    """
+    query = select_payment_response().where(Payment.user_id == user_id)
+    if status_filter:
+        query = query.where(Payment.status == status_filter)
+    if cursor:
+        try:
+            last_id, = decode_cursor(cursor, int)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        query = query.where(Payment.id < last_id)
+    
+    rows = (await db.execute(query.order_by(Payment.id.desc()).limit(limit + 1))).all()
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].id)
+    
+    return json_response([payment_row_to_dict(row) for row in rows], headers=headers)
+
+@router.post("/", response_model=PaymentResponse, status_code=status.HTTP_201_CREATED)
+async def create_payment(payment_data: PaymentCreate, db: AsyncSession = Depends(get_async_db)):
+    """Record a payment and add it to the user and session totals"""
+    if payment_data.status not in (PaymentStatus.PENDING, PaymentStatus.PROCESSING, PaymentStatus.COMPLETED):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="New payments must be PENDING, PROCESSING or COMPLETED"
+        )
+    if await db.get(User, payment_data.user_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User not found"
+        )
+    if payment_data.session_id is not None and await db.get(Session, payment_data.session_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Session not found"
+        )
+    
+    db_payment = Payment(**payment_data.model_dump(), refunded=False)
+    db.add(db_payment)
+    await db.flush()
+    await record_payment(db, db_payment)
+    await db.commit()
+    await db.refresh(db_payment)
+    
+    return json_response(payment_to_dict(db_payment), status_code=status.HTTP_201_CREATED)
+
+@router.get("/summary/users/{user_id}", response_model=PaymentTotalsResponse)
+async def get_user_payment_totals(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Pending, completed and refunded totals for a user"""
+    return json_response(_totals_to_dict(await db.get(UserPaymentTotals, user_id)))
+
+@router.get("/summary/mentors/{user_id}", response_model=PaymentTotalsResponse)
+async def get_mentor_payment_totals(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Pending, earned (completed) and refunded totals for the sessions a user mentored"""
+    return json_response(_totals_to_dict(await db.get(MentorPaymentTotals, user_id)))
+
+@router.get("/summary/sessions/{session_id}", response_model=PaymentTotalsResponse)
+async def get_session_payment_totals(session_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Pending, completed and refunded totals for a session"""
+    return json_response(_totals_to_dict(await db.get(SessionPaymentTotals, session_id)))
+
+@router.get("/{payment_id}", response_model=PaymentResponse)
+async def get_payment(payment_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get a payment by id"""
+    row = (await db.execute(select_payment_response().where(Payment.id == payment_id))).first()
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Payment not found"
+        )
+    return json_response(payment_row_to_dict(row))
+
+@router.patch("/{payment_id}/status", response_model=PaymentResponse)
+async def update_payment_status(
+    payment_id: int,
+    status_data: PaymentStatusUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Move a payment to a new status, updating the totals in the same transaction"""
+    db_payment = await db.get(Payment, payment_id)
+    if not db_payment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Payment not found"
+        )
+    
+    changes = status_data.model_dump(exclude={"status"}, exclude_none=True)
+    try:
+        await transition_payment(db, db_payment, status_data.status, **changes)
+    except InvalidTransition as exc:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(exc)
+        )
+    await db.commit()
+    await db.refresh(db_payment)
+    
+    return json_response(payment_to_dict(db_payment))
@@ -1,8 +1,239 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import and_, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.models.session import MAX_SESSION_MINUTES, Session, SessionStatus
+from app.models.user import User, UserRole
+from app.schemas.session import (
+    FreeSlot, SessionCreate, SessionResponse, SessionUpdate, SlotCheckResponse,
+    select_session_response, session_row_to_dict, to_naive_utc,
+)
+from app.services.availability import BLOCKING_STATUSES, find_conflict, free_slots, lock_mentor_schedule
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.serialization import json_response
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+import uuid
 
 router = APIRouter()
 
-@router.get("/")
-async def get_sessions():
-    """Get all sessions (placeholder)"""
-    return {"message": "Sessions endpoint - to be implemented"}
+# Longest window served by the free-slot listing
+MAX_AVAILABILITY_DAYS = 31
+
+async def _get_session_response(db: AsyncSession, session_id: str):
+    row = (await db.execute(
+        select_session_response().where(Session.session_id == session_id)
+    )).first()
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    return session_row_to_dict(row)
+
+@router.get("/", response_model=List[SessionResponse])
+async def list_sessions(
+    wallet_address: str,
+    role: Optional[str] = Query(None, pattern="^(mentor|mentee)$"),
+    status_filter: Optional[SessionStatus] = Query(None, alias="status"),
+    upcoming: Optional[bool] = None,
+    order: Optional[str] = Query(None, pattern="^(asc|desc)$"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List a participant's scheduled sessions
+
+    `role` restricts to sessions where the wallet is the mentor or the mentee
+    (both by default). `upcoming=true` lists sessions from now on, oldest
+    first; `upcoming=false` lists past sessions, newest first. Pages are keyed
+    on (scheduled_at, id); the `X-Next-Cursor` header carries the next cursor.
+    With `role` and `status` set, a page is one range scan of the
+    (address, status, scheduled_at) index.
+    """
+    if role == "mentor":
+        participant = Session.mentor_address == wallet_address
+    elif role == "mentee":
+        participant = Session.mentee_address == wallet_address
+    else:
+        participant = or_(
+            Session.mentor_address == wallet_address,
+            Session.mentee_address == wallet_address
+        )
+    query = select_session_response().where(participant, Session.scheduled_at.isnot(None))
+    
+    if status_filter:
+        query = query.where(Session.status == status_filter)
+    
+    now = datetime.utcnow()
+    if upcoming is True:
+        query = query.where(Session.scheduled_at >= now)
+    elif upcoming is False:
+        query = query.where(Session.scheduled_at < now)
+    
+    descending = order == "desc" if order else upcoming is not True
+    if cursor:
+        try:
+            last_scheduled_at, last_id = decode_cursor(cursor, str, int)
+            last_scheduled_at = datetime.fromisoformat(last_scheduled_at)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        if last_scheduled_at.tzinfo is not None:
+            # scheduled_at is stored as naive UTC
+            last_scheduled_at = last_scheduled_at.astimezone(timezone.utc).replace(tzinfo=None)
+        if descending:
+            query = query.where(or_(
+                Session.scheduled_at < last_scheduled_at,
+                and_(Session.scheduled_at == last_scheduled_at, Session.id < last_id)
+            ))
+        else:
+            query = query.where(or_(
+                Session.scheduled_at > last_scheduled_at,
+                and_(Session.scheduled_at == last_scheduled_at, Session.id > last_id)
+            ))
+    
+    if descending:
+        query = query.order_by(Session.scheduled_at.desc(), Session.id.desc())
+    else:
+        query = query.order_by(Session.scheduled_at, Session.id)
+    
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].scheduled_at.isoformat(), rows[-1].id)
+    
+    return json_response([session_row_to_dict(row) for row in rows], headers=headers)
+
+@router.post("/", response_model=SessionResponse, status_code=status.HTTP_201_CREATED)
+async def create_session(session_data: SessionCreate, db: AsyncSession = Depends(get_async_db)):
+    """Book a session between a mentor and a mentee"""
+    participants = {
+        wallet_address: role
+        for wallet_address, role in (await db.execute(
+            select(User.wallet_address, User.role).where(
+                User.wallet_address.in_([session_data.mentor_address, session_data.mentee_address]),
+                User.is_active == True
+            )
+        )).all()
+    }
+    
+    if participants.get(session_data.mentor_address) != UserRole.MENTOR:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Mentor not found"
+        )
+    if session_data.mentee_address not in participants or session_data.mentee_address == session_data.mentor_address:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Mentee not found"
+        )
+    
+    await lock_mentor_schedule(db, session_data.mentor_address)
+    conflict = await find_conflict(
+        db, session_data.mentor_address, session_data.scheduled_at, session_data.duration
+    )
+    if conflict:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Mentor is already booked at that time (session {conflict})"
+        )
+    
+    db_session = Session(
+        session_id=session_data.session_id or f"SESS_{uuid.uuid4().hex[:12].upper()}",
+        mentor_address=session_data.mentor_address,
+        mentee_address=session_data.mentee_address,
+        price=session_data.price,
+        status=SessionStatus.PENDING,
+        scheduled_at=session_data.scheduled_at,
+        duration=session_data.duration,
+        notes=session_data.notes
+    )
+    db.add(db_session)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Session with this session_id already exists"
+        )
+    
+    return json_response(await _get_session_response(db, db_session.session_id), status_code=status.HTTP_201_CREATED)
+
+@router.get("/availability/{mentor_address}", response_model=List[FreeSlot])
+async def get_mentor_availability(
+    mentor_address: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    duration: int = Query(60, ge=15, le=MAX_SESSION_MINUTES),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Free intervals of at least `duration` minutes in [start, end)
+
+    Defaults to the next 7 days.
+    """
+    start = to_naive_utc(start) or datetime.utcnow()
+    end = to_naive_utc(end) or start + timedelta(days=7)
+    if end <= start or end - start > timedelta(days=MAX_AVAILABILITY_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"end must be after start and at most {MAX_AVAILABILITY_DAYS} days later"
+        )
+    
+    slots = await free_slots(db, mentor_address, start, end, min_minutes=duration)
+    return json_response([{"start": slot_start, "end": slot_end} for slot_start, slot_end in slots])
+
+@router.get("/availability/{mentor_address}/check", response_model=SlotCheckResponse)
+async def check_mentor_slot(
+    mentor_address: str,
+    start: datetime,
+    duration: int = Query(60, ge=15, le=MAX_SESSION_MINUTES),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Whether a mentor is free for `duration` minutes from `start`"""
+    conflict = await find_conflict(db, mentor_address, to_naive_utc(start), duration)
+    return {"available": conflict is None, "conflicting_session_id": conflict}
+
+@router.get("/{session_id}", response_model=SessionResponse)
+async def get_session(session_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Get a session by its session_id"""
+    return json_response(await _get_session_response(db, session_id))
+
+@router.patch("/{session_id}", response_model=SessionResponse)
+async def update_session(session_id: str, session_data: SessionUpdate, db: AsyncSession = Depends(get_async_db)):
+    """Update a session's status, schedule, notes or review"""
+    db_session = await db.scalar(select(Session).where(Session.session_id == session_id))
+    
+    if not db_session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    
+    updates = session_data.model_dump(exclude_unset=True)
+    reschedules = updates.keys() & {"scheduled_at", "duration", "status"}
+    for field, value in updates.items():
+        setattr(db_session, field, value)
+    
+    if reschedules and db_session.status in BLOCKING_STATUSES and db_session.scheduled_at and db_session.duration:
+        await lock_mentor_schedule(db, db_session.mentor_address)
+        conflict = await find_conflict(
+            db, db_session.mentor_address, db_session.scheduled_at, db_session.duration,
+            exclude_session_id=db_session.id
+        )
+        if conflict:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Mentor is already booked at that time (session {conflict})"
+            )
+    if updates.get("status") == SessionStatus.COMPLETED and db_session.completed_at is None:
+        db_session.completed_at = datetime.utcnow()
+    
+    await db.commit()
+    return json_response(await _get_session_response(db, session_id))
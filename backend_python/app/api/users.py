@@ -1,19 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, status
+from pydantic import ValidationError
+from sqlalchemy import and_, insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import CacheBackend, get_profile_cache
+from app.core.database import get_async_db
 from app.models.user import User, UserRole
-from app.schemas.user import UserCreate, UserResponse, UserUpdate
-from typing import List, Optional
+from app.models.user_skill import UserSkill
+from app.schemas.user import (
+    UserCreate, UserResponse, UserUpdate,
+    BulkRegisterResponse, BulkRegisterResult, BulkRegisterStatus, LeaderboardEntry, LeaderboardRank,
+    select_user_response, user_row_to_dict, user_to_dict,
+)
+from app.services.leaderboard import leaderboard
+from app.services.matching import mentor_matcher
+from app.services.search import search_users_text
+from app.services.skills import parse_skills_param, set_user_skills, skill_filter, skill_rows
+from app.utils.etag import CACHE_CONTROL, etag_for_bytes, etag_matches, not_modified
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.serialization import dumps, json_response
+from typing import Any, Dict, List, Optional
+import json
 
 router = APIRouter()
 
-@router.post("/register")
-async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
+# Upper bound on rows per bulk registration request
+MAX_BULK_REGISTER = 10000
+
+def _conditional_json_response(body: bytes, if_none_match: Optional[str]):
+    """JSON response with a content ETag, or 304 if the client's copy matches"""
+    etag = etag_for_bytes(body)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return json_response(body, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+def _sync_indexes(user: User):
+    """Reflect a committed user write in the matching engine and the leaderboard"""
+    mentor_matcher.sync_user(
+        user.id, user.role, user.is_active,
+        json.loads(user.skills) if user.skills else [],
+        user.reputation, user.hourly_rate, user.is_verified
+    )
+    leaderboard.sync_user(
+        user.id, user.role, user.is_active, user.reputation, user.wallet_address, user.name
+    )
+
+@router.post("/register", response_model=UserResponse)
+async def register_user(
+    user_data: UserCreate,
+    db: AsyncSession = Depends(get_async_db),
+    cache: CacheBackend = Depends(get_profile_cache)
+):
     """Register a new user"""
     # Check if user already exists
-    existing_user = db.query(User).filter(
+    existing_user = await db.scalar(select(User.id).where(
         User.wallet_address == user_data.wallet_address
-    ).first()
+    ))
     
     if existing_user:
         raise HTTPException(
@@ -22,7 +64,6 @@ async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    import json
     skills_json = json.dumps(user_data.skills or [])
     
     db_user = User(
@@ -37,35 +78,128 @@ async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    
-    # Convert skills back to list for response
-    response_data = {
-        "id": db_user.id,
-        "wallet_address": db_user.wallet_address,
-        "name": db_user.name,
-        "email": db_user.email,
-        "role": db_user.role,
-        "reputation": db_user.reputation,
-        "subscription_tier": db_user.subscription_tier,
-        "subscription_expiry": db_user.subscription_expiry,
-        "bio": db_user.bio,
-        "skills": json.loads(db_user.skills) if db_user.skills else [],
-        "experience": db_user.experience,
-        "hourly_rate": db_user.hourly_rate,
-        "profile_image": db_user.profile_image,
-        "is_verified": db_user.is_verified,
-        "is_active": db_user.is_active,
-        "last_active_at": db_user.last_active_at,
-        "created_at": db_user.created_at,
-        "updated_at": db_user.updated_at,
-    }
-    
-    return response_data
+    await db.flush()
+    await db.run_sync(set_user_skills, db_user.id, user_data.skills)
+    await db.commit()
+    await db.refresh(db_user)
+    await cache.delete(db_user.wallet_address)
+    _sync_indexes(db_user)
+    
+    return json_response(user_to_dict(db_user))
+
+@router.post("/register/bulk", response_model=BulkRegisterResponse)
+async def register_users_bulk(
+    payload: List[Dict[str, Any]] = Body(..., max_length=MAX_BULK_REGISTER),
+    db: AsyncSession = Depends(get_async_db),
+    cache: CacheBackend = Depends(get_profile_cache)
+):
+    """Register many users in one transaction
+
+    Each row is validated on its own and reported as created, duplicate
+    (wallet address or email already registered, or repeated in the batch)
+    or invalid. Existing users are found with a single IN query and new
+    users are inserted with one executemany.
+    """
+    results: List[Optional[BulkRegisterResult]] = [None] * len(payload)
+    candidates = []
+    for index, item in enumerate(payload):
+        try:
+            candidates.append((index, UserCreate.model_validate(item)))
+        except ValidationError as exc:
+            error = exc.errors()[0]
+            results[index] = BulkRegisterResult(
+                index=index,
+                wallet_address=item.get("wallet_address") if isinstance(item.get("wallet_address"), str) else None,
+                status=BulkRegisterStatus.INVALID,
+                detail=f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+            )
+    
+    # One round trip for every wallet address and email in the batch
+    wallets = [user.wallet_address for _, user in candidates]
+    emails = [user.email for _, user in candidates if user.email]
+    taken_wallets, taken_emails = set(), set()
+    if candidates:
+        existing = await db.execute(select(User.wallet_address, User.email).where(or_(
+            User.wallet_address.in_(wallets),
+            User.email.in_(emails)
+        )))
+        for wallet_address, email in existing:
+            taken_wallets.add(wallet_address)
+            taken_emails.add(email)
+    
+    new_users = []
+    for index, user in candidates:
+        if user.wallet_address in taken_wallets or (user.email and user.email in taken_emails):
+            results[index] = BulkRegisterResult(
+                index=index,
+                wallet_address=user.wallet_address,
+                status=BulkRegisterStatus.DUPLICATE,
+                detail="User with this wallet address or email already exists"
+            )
+            continue
+        taken_wallets.add(user.wallet_address)
+        if user.email:
+            taken_emails.add(user.email)
+        new_users.append((index, user))
+    
+    if new_users:
+        rows = [
+            {
+                "wallet_address": user.wallet_address,
+                "name": user.name,
+                "email": user.email,
+                "role": user.role,
+                "bio": user.bio,
+                "skills": json.dumps(user.skills or []),
+                "experience": user.experience,
+                "hourly_rate": user.hourly_rate,
+            }
+            for _, user in new_users
+        ]
+        try:
+            # Unordered RETURNING keeps insertmanyvalues batched; match ids by wallet
+            ids_by_wallet = dict((await db.execute(
+                insert(User).returning(User.wallet_address, User.id), rows
+            )).all())
+            ids = [ids_by_wallet[user.wallet_address] for _, user in new_users]
+            index_rows = [
+                row
+                for user_id, (_, user) in zip(ids, new_users)
+                for row in skill_rows(user_id, user.skills)
+            ]
+            if index_rows:
+                await db.execute(insert(UserSkill), index_rows)
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Users were registered concurrently; retry the batch"
+            )
+        
+        for user_id, (index, user) in zip(ids, new_users):
+            results[index] = BulkRegisterResult(
+                index=index,
+                wallet_address=user.wallet_address,
+                status=BulkRegisterStatus.CREATED,
+                id=user_id
+            )
+            await cache.delete(user.wallet_address)
+            mentor_matcher.sync_user(
+                user_id, user.role, True, user.skills or [], 0, user.hourly_rate, False
+            )
+            leaderboard.sync_user(user_id, user.role, True, 0, user.wallet_address, user.name)
+    
+    response = BulkRegisterResponse(
+        created=len(new_users),
+        duplicates=sum(result.status == BulkRegisterStatus.DUPLICATE for result in results),
+        invalid=sum(result.status == BulkRegisterStatus.INVALID for result in results),
+        results=results
+    )
+    return json_response(response.model_dump_json().encode())
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user(db: Session = Depends(get_db)):
+async def get_current_user(db: AsyncSession = Depends(get_async_db)):
     """Get current user (placeholder - needs authentication)"""
     # TODO: Implement authentication
     raise HTTPException(
@@ -73,61 +207,273 @@ async def get_current_user(db: Session = Depends(get_db)):
         detail="Authentication not implemented yet"
     )
 
-@router.get("/search")
+@router.get("/search", response_model=List[UserResponse])
 async def search_users(
     role: Optional[UserRole] = None,
     skills: Optional[str] = None,
-    limit: int = 10,
-    db: Session = Depends(get_db)
+    match: str = Query("any", pattern="^(any|all)$"),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Search users by criteria"""
-    query = db.query(User).filter(User.is_active == True)
+    """Search users by criteria
+
+    `skills` is a comma-separated list; `match=any` returns users with at least
+    one of them, `match=all` only users with every one (case-insensitive).
+
+    Results are ordered by reputation (highest first), then id. When more
+    results exist, the `X-Next-Cursor` response header carries the cursor for
+    the next page; pass it back as `cursor`.
+
+    The weak ETag hashes the serialized page (and next cursor), so a
+    matching `If-None-Match` gets a 304 without sending the body. Row
+    timestamps are not enough: SQLite stores them at one-second resolution.
+    """
+    query = select_user_response().where(User.is_active == True)
     
     if role:
-        query = query.filter(User.role == role)
-    
-    if skills:
-        # Simple search - in production you'd want more sophisticated search
-        import json
-        query = query.filter(User.skills.contains(json.dumps([skills])))
-    
-    users = query.limit(limit).all()
-    
-    # Convert skills back to list for response
-    import json
-    response_users = []
-    for user in users:
-        response_data = {
-            "id": user.id,
-            "wallet_address": user.wallet_address,
-            "name": user.name,
-            "email": user.email,
-            "role": user.role,
-            "reputation": user.reputation,
-            "subscription_tier": user.subscription_tier,
-            "subscription_expiry": user.subscription_expiry,
-            "bio": user.bio,
-            "skills": json.loads(user.skills) if user.skills else [],
-            "experience": user.experience,
-            "hourly_rate": user.hourly_rate,
-            "profile_image": user.profile_image,
-            "is_verified": user.is_verified,
-            "is_active": user.is_active,
-            "last_active_at": user.last_active_at,
-            "created_at": user.created_at,
-            "updated_at": user.updated_at,
-        }
-        response_users.append(response_data)
-    
-    return response_users
-
-@router.get("/{wallet_address}")
-async def get_user_by_address(wallet_address: str, db: Session = Depends(get_db)):
-    """Get user by wallet address"""
-    user = db.query(User).filter(
+        query = query.where(User.role == role)
+    
+    skill_keys = parse_skills_param(skills)
+    if skill_keys:
+        query = query.where(skill_filter(skill_keys, match_all=(match == "all")))
+    
+    if cursor:
+        try:
+            last_reputation, last_id = decode_cursor(cursor, int, int)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        query = query.where(or_(
+            User.reputation < last_reputation,
+            and_(User.reputation == last_reputation, User.id > last_id)
+        ))
+    
+    rows = (await db.execute(
+        query.order_by(User.reputation.desc(), User.id).limit(limit + 1)
+    )).all()
+    
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].reputation, rows[-1].id)
+    
+    body = dumps([user_row_to_dict(row) for row in rows])
+    etag = etag_for_bytes(body + headers.get("X-Next-Cursor", "").encode())
+    if etag_matches(if_none_match, etag):
+        response = not_modified(etag)
+        response.headers.update(headers)
+        return response
+    
+    headers.update({"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    return json_response(body, headers=headers)
+
+@router.get("/search/text", response_model=List[UserResponse])
+async def search_users_fulltext(
+    q: str = Query(..., min_length=1, max_length=200),
+    role: Optional[UserRole] = None,
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Ranked free-text search over name, bio and experience
+
+    Every word must match (the last one as a prefix); name matches rank
+    above bio matches, which rank above experience matches.
+    """
+    rows = await search_users_text(db, q, role=role, limit=limit)
+    return json_response([user_row_to_dict(row) for row in rows])
+
+@router.get("/cache/stats")
+async def get_cache_stats(cache: CacheBackend = Depends(get_profile_cache)):
+    """Profile cache hit/miss counters"""
+    return cache.stats()
+
+@router.get("/leaderboard", response_model=List[LeaderboardEntry])
+async def get_leaderboard(
+    role: Optional[UserRole] = None,
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Active users ranked by reputation (all roles by default)
+
+    Served from the in-memory order-statistic index: a page costs O(log n)
+    regardless of `offset`. The board size is in the `X-Total-Count` header.
+    """
+    await leaderboard.ensure_loaded(db)
+    return json_response(
+        leaderboard.page(role, offset, limit),
+        headers={"X-Total-Count": str(leaderboard.total(role))}
+    )
+
+@router.get("/{wallet_address}", response_model=UserResponse)
+async def get_user_by_address(
+    wallet_address: str,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    cache: CacheBackend = Depends(get_profile_cache)
+):
+    """Get user by wallet address (read-through profile cache)
+
+    The weak ETag hashes the cached profile bytes, so revalidating an
+    unchanged profile costs a cache lookup and returns 304.
+    """
+    body = await cache.get(wallet_address)
+    if body is not None:
+        return _conditional_json_response(body, if_none_match)
+    
+    # Taken before the read: a write committed meanwhile invalidates the key,
+    # and the set below is skipped instead of caching the stale row
+    generation = await cache.generation(wallet_address)
+    row = (await db.execute(select_user_response().where(
+        User.wallet_address == wallet_address,
+        User.is_active == True
+    ))).first()
+    
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    body = dumps(user_row_to_dict(row))
+    await cache.set(wallet_address, body, generation)
+    return _conditional_json_response(body, if_none_match)
+
+@router.get("/{wallet_address}/matches")
+async def get_mentor_matches(
+    wallet_address: str,
+    k: int = Query(20, ge=1, le=100),
+    max_hourly_rate: Optional[float] = Query(None, ge=0),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Top-k mentors for a user, scored on shared skills, reputation and verification"""
+    user = (await db.execute(select(User.id, User.skills).where(
+        User.wallet_address == wallet_address,
+        User.is_active == True
+    ))).first()
+    
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    await mentor_matcher.ensure_loaded(db)
+    matches = mentor_matcher.top_k(
+        json.loads(user.skills) if user.skills else [],
+        k=k,
+        max_hourly_rate=max_hourly_rate,
+        exclude_id=user.id
+    )
+    if not matches:
+        return json_response([])
+    
+    rows = (await db.execute(
+        select_user_response().where(User.id.in_([mentor_id for mentor_id, _, _ in matches]))
+    )).all()
+    mentors = {row.id: user_row_to_dict(row) for row in rows}
+    return json_response([
+        {"score": score, "shared_skills": shared, "mentor": mentors[mentor_id]}
+        for mentor_id, score, shared in matches
+        if mentor_id in mentors
+    ])
+
+@router.get("/{wallet_address}/rank", response_model=LeaderboardRank)
+async def get_user_rank(
+    wallet_address: str,
+    role: Optional[UserRole] = Query(None, description="Board to rank on; the user's own role by default"),
+    overall: bool = Query(False, description="Rank across all roles"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """A user's leaderboard rank"""
+    user = (await db.execute(select(User.id, User.role).where(
+        User.wallet_address == wallet_address,
+        User.is_active == True
+    ))).first()
+    
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    await leaderboard.ensure_loaded(db)
+    board = None if overall else role or user.role
+    entry = leaderboard.rank(user.id, board)
+    if entry is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User is not on this leaderboard"
+        )
+    return {**entry, "role": board, "total": leaderboard.total(board)}
+
+@router.put("/{wallet_address}", response_model=UserResponse)
+async def update_user(
+    wallet_address: str,
+    user_data: UserUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    cache: CacheBackend = Depends(get_profile_cache)
+):
+    """Update a user's profile"""
+    user = await db.scalar(select(User).where(
+        User.wallet_address == wallet_address,
+        User.is_active == True
+    ))
+    
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    updates = user_data.model_dump(exclude_unset=True)
+    if updates.get("email") is not None and updates["email"] != user.email:
+        email_taken = await db.scalar(select(User.id).where(
+            User.email == updates["email"],
+            User.id != user.id
+        ))
+        if email_taken:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="User with this email already exists"
+            )
+    if "skills" in updates:
+        skills = updates.pop("skills") or []
+        user.skills = json.dumps(skills)
+        await db.run_sync(set_user_skills, user.id, skills)
+    for field, value in updates.items():
+        setattr(user, field, value)
+    
+    try:
+        await db.commit()
+    except IntegrityError:
+        # The email was taken concurrently, after the check above
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User with this email already exists"
+        )
+    await db.refresh(user)
+    await cache.delete(wallet_address)
+    _sync_indexes(user)
+    
+    return json_response(user_to_dict(user))
+
+@router.delete("/{wallet_address}", status_code=status.HTTP_204_NO_CONTENT)
+async def deactivate_user(
+    wallet_address: str,
+    db: AsyncSession = Depends(get_async_db),
+    cache: CacheBackend = Depends(get_profile_cache)
+):
+    """Deactivate a user"""
+    user = await db.scalar(select(User).where(
         User.wallet_address == wallet_address,
         User.is_active == True
-    ).first()
+    ))
     
     if not user:
         raise HTTPException(
@@ -135,27 +481,8 @@ async def get_user_by_address(wallet_address: str, db: Session = Depends(get_db)
             detail="User not found"
         )
     
-    # Convert skills back to list for response
-    import json
-    response_data = {
-        "id": user.id,
-        "wallet_address": user.wallet_address,
-        "name": user.name,
-        "email": user.email,
-        "role": user.role,
-        "reputation": user.reputation,
-        "subscription_tier": user.subscription_tier,
-        "subscription_expiry": user.subscription_expiry,
-        "bio": user.bio,
-        "skills": json.loads(user.skills) if user.skills else [],
-        "experience": user.experience,
-        "hourly_rate": user.hourly_rate,
-        "profile_image": user.profile_image,
-        "is_verified": user.is_verified,
-        "is_active": user.is_active,
-        "last_active_at": user.last_active_at,
-        "created_at": user.created_at,
-        "updated_at": user.updated_at,
-    }
-    
-    return response_data
+    user.is_active = False
+    await db.commit()
+    await cache.delete(wallet_address)
+    mentor_matcher.remove(user.id)
+    leaderboard.remove(user.id)
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.services.stripe_events import InvalidEvent, enqueue_event, parse_event, stripe_event_worker
+from typing import Optional
+
+router = APIRouter()
+
+@router.post("/stripe")
+async def stripe_webhook(
+    request: Request,
+    stripe_signature: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Verify a Stripe event and queue it for the background worker"""
+    if not settings.STRIPE_WEBHOOK_SECRET:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Stripe webhooks are not configured"
+        )
+    try:
+        event = parse_event(await request.body(), stripe_signature, settings.STRIPE_WEBHOOK_SECRET)
+    except InvalidEvent as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+    
+    created = await enqueue_event(db, event)
+    await db.commit()
+    if created:
+        stripe_event_worker.notify()
+    return {"received": True, "duplicate": not created}
+
+@router.get("/stripe/stats")
+async def stripe_webhook_stats(db: AsyncSession = Depends(get_async_db)):
+    """Background worker counters and queue depth"""
+    return {
+        "pending": await stripe_event_worker.pending(db),
+        "processed": stripe_event_worker.processed,
+        "batches": stripe_event_worker.batches,
+        "errors": stripe_event_worker.errors,
+    }
@@ -0,0 +1,153 @@
+"""
+Publish/subscribe for live delivery (notification streams, chat sockets).
+
+`Broker` is the interface producers and connections talk to; `InMemoryBroker`
+is the default implementation, reaching only the connections held by this
+process. Bridging several uvicorn workers (e.g. over Redis pub/sub or
+Postgres LISTEN/NOTIFY) means implementing `Broker` so `publish` also
+forwards to the other workers, and installing it with `set_broker` at
+startup.
+
+Subscribers get a bounded queue per connection. Publishing never waits: if a
+subscriber's queue is full it is a slow consumer and is evicted (its stream
+ends and the client reconnects, catching up from the database), so one
+stalled client cannot hold up delivery to the others or grow memory without
+bound.
+"""
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Set
+
+from .config import settings
+
+# Queued after eviction so the consumer wakes up and stops
+EVICTED = object()
+
+
+class Subscription:
+    """One subscriber's bounded message queue"""
+
+    def __init__(self, topic: str, maxsize: int):
+        self.topic = topic
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.evicted = False
+
+    def offer(self, message: Any) -> bool:
+        """Queue a message without waiting, False if the queue is full"""
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def get(self, timeout: Optional[float] = None) -> Any:
+        """Next message, None on timeout, EVICTED once evicted"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class Broker(ABC):
+    """Topic-keyed fan-out to bounded subscriber queues"""
+
+    @abstractmethod
+    def subscribe(self, topic: str, queue_size: Optional[int] = None) -> Subscription:
+        """Register a new subscription to `topic`"""
+
+    @abstractmethod
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Drop a subscription; safe to call more than once"""
+
+    @abstractmethod
+    def publish(self, topic: str, message: Any) -> int:
+        """Deliver a message without blocking, returns local deliveries"""
+
+    @abstractmethod
+    def has_subscribers(self, topic: str) -> bool:
+        """Whether publishing to `topic` can reach anyone"""
+
+    @abstractmethod
+    def evict(self, subscription: Subscription) -> None:
+        """Disconnect a slow consumer"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Subscription and delivery counters"""
+
+
+class InMemoryBroker(Broker):
+    """Broker reaching the subscriptions of this process"""
+
+    def __init__(self, queue_size: int = settings.SSE_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._topics: Dict[str, Set[Subscription]] = {}
+        self.published = 0
+        self.delivered = 0
+        self.evictions = 0
+
+    def subscribe(self, topic: str, queue_size: Optional[int] = None) -> Subscription:
+        subscription = Subscription(topic, queue_size or self.queue_size)
+        self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._topics.get(subscription.topic)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._topics[subscription.topic]
+
+    def has_subscribers(self, topic: str) -> bool:
+        return topic in self._topics
+
+    def publish(self, topic: str, message: Any) -> int:
+        self.published += 1
+        delivered = 0
+        for subscription in list(self._topics.get(topic, ())):
+            if subscription.offer(message):
+                delivered += 1
+            else:
+                self.evict(subscription)
+        self.delivered += delivered
+        return delivered
+
+    def evict(self, subscription: Subscription) -> None:
+        if subscription.evicted:
+            return
+        self.unsubscribe(subscription)
+        subscription.evicted = True
+        self.evictions += 1
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(EVICTED)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "topics": len(self._topics),
+            "subscriptions": sum(len(subscriptions) for subscriptions in self._topics.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "evictions": self.evictions,
+        }
+
+
+broker: Broker = InMemoryBroker()
+
+
+def set_broker(backend: Broker) -> None:
+    """Swap the process-wide broker (e.g. for one bridging workers)"""
+    global broker
+    broker = backend
+
+
+def get_broker() -> Broker:
+    return broker
+
+
+def notification_topic(user_id: int) -> str:
+    return f"notifications:{user_id}"
+
+
+def chat_topic(user_id: int) -> str:
+    return f"chat:{user_id}"
@@ -0,0 +1,143 @@
+"""
+Response caches.
+
+`CacheBackend` is the interface handlers talk to; `LRUTTLCache` is the default
+in-process implementation. A shared store (e.g. Redis) can be plugged in by
+implementing `CacheBackend` and passing it to `set_profile_cache`, or by
+overriding the `get_profile_cache` dependency.
+
+Read-through callers take `generation(key)` before loading from the database
+and pass it to `set`; a `delete` in between (a concurrent write invalidating
+the key) makes that `set` a no-op, so a stale load cannot be cached for the
+whole TTL.
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .config import settings
+
+
+class CacheBackend(ABC):
+    """Byte-value cache keyed by string"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return the cached value, or None on a miss"""
+
+    @abstractmethod
+    async def generation(self, key: str) -> int:
+        """Token that changes whenever `key` is deleted"""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, generation: Optional[int] = None) -> None:
+        """Store a value, unless `key` was deleted since `generation` was taken"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Drop a key if present"""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Drop every key"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and size information"""
+
+
+class LRUTTLCache(CacheBackend):
+    """In-process LRU cache whose entries also expire after `ttl` seconds"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        # Clock value of each key's last delete, oldest first and capped at
+        # maxsize; forgotten keys report the floor, which is at least as new as
+        # anything forgotten, so they never match a token taken before
+        self._generations: "OrderedDict[str, int]" = OrderedDict()
+        self._clock = 0
+        self._floor = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_sets = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    async def generation(self, key: str) -> int:
+        with self._lock:
+            return self._generations.get(key, self._floor)
+
+    async def set(self, key: str, value: bytes, generation: Optional[int] = None) -> None:
+        with self._lock:
+            if generation is not None and self._generations.get(key, self._floor) != generation:
+                self.stale_sets += 1
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    async def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            self._clock += 1
+            self._generations[key] = self._clock
+            self._generations.move_to_end(key)
+            if len(self._generations) > self.maxsize:
+                _, self._floor = self._generations.popitem(last=False)
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._clock += 1
+            self._generations.clear()
+            self._floor = self._clock
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "stale_sets": self.stale_sets,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
+
+
+# Serialized user profiles keyed by wallet address
+profile_cache: CacheBackend = LRUTTLCache(
+    maxsize=settings.PROFILE_CACHE_SIZE,
+    ttl=settings.PROFILE_CACHE_TTL,
+)
+
+def set_profile_cache(backend: CacheBackend) -> None:
+    """Swap the profile cache backend"""
+    global profile_cache
+    profile_cache = backend
+
+# Dependency to get the profile cache
+def get_profile_cache() -> CacheBackend:
+    return profile_cache
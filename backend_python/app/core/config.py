@@ -8,6 +8,8 @@ load_dotenv()
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./womantech.db")
+    # Defaults to DATABASE_URL with its async driver (aiosqlite / asyncpg)
+    ASYNC_DATABASE_URL: Optional[str] = os.getenv("ASYNC_DATABASE_URL")
     
     # JWT
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
@@ -17,9 +19,46 @@ class Settings(BaseSettings):
     # CORS
     CORS_ORIGIN: str = os.getenv("CORS_ORIGIN", "http://localhost:3000")
     
+    # Caching
+    PROFILE_CACHE_SIZE: int = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+    PROFILE_CACHE_TTL: float = float(os.getenv("PROFILE_CACHE_TTL", "60"))
+    
+    # Server-Sent Events
+    SSE_QUEUE_SIZE: int = int(os.getenv("SSE_QUEUE_SIZE", "100"))  # per connection
+    SSE_HEARTBEAT_INTERVAL: float = float(os.getenv("SSE_HEARTBEAT_INTERVAL", "15"))
+    
+    # Chat sockets
+    CHAT_SEND_BUFFER: int = int(os.getenv("CHAT_SEND_BUFFER", "256"))  # per connection
+    CHAT_WRITE_QUEUE_SIZE: int = int(os.getenv("CHAT_WRITE_QUEUE_SIZE", "10000"))
+    CHAT_BATCH_SIZE: int = int(os.getenv("CHAT_BATCH_SIZE", "500"))
+    CHAT_BATCH_LINGER_MS: float = float(os.getenv("CHAT_BATCH_LINGER_MS", "2"))
+    
     # Stripe
     STRIPE_SECRET_KEY: Optional[str] = os.getenv("STRIPE_SECRET_KEY")
     STRIPE_WEBHOOK_SECRET: Optional[str] = os.getenv("STRIPE_WEBHOOK_SECRET")
+    STRIPE_WEBHOOK_TOLERANCE: int = int(os.getenv("STRIPE_WEBHOOK_TOLERANCE", "300"))  # seconds
+    STRIPE_EVENT_BATCH_SIZE: int = int(os.getenv("STRIPE_EVENT_BATCH_SIZE", "200"))
+    STRIPE_EVENT_POLL_INTERVAL: float = float(os.getenv("STRIPE_EVENT_POLL_INTERVAL", "5"))
+    
+    # On-chain indexer (disabled unless both are set)
+    CHAIN_RPC_URL: Optional[str] = os.getenv("CHAIN_RPC_URL")
+    CONTRACT_ADDRESS: Optional[str] = os.getenv("CONTRACT_ADDRESS")
+    CHAIN_START_BLOCK: int = int(os.getenv("CHAIN_START_BLOCK", "0"))  # contract deployment block
+    CHAIN_BATCH_BLOCKS: int = int(os.getenv("CHAIN_BATCH_BLOCKS", "2000"))  # per eth_getLogs call
+    CHAIN_CONCURRENCY: int = int(os.getenv("CHAIN_CONCURRENCY", "4"))
+    CHAIN_CONFIRMATIONS: int = int(os.getenv("CHAIN_CONFIRMATIONS", "3"))
+    CHAIN_REORG_DEPTH: int = int(os.getenv("CHAIN_REORG_DEPTH", "64"))
+    CHAIN_POLL_INTERVAL: float = float(os.getenv("CHAIN_POLL_INTERVAL", "15"))
+    CHAIN_SNAPSHOT_PAGE_SIZE: int = int(os.getenv("CHAIN_SNAPSHOT_PAGE_SIZE", "200"))  # starting getUsers limit
+    
+    # Prometheus metrics at /metrics
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    
+    # Per-request SQL accounting (Server-Timing header, N+1 warnings)
+    QUERY_STATS_ENABLED: bool = os.getenv("QUERY_STATS_ENABLED", "True").lower() == "true"
+    QUERY_BUDGET: int = int(os.getenv("QUERY_BUDGET", "0"))  # queries per request, 0 for none
+    QUERY_STRICT: bool = os.getenv("QUERY_STRICT", "False").lower() == "true"  # fail requests over budget (tests)
+    QUERY_N_PLUS_ONE_THRESHOLD: int = int(os.getenv("QUERY_N_PLUS_ONE_THRESHOLD", "5"))
     
     # App
     APP_NAME: str = "WomanTech Connect API"
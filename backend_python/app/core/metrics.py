@@ -0,0 +1,250 @@
+"""
+Prometheus metrics.
+
+`MetricsMiddleware` is a plain ASGI middleware (no BaseHTTPMiddleware task
+overhead) that records, per method and templated route (`/api/users/{wallet_address}`,
+never the raw path), request counts by status code and a latency histogram.
+Requests that match no route are grouped under `route="unmatched"` so
+scanners cannot blow up cardinality. The route is only known once the router
+has matched, so the middleware keeps the scopes of requests in progress and
+the in-flight gauge groups them by route when scraped (the router stores the
+match in the shared scope).
+
+`instrument_engine` adds connection pool gauges (size, checked out,
+overflow) plus checkout counts, the time spent opening new connections and
+how long connections are held, all from public pool events. SQLAlchemy has
+no event before a checkout blocks, so time queued for a free connection is
+not measured directly; a pool whose checked out gauge sits at its size with
+long hold times is the one making requests wait. `MetricsRegistry.render`
+produces the Prometheus text exposition format served at `/metrics`.
+
+Counters are plain ints updated on the event loop thread; pool totals are
+guarded by a lock because sync engines check out from worker threads.
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_template(scope) -> str:
+    """Templated path of the route that handled `scope`, after routing"""
+    route = scope.get("route")
+    if route is None:
+        return UNMATCHED_ROUTE
+    # Newer FastAPI keeps included routes unprefixed and records the
+    # prefixed route on the request; older releases copy them with the prefix
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    if context is not None and context.original_route is route:
+        return context.path
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class RouteStats:
+    """Status counts and latency histogram of one (method, route)"""
+
+    __slots__ = ("statuses", "buckets", "total", "sum")
+
+    def __init__(self):
+        self.statuses: Dict[int, int] = {}
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # last is +Inf
+        self.total = 0
+        self.sum = 0.0
+
+
+class PoolStats:
+    """Checkout, connect and hold totals for one engine's pool"""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.checkouts = 0
+        self.connects = 0
+        self.connect_seconds = 0.0
+        self.max_connect_seconds = 0.0
+        self.checkins = 0
+        self.held_seconds = 0.0
+        self.max_held_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def listen(self) -> None:
+        """Subscribe to the engine's pool and dialect events
+
+        Pool listeners are carried over to the fresh pool `dispose()` creates.
+        """
+        event.listen(self.engine, "do_connect", self._on_do_connect)
+        event.listen(self.engine, "connect", self._on_connect)
+        event.listen(self.engine, "checkout", self._on_checkout)
+        event.listen(self.engine, "checkin", self._on_checkin)
+
+    def _on_do_connect(self, dialect, connection_record, cargs, cparams) -> None:
+        connection_record.info["metrics_connect_start"] = time.perf_counter()
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        start = connection_record.info.pop("metrics_connect_start", None)
+        if start is None:
+            return
+        seconds = time.perf_counter() - start
+        with self._lock:
+            self.connects += 1
+            self.connect_seconds += seconds
+            if seconds > self.max_connect_seconds:
+                self.max_connect_seconds = seconds
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        connection_record.info["metrics_checkout_start"] = time.perf_counter()
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        start = connection_record.info.pop("metrics_checkout_start", None)
+        if start is None:
+            return
+        seconds = time.perf_counter() - start
+        with self._lock:
+            self.checkins += 1
+            self.held_seconds += seconds
+            if seconds > self.max_held_seconds:
+                self.max_held_seconds = seconds
+
+
+class MetricsRegistry:
+    """Process-wide HTTP and connection pool metrics"""
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], RouteStats] = {}
+        self.in_flight: Dict[int, dict] = {}  # id(scope) -> ASGI scope
+        self.pools: Dict[str, PoolStats] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route)
+        stats = self.routes.get(key)
+        if stats is None:
+            stats = self.routes[key] = RouteStats()
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        stats.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        stats.total += 1
+        stats.sum += seconds
+
+    def instrument_engine(self, name: str, engine: Engine) -> None:
+        """Export pool gauges and checkout/connect timings for a (sync) engine"""
+        if name in self.pools:
+            return
+        self.pools[name] = PoolStats(engine)
+        self.pools[name].listen()
+
+    def _render_http(self, lines: List[str]) -> None:
+        lines.append("# HELP http_requests_total HTTP requests by method, route and status code.")
+        lines.append("# TYPE http_requests_total counter")
+        for (method, route), stats in sorted(self.routes.items()):
+            labels = f'method="{method}",route="{_escape(route)}"'
+            for status, count in sorted(stats.statuses.items()):
+                lines.append(f'http_requests_total{{{labels},status="{status}"}} {count}')
+
+        lines.append("# HELP http_request_duration_seconds HTTP request latency by method and route.")
+        lines.append("# TYPE http_request_duration_seconds histogram")
+        for (method, route), stats in sorted(self.routes.items()):
+            labels = f'method="{method}",route="{_escape(route)}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.total}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {stats.sum}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {stats.total}")
+
+        lines.append("# HELP http_requests_in_progress HTTP requests currently being served, by method and route.")
+        lines.append("# TYPE http_requests_in_progress gauge")
+        in_flight = dict.fromkeys(self.routes, 0)
+        for scope in list(self.in_flight.values()):
+            key = (scope["method"], route_template(scope))
+            in_flight[key] = in_flight.get(key, 0) + 1
+        for (method, route), count in sorted(in_flight.items()):
+            lines.append(f'http_requests_in_progress{{method="{method}",route="{_escape(route)}"}} {count}')
+
+    def _render_pools(self, lines: List[str]) -> None:
+        gauges = [
+            ("db_pool_size", "Configured pool size.", "size"),
+            ("db_pool_checked_out", "Connections currently checked out.", "checkedout"),
+            ("db_pool_overflow", "Connections open beyond the pool size (negative while the pool fills).", "overflow"),
+        ]
+        for metric, help_text, method in gauges:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            for name, stats in sorted(self.pools.items()):
+                read = getattr(stats.engine.pool, method, None)
+                if read is not None:  # StaticPool, NullPool, ... have no sizing
+                    lines.append(f'{metric}{{engine="{name}"}} {read()}')
+
+        lines.append("# HELP db_pool_checkouts_total Connections checked out of the pool.")
+        lines.append("# TYPE db_pool_checkouts_total counter")
+        for name, stats in sorted(self.pools.items()):
+            lines.append(f'db_pool_checkouts_total{{engine="{name}"}} {stats.checkouts}')
+
+        summaries = [
+            ("db_pool_connect_seconds", "Time spent opening new database connections.", "connects", "connect_seconds", "max_connect_seconds"),
+            ("db_pool_held_seconds", "Time connections stay checked out.", "checkins", "held_seconds", "max_held_seconds"),
+        ]
+        for metric, help_text, count, total, longest in summaries:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} summary")
+            for name, stats in sorted(self.pools.items()):
+                lines.append(f'{metric}_sum{{engine="{name}"}} {getattr(stats, total)}')
+                lines.append(f'{metric}_count{{engine="{name}"}} {getattr(stats, count)}')
+            lines.append(f"# HELP {metric}_max Longest since start.")
+            lines.append(f"# TYPE {metric}_max gauge")
+            for name, stats in sorted(self.pools.items()):
+                lines.append(f'{metric}_max{{engine="{name}"}} {getattr(stats, longest)}')
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        self._render_http(lines)
+        self._render_pools(lines)
+        lines.append("")
+        return "\n".join(lines)
+
+
+class MetricsMiddleware:
+    """ASGI middleware feeding a `MetricsRegistry`"""
+
+    def __init__(self, app, registry: "MetricsRegistry"):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        in_flight = self.registry.in_flight
+        in_flight[id(scope)] = scope
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            del in_flight[id(scope)]
+            # The router stores the matched route in the (shared) scope
+            self.registry.observe(method, route_template(scope), status, elapsed)
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,202 @@
+"""
+Per-request SQL accounting.
+
+`QueryStats` counts the statements one unit of work executes and the time
+spent in the database, grouped by SQL text. `track_queries` makes a
+`QueryStats` current for the enclosing context (a contextvar, so it follows
+the request into SQLAlchemy's async greenlets) and `instrument_engine`
+installs the cursor event hooks that feed it.
+
+`QueryStatsMiddleware` tracks every HTTP request: it adds a
+`Server-Timing: db;dur=<ms>;desc="<n> queries"` header, logs a summary at
+DEBUG and warns about suspected N+1 patterns, i.e. one statement run at
+least `n_plus_one_threshold` times with differing parameters (typically a
+lazy-loaded relationship touched once per row); the batches of one bulk
+INSERT (insertmanyvalues, executemany) are not suspects. Requests over
+`budget` are logged; with `strict=True` (meant for tests) the first query
+over budget raises `QueryBudgetExceeded` instead of running.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.interfaces import ExecuteStyle
+
+from .config import settings
+from .metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    """A strict `QueryStats` was asked to run more queries than its budget"""
+
+
+class StatementStats:
+    """Executions of one SQL text"""
+
+    __slots__ = ("count", "seconds", "first_params", "varied")
+
+    def __init__(self, parameters):
+        self.count = 0
+        self.seconds = 0.0
+        self.first_params = parameters
+        self.varied = False
+
+
+class QueryStats:
+    """Query count and database time of one request (or test block)"""
+
+    def __init__(
+        self,
+        budget: Optional[int] = None,
+        strict: bool = False,
+        n_plus_one_threshold: int = settings.QUERY_N_PLUS_ONE_THRESHOLD,
+    ):
+        self.budget = budget
+        self.strict = strict
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Dict[str, StatementStats] = {}
+
+    def check_budget(self, statement: str) -> None:
+        if self.strict and self.budget is not None and self.count >= self.budget:
+            raise QueryBudgetExceeded(
+                f"Query budget of {self.budget} exceeded by: {statement[:200]}"
+                + "".join(f"\n  {count} x {sql[:200]}" for sql, count in self.top())
+            )
+
+    def record(self, statement: str, parameters, seconds: float, batched: bool = False) -> None:
+        self.count += 1
+        self.seconds += seconds
+        stats = self.statements.get(statement)
+        if stats is None:
+            stats = self.statements[statement] = StatementStats(parameters)
+        elif not batched and not stats.varied and parameters != stats.first_params:
+            stats.varied = True
+        stats.count += 1
+        stats.seconds += seconds
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+    def top(self, limit: int = 5) -> List[Tuple[str, int]]:
+        """Most executed statements with their counts"""
+        ranked = sorted(self.statements.items(), key=lambda item: item[1].count, reverse=True)
+        return [(sql, stats.count) for sql, stats in ranked[:limit]]
+
+    def suspected_n_plus_one(self) -> List[Tuple[str, int]]:
+        """Statements repeated with differing parameters, most frequent first"""
+        return sorted(
+            (
+                (sql, stats.count) for sql, stats in self.statements.items()
+                if stats.varied and stats.count >= self.n_plus_one_threshold
+            ),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.3f};desc="{self.count} queries"'
+
+
+@contextmanager
+def track_queries(
+    budget: Optional[int] = None,
+    strict: bool = False,
+    n_plus_one_threshold: int = settings.QUERY_N_PLUS_ONE_THRESHOLD,
+) -> Iterator[QueryStats]:
+    """Count the queries run inside the block, e.g. to assert on N+1 in tests"""
+    stats = QueryStats(budget, strict, n_plus_one_threshold)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None:
+        stats.check_budget(statement)
+        # Kept on the execution context, so a statement that raises leaves
+        # nothing behind; dialect-internal executions (sequences, defaults)
+        # have no context and use a single slot the next statement overwrites
+        if context is not None:
+            context._query_stats_start = time.perf_counter()
+        else:
+            conn.info["query_stats_start"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    if context is not None:
+        start = getattr(context, "_query_stats_start", None)
+    else:
+        start = conn.info.pop("query_stats_start", None)
+    if start is not None:
+        batched = executemany or (
+            context is not None and context.execute_style is ExecuteStyle.INSERTMANYVALUES
+        )
+        stats.record(statement, parameters, time.perf_counter() - start, batched)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Feed the current `QueryStats` from a (sync) engine's cursor executions"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware tracking the queries of each HTTP request"""
+
+    def __init__(
+        self,
+        app,
+        budget: Optional[int] = None,
+        strict: bool = False,
+        n_plus_one_threshold: int = settings.QUERY_N_PLUS_ONE_THRESHOLD,
+    ):
+        self.app = app
+        self.budget = budget
+        self.strict = strict
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries(self.budget, self.strict, self.n_plus_one_threshold) as stats:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", stats.server_timing().encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                self._report(scope, stats)
+
+    def _report(self, scope, stats: QueryStats) -> None:
+        if not stats.count:
+            return
+        endpoint = f"{scope['method']} {route_template(scope)}"
+        logger.debug("%s: %d queries, %.1fms in the database", endpoint, stats.count, stats.seconds * 1000)
+        for sql, count in stats.suspected_n_plus_one():
+            logger.warning("Suspected N+1 in %s: %d x %s", endpoint, count, sql[:200])
+        if stats.over_budget:
+            logger.warning("%s ran %d queries, over the budget of %d", endpoint, stats.count, stats.budget)
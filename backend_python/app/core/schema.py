@@ -0,0 +1,107 @@
+"""
+In-place upgrades for databases created before a column or index existed.
+
+`Base.metadata.create_all` only creates missing tables, so a column or index
+added to an existing table never reaches older databases. `upgrade_schema`
+adds the columns listed in `ADDED_COLUMNS` (nullable, so a plain
+`ALTER TABLE ... ADD COLUMN` works on SQLite and PostgreSQL), creates every
+missing model index and runs the cheap backfills that keep new columns
+correct for old rows. It is idempotent and runs at startup and in the
+maintenance scripts, after `create_all`. Backfills that rebuild whole derived
+tables stay in scripts/.
+"""
+import logging
+from datetime import timedelta
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import bindparam, inspect, select, text, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateColumn
+
+from .database import Base
+
+logger = logging.getLogger(__name__)
+
+
+def _backfill_session_end_at(conn: Connection) -> int:
+    """Fill sessions.end_at (scheduled_at + duration) where it was never set"""
+    sessions = Base.metadata.tables["sessions"]
+    rows = conn.execute(
+        select(sessions.c.id, sessions.c.scheduled_at, sessions.c.duration).where(
+            sessions.c.end_at.is_(None),
+            sessions.c.scheduled_at.isnot(None),
+            sessions.c.duration.isnot(None),
+            sessions.c.duration != 0,
+        )
+    ).all()
+    if rows:
+        conn.execute(
+            update(sessions).where(sessions.c.id == bindparam("row_id")).values(end_at=bindparam("row_end_at")),
+            [
+                {"row_id": row_id, "row_end_at": scheduled_at + timedelta(minutes=duration)}
+                for row_id, scheduled_at, duration in rows
+            ],
+        )
+    return len(rows)
+
+
+# (table, column) pairs added after the table was first released
+ADDED_COLUMNS: List[Tuple[str, str]] = [
+    ("sessions", "end_at"),
+    ("messages", "conversation_key"),
+    ("invites", "used_by_id"),
+]
+
+# Run on every upgrade; each returns the number of rows it fixed
+BACKFILLS: Dict[str, Callable[[Connection], int]] = {
+    "sessions.end_at": _backfill_session_end_at,
+}
+
+
+def _add_column(conn: Connection, table_name: str, column_name: str) -> None:
+    column = Base.metadata.tables[table_name].c[column_name]
+    preparer = conn.dialect.identifier_preparer
+    ddl = str(CreateColumn(column).compile(dialect=conn.dialect))
+    for foreign_key in column.foreign_keys:
+        target = foreign_key.column
+        ddl += f" REFERENCES {preparer.format_table(target.table)} ({preparer.quote(target.name)})"
+    conn.execute(text(f"ALTER TABLE {preparer.format_table(column.table)} ADD COLUMN {ddl}"))
+
+
+def upgrade_schema(engine: Engine) -> List[str]:
+    """Add missing columns and indexes and run backfills, returns what changed"""
+    applied = []
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        tables = set(inspector.get_table_names())
+        for table_name, column_name in ADDED_COLUMNS:
+            if table_name not in tables:
+                continue  # create_all made it with every column
+            if column_name not in {column["name"] for column in inspector.get_columns(table_name)}:
+                _add_column(conn, table_name, column_name)
+                applied.append(f"added column {table_name}.{column_name}")
+
+        inspector = inspect(conn)  # see the columns just added
+        for table in Base.metadata.sorted_tables:
+            if table.name not in tables:
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for index in table.indexes:
+                if index.name in existing:
+                    continue
+                missing = {column.name for column in index.columns} - columns
+                if missing:
+                    logger.warning("Schema upgrade: %s needs missing columns %s", index.name, sorted(missing))
+                    continue
+                index.create(conn)
+                applied.append(f"created index {index.name}")
+
+        for name, backfill in BACKFILLS.items():
+            count = backfill(conn)
+            if count:
+                applied.append(f"backfilled {name} on {count} rows")
+
+    for change in applied:
+        logger.info("Schema upgrade: %s", change)
+    return applied
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, BigInteger, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class ChainCheckpoint(Base):
+    """Last block an indexer has fully applied, with its hash for reorg detection"""
+    __tablename__ = "chain_checkpoints"
+
+    name = Column(String, primary_key=True)  # indexer name, one row per contract
+    block_number = Column(BigInteger, nullable=False)
+    block_hash = Column(String, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
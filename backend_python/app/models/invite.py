@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Enum, Boolean, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 from app.models.user import UserRole
@@ -12,5 +12,11 @@ class Invite(Base):
     role = Column(Enum(UserRole), nullable=False)
     is_used = Column(Boolean, default=False)
     used_at = Column(DateTime, nullable=True)
+    used_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     expires_at = Column(DateTime, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Expiry sweeps: equality on is_used, range on expires_at
+        Index("ix_invites_is_used_expires_at", "is_used", "expires_at"),
+    )
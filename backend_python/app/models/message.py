@@ -1,14 +1,20 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Index, event
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
+def conversation_key(user_id: int, other_user_id: int) -> str:
+    """Order-independent key of the conversation between two users"""
+    low, high = sorted((user_id, other_user_id))
+    return f"{low}:{high}"
+
 class Message(Base):
     __tablename__ = "messages"
 
     id = Column(Integer, primary_key=True, index=True)
     sender_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     receiver_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    conversation_key = Column(String, nullable=True)  # see conversation_key(), set on insert
     content = Column(String, nullable=False)
     is_read = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -16,3 +22,27 @@ class Message(Base):
     # Relationships
     sender = relationship("User", back_populates="sent_messages", foreign_keys=[sender_id])
     receiver = relationship("User", back_populates="received_messages", foreign_keys=[receiver_id])
+
+    __table_args__ = (
+        # Thread pages: equality on the conversation, keyset on id (newest first)
+        Index("ix_messages_conversation_key_id", "conversation_key", "id"),
+    )
+
+class ConversationMember(Base):
+    """One row per (user, conversation): inbox entry with its unread count"""
+    __tablename__ = "conversation_members"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    conversation_key = Column(String, primary_key=True)
+    other_user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    last_message_id = Column(Integer, ForeignKey("messages.id"), nullable=False)
+    unread_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # Inbox pages: a user's conversations by latest message
+        Index("ix_conversation_members_user_id_last_message_id", "user_id", "last_message_id"),
+    )
+
+@event.listens_for(Message, "before_insert")
+def _set_conversation_key(mapper, connection, target):
+    target.conversation_key = conversation_key(target.sender_id, target.receiver_id)
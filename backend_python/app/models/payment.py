@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Numeric, Enum, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Numeric, Enum, ForeignKey, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -30,3 +30,35 @@ class Payment(Base):
     # Relationships
     session = relationship("Session", back_populates="payments")
     user = relationship("User", back_populates="payments")
+
+    __table_args__ = (
+        Index("ix_payments_user_id_id", "user_id", "id"),
+        Index("ix_payments_session_id", "session_id"),
+        Index("ix_payments_stripe_payment_intent_id", "stripe_payment_intent_id"),
+    )
+
+class PaymentTotalsMixin:
+    """Running totals per payment bucket, maintained by app.services.ledger"""
+    pending_amount = Column(Numeric(12, 2), nullable=False, default=0)  # PENDING + PROCESSING
+    completed_amount = Column(Numeric(12, 2), nullable=False, default=0)
+    refunded_amount = Column(Numeric(12, 2), nullable=False, default=0)
+    pending_count = Column(Integer, nullable=False, default=0)
+    completed_count = Column(Integer, nullable=False, default=0)
+    refunded_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class UserPaymentTotals(PaymentTotalsMixin, Base):
+    __tablename__ = "user_payment_totals"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+
+class SessionPaymentTotals(PaymentTotalsMixin, Base):
+    __tablename__ = "session_payment_totals"
+
+    session_id = Column(Integer, ForeignKey("sessions.id"), primary_key=True)
+
+class MentorPaymentTotals(PaymentTotalsMixin, Base):
+    """Totals of payments for the sessions a user mentored (what they earned)"""
+    __tablename__ = "mentor_payment_totals"
+
+    mentor_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, DateTime, Numeric, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Numeric, Enum, ForeignKey, Index, event
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from datetime import timedelta
 import enum
 
+# Longest bookable session; bounds how far back an overlap search has to look
+MAX_SESSION_MINUTES = 480
+
 class SessionStatus(str, enum.Enum):
     PENDING = "PENDING"
     CONFIRMED = "CONFIRMED"
@@ -23,6 +27,7 @@ class Session(Base):
     scheduled_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
     duration = Column(Integer, nullable=True)  # in minutes
+    end_at = Column(DateTime, nullable=True)  # scheduled_at + duration, kept in sync on flush
     notes = Column(String, nullable=True)
     rating = Column(Integer, nullable=True)  # 1-5 stars
     review = Column(String, nullable=True)
@@ -33,3 +38,19 @@ class Session(Base):
     mentor = relationship("User", back_populates="mentor_sessions", foreign_keys=[mentor_address])
     mentee = relationship("User", back_populates="mentee_sessions", foreign_keys=[mentee_address])
     payments = relationship("Payment", back_populates="session")
+
+    __table_args__ = (
+        # Per-participant listings: equality on address/status, range/order on scheduled_at
+        Index("ix_sessions_mentor_status_scheduled", "mentor_address", "status", "scheduled_at"),
+        Index("ix_sessions_mentee_status_scheduled", "mentee_address", "status", "scheduled_at"),
+        # Overlap checks: range on scheduled_at, end_at read from the index
+        Index("ix_sessions_mentor_scheduled_end", "mentor_address", "scheduled_at", "end_at"),
+    )
+
+@event.listens_for(Session, "before_insert")
+@event.listens_for(Session, "before_update")
+def _set_end_at(mapper, connection, target):
+    if target.scheduled_at is not None and target.duration:
+        target.end_at = target.scheduled_at + timedelta(minutes=target.duration)
+    else:
+        target.end_at = None
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class StripeEvent(Base):
+    """Received Stripe webhook event; the primary key makes delivery idempotent"""
+    __tablename__ = "stripe_events"
+
+    id = Column(String, primary_key=True)  # Stripe event id (evt_...)
+    type = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    stripe_created = Column(Integer, nullable=True)  # event.created, unix seconds
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String, nullable=True)
+    received_at = Column(DateTime(timezone=True), server_default=func.now())
+    processed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # The worker's queue: unprocessed events, oldest first
+        Index("ix_stripe_events_processed_at_created", "processed_at", "stripe_created"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Numeric, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Numeric, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -23,7 +23,7 @@ class User(Base):
     name = Column(String, nullable=False)
     email = Column(String, unique=True, index=True, nullable=True)
     role = Column(Enum(UserRole), nullable=False)
-    reputation = Column(Integer, default=0)
+    reputation = Column(Integer, default=0, nullable=False)
     subscription_tier = Column(Enum(SubscriptionTier), default=SubscriptionTier.FREE)
     subscription_expiry = Column(DateTime, nullable=True)
     bio = Column(String, nullable=True)
@@ -44,3 +44,8 @@ class User(Base):
     notifications = relationship("Notification", back_populates="user")
     sent_messages = relationship("Message", back_populates="sender", foreign_keys="Message.sender_id")
     received_messages = relationship("Message", back_populates="receiver", foreign_keys="Message.receiver_id")
+
+    __table_args__ = (
+        # Matches the directory sort order (reputation DESC, id) used for keyset pagination
+        Index("ix_users_reputation_id", reputation.desc(), id),
+    )
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from app.core.database import Base
+
+class UserSkill(Base):
+    """Normalized skill index, one row per (user, skill) pair"""
+    __tablename__ = "user_skills"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    skill = Column(String, primary_key=True)  # normalized (stripped, lower-cased)
+
+    __table_args__ = (
+        Index("ix_user_skills_skill_user_id", "skill", "user_id"),
+    )
@@ -0,0 +1,48 @@
+from pydantic import BaseModel, EmailStr, Field, model_validator
+from typing import List, Optional
+from datetime import datetime
+from app.models.user import UserRole
+
+# Largest cohort generated in one request
+MAX_BULK_INVITES = 10000
+
+class InviteBulkCreate(BaseModel):
+    role: UserRole
+    emails: Optional[List[EmailStr]] = Field(None, min_length=1, max_length=MAX_BULK_INVITES)  # one invite per email
+    count: Optional[int] = Field(None, ge=1, le=MAX_BULK_INVITES)  # or `count` codes sent to `email`
+    email: Optional[EmailStr] = None
+    expires_in_days: int = Field(30, ge=1, le=365)
+
+    @model_validator(mode="after")
+    def check_recipients(self):
+        if self.emails is None and (self.count is None or self.email is None):
+            raise ValueError("Pass emails, or count with email")
+        if self.emails is not None and self.count is not None:
+            raise ValueError("Pass either emails or count, not both")
+        return self
+
+class InviteCode(BaseModel):
+    email: str
+    code: str
+
+class InviteBulkResponse(BaseModel):
+    created: int
+    role: UserRole
+    expires_at: datetime
+    invites: List[InviteCode]
+
+class InviteRedeem(BaseModel):
+    code: str
+    wallet_address: str
+
+class InviteRedeemResponse(BaseModel):
+    code: str
+    email: str
+    role: UserRole
+    used_at: datetime
+
+class InviteStatusResponse(BaseModel):
+    code: str
+    role: UserRole
+    status: str  # "valid", "used" or "expired"
+    expires_at: datetime
@@ -0,0 +1,75 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional, Sequence
+from datetime import datetime
+from sqlalchemy import select
+from app.models.message import ConversationMember, Message
+from app.models.user import User
+
+class MessageCreate(BaseModel):
+    sender_id: int
+    receiver_id: int
+    content: str = Field(..., min_length=1, max_length=5000)
+
+class MessageResponse(BaseModel):
+    id: int
+    sender_id: int
+    receiver_id: int
+    conversation_key: str
+    content: str
+    is_read: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ConversationResponse(BaseModel):
+    conversation_key: str
+    other_user_id: int
+    other_name: str
+    other_wallet_address: str
+    other_profile_image: Optional[str] = None
+    unread_count: int
+    last_message: MessageResponse
+
+class MessageReadResult(BaseModel):
+    count: int
+    unread: int
+
+class MessageUnreadResponse(BaseModel):
+    user_id: int
+    unread: int
+
+MESSAGE_RESPONSE_FIELDS = tuple(MessageResponse.model_fields)
+MESSAGE_RESPONSE_COLUMNS = tuple(getattr(Message, field) for field in MESSAGE_RESPONSE_FIELDS)
+
+def select_message_response():
+    """SELECT of exactly the MessageResponse columns"""
+    return select(*MESSAGE_RESPONSE_COLUMNS)
+
+def message_row_to_dict(row: Sequence[Any]) -> Dict[str, Any]:
+    """Build a MessageResponse-shaped dict from a row of MESSAGE_RESPONSE_COLUMNS"""
+    return dict(zip(MESSAGE_RESPONSE_FIELDS, row))
+
+CONVERSATION_COLUMNS = (
+    ConversationMember.conversation_key,
+    ConversationMember.other_user_id,
+    User.name.label("other_name"),
+    User.wallet_address.label("other_wallet_address"),
+    User.profile_image.label("other_profile_image"),
+    ConversationMember.unread_count,
+)
+
+def select_conversation_response():
+    """SELECT of inbox entries: member row, other participant and last message in one join"""
+    return (
+        select(*CONVERSATION_COLUMNS, *MESSAGE_RESPONSE_COLUMNS)
+        .join(User, User.id == ConversationMember.other_user_id)
+        .join(Message, Message.id == ConversationMember.last_message_id)
+    )
+
+def conversation_row_to_dict(row: Sequence[Any]) -> Dict[str, Any]:
+    """Build a ConversationResponse-shaped dict from a select_conversation_response() row"""
+    split = len(CONVERSATION_COLUMNS)
+    conversation = {column.key: value for column, value in zip(CONVERSATION_COLUMNS, row[:split])}
+    conversation["last_message"] = message_row_to_dict(row[split:])
+    return conversation
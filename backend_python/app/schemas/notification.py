@@ -0,0 +1,56 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Any, Dict, List, Optional, Sequence
+from datetime import datetime
+from sqlalchemy import select
+from app.models.notification import Notification, NotificationType
+from app.models.user import UserRole
+
+class NotificationResponse(BaseModel):
+    id: int
+    user_id: int
+    type: NotificationType
+    title: str
+    message: str
+    data: Optional[Dict[str, Any]] = None
+    is_read: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class NotificationMarkRead(BaseModel):
+    user_id: int
+    ids: Optional[List[int]] = Field(None, max_length=1000)  # all unread when omitted
+
+class NotificationBroadcast(BaseModel):
+    user_ids: Optional[List[int]] = Field(None, max_length=100000)
+    role: Optional[UserRole] = None  # every active user with this role
+    type: NotificationType = NotificationType.SYSTEM_MESSAGE
+    title: str
+    message: str
+    data: Optional[Dict[str, Any]] = None
+
+    @model_validator(mode="after")
+    def check_recipients(self):
+        if self.user_ids is not None and self.role is not None:
+            raise ValueError("Pass either user_ids or role, not both")
+        return self
+
+class UnreadCountResponse(BaseModel):
+    user_id: int
+    unread: int
+
+class NotificationWriteResult(BaseModel):
+    count: int
+    unread: Optional[int] = None
+
+NOTIFICATION_RESPONSE_FIELDS = tuple(NotificationResponse.model_fields)
+NOTIFICATION_RESPONSE_COLUMNS = tuple(getattr(Notification, field) for field in NOTIFICATION_RESPONSE_FIELDS)
+
+def select_notification_response():
+    """SELECT of exactly the NotificationResponse columns"""
+    return select(*NOTIFICATION_RESPONSE_COLUMNS)
+
+def notification_row_to_dict(row: Sequence[Any]) -> Dict[str, Any]:
+    """Build a NotificationResponse-shaped dict from a row of NOTIFICATION_RESPONSE_COLUMNS"""
+    return dict(zip(NOTIFICATION_RESPONSE_FIELDS, row))
@@ -0,0 +1,62 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional, Sequence
+from decimal import Decimal
+from datetime import datetime
+from sqlalchemy import select
+from app.models.payment import Payment, PaymentStatus
+
+class PaymentCreate(BaseModel):
+    user_id: int
+    session_id: Optional[int] = None
+    amount: Decimal = Field(..., gt=0, max_digits=10, decimal_places=2)
+    currency: str = "USD"
+    status: PaymentStatus = PaymentStatus.PENDING
+    stripe_payment_intent_id: Optional[str] = None
+
+class PaymentStatusUpdate(BaseModel):
+    status: PaymentStatus
+    stripe_charge_id: Optional[str] = None
+
+class PaymentResponse(BaseModel):
+    id: int
+    session_id: Optional[int] = None
+    user_id: int
+    amount: Decimal
+    currency: str
+    status: PaymentStatus
+    stripe_payment_intent_id: Optional[str] = None
+    stripe_charge_id: Optional[str] = None
+    refunded: bool
+    refunded_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class PaymentTotalsResponse(BaseModel):
+    pending_amount: Decimal = Decimal("0")
+    completed_amount: Decimal = Decimal("0")
+    refunded_amount: Decimal = Decimal("0")
+    pending_count: int = 0
+    completed_count: int = 0
+    refunded_count: int = 0
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+PAYMENT_RESPONSE_FIELDS = tuple(PaymentResponse.model_fields)
+PAYMENT_RESPONSE_COLUMNS = tuple(getattr(Payment, field) for field in PAYMENT_RESPONSE_FIELDS)
+
+def select_payment_response():
+    """SELECT of exactly the PaymentResponse columns"""
+    return select(*PAYMENT_RESPONSE_COLUMNS)
+
+def payment_row_to_dict(row: Sequence[Any]) -> Dict[str, Any]:
+    """Build a PaymentResponse-shaped dict from a row of PAYMENT_RESPONSE_COLUMNS"""
+    return dict(zip(PAYMENT_RESPONSE_FIELDS, row))
+
+def payment_to_dict(payment: Payment) -> Dict[str, Any]:
+    """Build a PaymentResponse-shaped dict from a loaded Payment"""
+    return {field: getattr(payment, field) for field in PAYMENT_RESPONSE_FIELDS}
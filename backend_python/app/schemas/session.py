@@ -0,0 +1,88 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Dict, Optional, Sequence
+from decimal import Decimal
+from datetime import datetime, timezone
+from sqlalchemy import select
+from app.models.session import MAX_SESSION_MINUTES, Session, SessionStatus
+from app.models.user import User
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Store datetimes as naive UTC, matching the DateTime columns"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+class SessionCreate(BaseModel):
+    mentor_address: str
+    mentee_address: str
+    scheduled_at: datetime
+    duration: int = Field(60, ge=15, le=MAX_SESSION_MINUTES)  # in minutes
+    price: Optional[Decimal] = None
+    notes: Optional[str] = None
+    session_id: Optional[str] = None  # generated when omitted
+
+    _normalize_scheduled_at = field_validator("scheduled_at")(to_naive_utc)
+
+class SessionUpdate(BaseModel):
+    status: Optional[SessionStatus] = None
+    scheduled_at: Optional[datetime] = None
+    duration: Optional[int] = Field(None, ge=15, le=MAX_SESSION_MINUTES)
+    price: Optional[Decimal] = None
+    notes: Optional[str] = None
+    rating: Optional[int] = Field(None, ge=1, le=5)
+    review: Optional[str] = None
+
+    _normalize_scheduled_at = field_validator("scheduled_at")(to_naive_utc)
+
+class SessionResponse(BaseModel):
+    id: int
+    session_id: str
+    mentor_address: str
+    mentor_name: Optional[str] = None
+    mentee_address: str
+    mentee_name: Optional[str] = None
+    price: Optional[Decimal] = None
+    status: SessionStatus
+    scheduled_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    duration: Optional[int] = None
+    notes: Optional[str] = None
+    rating: Optional[int] = None
+    review: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class SlotCheckResponse(BaseModel):
+    available: bool
+    conflicting_session_id: Optional[str] = None
+
+class FreeSlot(BaseModel):
+    start: datetime
+    end: datetime
+
+# Participant names are joined in the same query instead of lazy-loading relationships
+mentor = User.__table__.alias("mentor")
+mentee = User.__table__.alias("mentee")
+
+SESSION_RESPONSE_FIELDS = tuple(SessionResponse.model_fields)
+SESSION_RESPONSE_COLUMNS = tuple(
+    mentor.c.name.label("mentor_name") if field == "mentor_name"
+    else mentee.c.name.label("mentee_name") if field == "mentee_name"
+    else getattr(Session, field)
+    for field in SESSION_RESPONSE_FIELDS
+)
+
+def select_session_response():
+    """SELECT of the SessionResponse columns, participant names included"""
+    return (
+        select(*SESSION_RESPONSE_COLUMNS)
+        .join(mentor, mentor.c.wallet_address == Session.mentor_address)
+        .join(mentee, mentee.c.wallet_address == Session.mentee_address)
+    )
+
+def session_row_to_dict(row: Sequence[Any]) -> Dict[str, Any]:
+    """Build a SessionResponse-shaped dict from a row of SESSION_RESPONSE_COLUMNS"""
+    return dict(zip(SESSION_RESPONSE_FIELDS, row))
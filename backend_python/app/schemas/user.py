@@ -1,8 +1,11 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Sequence
 from decimal import Decimal
 from datetime import datetime
-from app.models.user import UserRole, SubscriptionTier
+from sqlalchemy import select
+from app.models.user import User, UserRole, SubscriptionTier
+import enum
+import json
 
 class UserBase(BaseModel):
     name: str
@@ -50,3 +53,50 @@ class UserResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    user_id: int
+    wallet_address: str
+    name: str
+    reputation: int
+
+class LeaderboardRank(LeaderboardEntry):
+    role: Optional[UserRole] = None  # board ranked on; None for all roles
+    total: int
+
+class BulkRegisterStatus(str, enum.Enum):
+    CREATED = "created"
+    DUPLICATE = "duplicate"
+    INVALID = "invalid"
+
+class BulkRegisterResult(BaseModel):
+    index: int
+    wallet_address: Optional[str] = None
+    status: BulkRegisterStatus
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+class BulkRegisterResponse(BaseModel):
+    created: int
+    duplicates: int
+    invalid: int
+    results: List[BulkRegisterResult]
+
+# Columns backing UserResponse, in field order; select only these for responses
+USER_RESPONSE_FIELDS = tuple(UserResponse.model_fields)
+USER_RESPONSE_COLUMNS = tuple(getattr(User, field) for field in USER_RESPONSE_FIELDS)
+
+def select_user_response():
+    """SELECT of the UserResponse columns only"""
+    return select(*USER_RESPONSE_COLUMNS)
+
+def user_row_to_dict(row: Sequence[Any]) -> Dict[str, Any]:
+    """Build a UserResponse-shaped dict from a row of USER_RESPONSE_COLUMNS"""
+    data = dict(zip(USER_RESPONSE_FIELDS, row))
+    data["skills"] = json.loads(data["skills"]) if data["skills"] else []
+    return data
+
+def user_to_dict(user: User) -> Dict[str, Any]:
+    """Build a UserResponse-shaped dict from a User instance"""
+    return user_row_to_dict([getattr(user, field) for field in USER_RESPONSE_FIELDS])
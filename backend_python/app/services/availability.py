@@ -0,0 +1,83 @@
+"""
+Mentor availability and double-booking checks.
+
+Every session stores its `end_at`, and no session is longer than
+MAX_SESSION_MINUTES, so any session overlapping [start, end) must begin in
+[start - MAX_SESSION_MINUTES, end). That turns "is this slot free" into a
+bounded range scan of the (mentor_address, scheduled_at, end_at) index whose
+cost depends on the sessions near the slot, not on the mentor's history.
+"""
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.session import MAX_SESSION_MINUTES, Session, SessionStatus
+from app.models.user import User
+
+# Sessions that hold a mentor's time
+BLOCKING_STATUSES = (SessionStatus.PENDING, SessionStatus.CONFIRMED, SessionStatus.COMPLETED)
+
+MAX_SESSION_LENGTH = timedelta(minutes=MAX_SESSION_MINUTES)
+
+
+def _bookings_between(mentor_address: str, start: datetime, end: datetime):
+    """Blocking sessions of a mentor that overlap [start, end)"""
+    return select(Session.id, Session.session_id, Session.scheduled_at, Session.end_at).where(
+        Session.mentor_address == mentor_address,
+        Session.scheduled_at >= start - MAX_SESSION_LENGTH,
+        Session.scheduled_at < end,
+        Session.end_at > start,
+        Session.status.in_(BLOCKING_STATUSES),
+    )
+
+
+async def lock_mentor_schedule(db: AsyncSession, mentor_address: str) -> None:
+    """Serialize bookings for one mentor until the transaction ends
+
+    Takes a row lock on the mentor (SELECT ... FOR UPDATE) on databases that
+    support it; SQLite already serializes writers.
+    """
+    await db.execute(
+        select(User.id).where(User.wallet_address == mentor_address).with_for_update()
+    )
+
+
+async def find_conflict(
+    db: AsyncSession,
+    mentor_address: str,
+    start: datetime,
+    duration: int,
+    exclude_session_id: Optional[int] = None,
+) -> Optional[str]:
+    """session_id of a booking overlapping the slot, or None if it is free"""
+    query = _bookings_between(mentor_address, start, start + timedelta(minutes=duration))
+    if exclude_session_id is not None:
+        query = query.where(Session.id != exclude_session_id)
+    row = (await db.execute(query.limit(1))).first()
+    return row.session_id if row else None
+
+
+async def free_slots(
+    db: AsyncSession,
+    mentor_address: str,
+    start: datetime,
+    end: datetime,
+    min_minutes: int = 60,
+) -> List[Tuple[datetime, datetime]]:
+    """Free intervals of at least `min_minutes` within [start, end)"""
+    bookings = (await db.execute(
+        _bookings_between(mentor_address, start, end).order_by(Session.scheduled_at)
+    )).all()
+
+    free = []
+    cursor = start
+    minimum = timedelta(minutes=min_minutes)
+    for booking in bookings:
+        if booking.scheduled_at - cursor >= minimum:
+            free.append((cursor, booking.scheduled_at))
+        cursor = max(cursor, booking.end_at)
+    if end - cursor >= minimum:
+        free.append((cursor, end))
+    return free
@@ -0,0 +1,323 @@
+"""
+Minimal JSON-RPC access to the WomanTech contract.
+
+`JsonRpcClient` speaks to a node (anvil locally, the BlockDAG RPC in
+deployment) over one pooled HTTP client; a semaphore bounds in-flight calls.
+`RecordedRpc` replays a JSON fixture with the same interface so the indexer
+and the snapshot loader can be exercised without a node, and `RecordingRpc` wraps a live client to
+capture such a fixture.
+
+Only the event and view-function layouts the backend consumes are encoded
+and decoded, by hand, from `contract/src/IWomanTech.sol`.
+"""
+import asyncio
+import itertools
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+import orjson
+
+from app.models.user import UserRole
+from app.utils.keccak import keccak256, to_checksum_address
+
+USER_REGISTERED_TOPIC = "0x" + keccak256(b"UserRegistered(address,uint8,string)").hex()
+MENTORSHIP_CONFIRMED_TOPIC = "0x" + keccak256(
+    b"MentorshipConfirmed(address,address,uint64,uint256)"
+).hex()
+
+TOTAL_USERS_SELECTOR = "0x" + keccak256(b"totalUsers()")[:4].hex()
+GET_USERS_SELECTOR = "0x" + keccak256(b"getUsers(uint256,uint256)")[:4].hex()
+
+# IWomanTech.Role; Unknown (0) never reaches an event
+CHAIN_ROLES = {1: UserRole.MENTOR, 2: UserRole.MENTEE}
+CHAIN_ROLE_IDS = {role: role_id for role_id, role in CHAIN_ROLES.items()}
+
+
+class RPCError(Exception):
+    """Error object returned by the node"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.message = message
+
+
+def to_hex(value: int) -> str:
+    return hex(value)
+
+
+def from_hex(value: str) -> int:
+    return int(value, 16)
+
+
+def _word(data: bytes, index: int) -> bytes:
+    return data[32 * index:32 * index + 32]
+
+
+def decode_address(word: bytes) -> str:
+    return to_checksum_address(word[12:].hex())
+
+
+def decode_uint(word: bytes) -> int:
+    return int.from_bytes(word, "big")
+
+
+def decode_string(data: bytes, offset: int) -> str:
+    length = decode_uint(data[offset:offset + 32])
+    return data[offset + 32:offset + 32 + length].decode("utf-8", errors="replace")
+
+
+def encode_uint(value: int) -> bytes:
+    return value.to_bytes(32, "big")
+
+
+def encode_get_users(offset: int, limit: int) -> str:
+    return GET_USERS_SELECTOR + (encode_uint(offset) + encode_uint(limit)).hex()
+
+
+def decode_users(result: str) -> List[Dict[str, Any]]:
+    """Decode the `User[]` returned by getUsers"""
+    data = bytes.fromhex(result.removeprefix("0x"))
+    array = decode_uint(_word(data, 0))
+    count = decode_uint(data[array:array + 32])
+    heads = array + 32
+    users = []
+    for i in range(count):
+        # (address account, string name, Role role, uint64 reputation, bool registered)
+        start = heads + decode_uint(data[heads + 32 * i:heads + 32 * i + 32])
+        fields = data[start:]
+        users.append({
+            "account": decode_address(_word(fields, 0)),
+            "name": decode_string(fields, decode_uint(_word(fields, 1))),
+            "role": CHAIN_ROLES.get(decode_uint(_word(fields, 2))),
+            "reputation": decode_uint(_word(fields, 3)),
+            "registered": decode_uint(_word(fields, 4)) != 0,
+        })
+    return users
+
+
+def encode_users(users: List[Dict[str, Any]]) -> str:
+    """ABI-encode a `User[]` return value (used to serve fixtures)"""
+    tuples = []
+    for user in users:
+        name = user["name"].encode()
+        tuples.append(
+            bytes(12) + bytes.fromhex(user["account"].removeprefix("0x"))
+            + encode_uint(5 * 32)
+            + encode_uint(CHAIN_ROLE_IDS.get(user["role"], 0))
+            + encode_uint(user["reputation"])
+            + encode_uint(1 if user.get("registered", True) else 0)
+            + encode_uint(len(name)) + name.ljust(-(-len(name) // 32) * 32, b"\0")
+        )
+    offsets, position = [], 32 * len(tuples)
+    for encoded in tuples:
+        offsets.append(encode_uint(position))
+        position += len(encoded)
+    return "0x" + (
+        encode_uint(32) + encode_uint(len(tuples)) + b"".join(offsets) + b"".join(tuples)
+    ).hex()
+
+
+def decode_log(log: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Decode a WomanTech log into a plain dict, None for unknown topics"""
+    topics = log["topics"]
+    data = bytes.fromhex(log["data"].removeprefix("0x"))
+    position = (from_hex(log["blockNumber"]), from_hex(log["logIndex"]))
+    if topics[0] == USER_REGISTERED_TOPIC:
+        # data: role, offset of name, ..., name
+        return {
+            "event": "UserRegistered",
+            "position": position,
+            "account": decode_address(bytes.fromhex(topics[1][2:])),
+            "role": CHAIN_ROLES.get(decode_uint(_word(data, 0))),
+            "name": decode_string(data, decode_uint(_word(data, 1))),
+        }
+    if topics[0] == MENTORSHIP_CONFIRMED_TOPIC:
+        return {
+            "event": "MentorshipConfirmed",
+            "position": position,
+            "mentor": decode_address(bytes.fromhex(topics[1][2:])),
+            "mentee": decode_address(bytes.fromhex(topics[2][2:])),
+            "session_id": from_hex(topics[3]),
+            "reputation": decode_uint(_word(data, 0)),
+        }
+    return None
+
+
+class JsonRpcClient:
+    """Async JSON-RPC client with bounded concurrency"""
+
+    def __init__(self, url: str, max_concurrency: int = 8, timeout: float = 30):
+        self.url = url
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_concurrency),
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._ids = itertools.count(1)
+        self.calls = 0
+
+    async def call(self, method: str, params: Sequence[Any]) -> Any:
+        payload = {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": list(params)}
+        async with self._semaphore:
+            response = await self._client.post(
+                self.url, content=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"}
+            )
+        self.calls += 1
+        response.raise_for_status()
+        body = orjson.loads(response.content)
+        if body.get("error"):
+            raise RPCError(body["error"].get("code", 0), body["error"].get("message", ""))
+        return body["result"]
+
+    async def block_number(self) -> int:
+        return from_hex(await self.call("eth_blockNumber", []))
+
+    async def get_block(self, number: int) -> Optional[Dict[str, Any]]:
+        return await self.call("eth_getBlockByNumber", [to_hex(number), False])
+
+    async def get_logs(
+        self, address: str, from_block: int, to_block: int, topics: List[Any]
+    ) -> List[Dict[str, Any]]:
+        return await self.call("eth_getLogs", [{
+            "address": address,
+            "fromBlock": to_hex(from_block),
+            "toBlock": to_hex(to_block),
+            "topics": topics,
+        }])
+
+    async def eth_call(self, to: str, data: str, block: Optional[int] = None) -> str:
+        return await self.call(
+            "eth_call", [{"to": to, "data": data}, "latest" if block is None else to_hex(block)]
+        )
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class RecordedRpc:
+    """Replays a fixture of blocks, logs and calls through the client interface
+
+    Fixture layout: `{"head": int, "blocks": {"<number>": "<hash>"},
+    "logs": [<raw eth_getLogs entries>], "calls": {"<calldata>": <result or
+    {"error": {...}}>}}`. Blocks missing from the fixture get a stable
+    synthetic hash. Calls that were not recorded are answered from an
+    optional `"users"` list (the contract's users in registration order),
+    failing pages larger than `"max_users_per_call"` the way a node runs
+    out of gas.
+    """
+
+    def __init__(self, fixture: Dict[str, Any]):
+        self.head = fixture["head"]
+        self.blocks = {int(number): block_hash for number, block_hash in fixture.get("blocks", {}).items()}
+        self.logs = fixture.get("logs", [])
+        self.recorded_calls = fixture.get("calls", {})
+        self.users = fixture.get("users")
+        self.max_users_per_call = fixture.get("max_users_per_call")
+        self.calls = 0
+
+    @classmethod
+    def from_file(cls, path: str) -> "RecordedRpc":
+        with open(path, "rb") as f:
+            return cls(orjson.loads(f.read()))
+
+    async def block_number(self) -> int:
+        self.calls += 1
+        return self.head
+
+    async def get_block(self, number: int) -> Optional[Dict[str, Any]]:
+        self.calls += 1
+        if number > self.head:
+            return None
+        block_hash = self.blocks.get(number) or "0x" + keccak256(str(number).encode()).hex()
+        return {"number": to_hex(number), "hash": block_hash}
+
+    async def get_logs(
+        self, address: str, from_block: int, to_block: int, topics: List[Any]
+    ) -> List[Dict[str, Any]]:
+        self.calls += 1
+        wanted = topics[0] if topics else None
+        if isinstance(wanted, str):
+            wanted = [wanted]
+        return [
+            log for log in self.logs
+            if log["address"].lower() == address.lower()
+            and from_block <= from_hex(log["blockNumber"]) <= to_block
+            and (wanted is None or log["topics"][0] in wanted)
+        ]
+
+    async def eth_call(self, to: str, data: str, block: Optional[int] = None) -> str:
+        self.calls += 1
+        if data in self.recorded_calls:
+            result = self.recorded_calls[data]
+            if isinstance(result, dict):
+                raise RPCError(result["error"].get("code", 0), result["error"].get("message", ""))
+            return result
+        if self.users is None:
+            raise RPCError(-32000, f"no recorded response for {data[:10]}")
+        if data == TOTAL_USERS_SELECTOR:
+            return "0x" + encode_uint(len(self.users)).hex()
+        if data.startswith(GET_USERS_SELECTOR):
+            args = bytes.fromhex(data[len(GET_USERS_SELECTOR):])
+            offset, limit = decode_uint(_word(args, 0)), decode_uint(_word(args, 1))
+            page = self.users[offset:offset + limit]
+            if self.max_users_per_call is not None and len(page) > self.max_users_per_call:
+                raise RPCError(-32000, "out of gas")
+            return encode_users(page)
+        raise RPCError(-32000, "execution reverted")
+
+    async def aclose(self) -> None:
+        pass
+
+
+class RecordingRpc:
+    """Wraps a live client and keeps what it returned for `RecordedRpc`"""
+
+    def __init__(self, inner: JsonRpcClient):
+        self.inner = inner
+        self.head = 0
+        self.blocks: Dict[int, str] = {}
+        self.logs: Dict[tuple, Dict[str, Any]] = {}
+        self.calls: Dict[str, Any] = {}
+
+    async def block_number(self) -> int:
+        self.head = await self.inner.block_number()
+        return self.head
+
+    async def get_block(self, number: int) -> Optional[Dict[str, Any]]:
+        block = await self.inner.get_block(number)
+        if block is not None:
+            self.blocks[number] = block["hash"]
+        return block
+
+    async def get_logs(
+        self, address: str, from_block: int, to_block: int, topics: List[Any]
+    ) -> List[Dict[str, Any]]:
+        logs = await self.inner.get_logs(address, from_block, to_block, topics)
+        for log in logs:
+            self.logs[(log["blockNumber"], log["logIndex"])] = log
+        return logs
+
+    async def eth_call(self, to: str, data: str, block: Optional[int] = None) -> str:
+        try:
+            result = await self.inner.eth_call(to, data, block)
+        except RPCError as e:
+            self.calls[data] = {"error": {"code": e.code, "message": e.message}}
+            raise
+        self.calls[data] = result
+        return result
+
+    def fixture(self) -> Dict[str, Any]:
+        return {
+            "head": self.head,
+            "blocks": {str(number): block_hash for number, block_hash in sorted(self.blocks.items())},
+            "logs": sorted(
+                self.logs.values(),
+                key=lambda log: (from_hex(log["blockNumber"]), from_hex(log["logIndex"]))
+            ),
+            "calls": self.calls,
+        }
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
@@ -0,0 +1,117 @@
+"""
+Batched chat message writes.
+
+Chat sockets hand each outgoing message to `ChatWriter.submit`, which waits
+until the message is committed. A single background task drains the write
+queue, writing everything that accumulated (up to CHAT_BATCH_SIZE messages)
+in one transaction through `send_messages`, then publishes each message to
+its receiver's chat topic. Under load that turns thousands of single-row
+transactions into a few bulk inserts; when idle a message waits at most
+CHAT_BATCH_LINGER_MS for company.
+
+The write queue is bounded: when it is full `submit` waits, which stops the
+socket from reading further frames and pushes back on the client.
+"""
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.core.broker import chat_topic, get_broker
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.user import User
+from app.services.messaging import send_messages
+
+
+class ChatError(ValueError):
+    """Raised to a submitter whose message was rejected"""
+
+
+class ChatWriter:
+    """Background batcher for chat message inserts"""
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        batch_size: int = settings.CHAT_BATCH_SIZE,
+        linger: float = settings.CHAT_BATCH_LINGER_MS / 1000,
+        queue_size: int = settings.CHAT_WRITE_QUEUE_SIZE,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.linger = linger
+        self.queue_size = queue_size
+        self.written = 0
+        self.batches = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._queue = asyncio.Queue(self.queue_size)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, sender_id: int, receiver_id: int, content: str) -> Dict[str, Any]:
+        """Queue a message and wait until it is committed, returns the stored message"""
+        await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(({"sender_id": sender_id, "receiver_id": receiver_id, "content": content}, future))
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            if self._queue.empty() and self.linger:
+                await asyncio.sleep(self.linger)
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        accepted = []
+        try:
+            async with self.session_factory() as db:
+                user_ids = {message[key] for message, _ in batch for key in ("sender_id", "receiver_id")}
+                active = set(await db.scalars(
+                    select(User.id).where(User.id.in_(user_ids), User.is_active == True)
+                ))
+                for message, future in batch:
+                    if message["sender_id"] in active and message["receiver_id"] in active:
+                        accepted.append((message, future))
+                    elif not future.done():
+                        future.set_exception(ChatError("Unknown recipient"))
+                created = await db.run_sync(send_messages, [message for message, _ in accepted])
+                await db.commit()
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        self.written += len(created)
+        self.batches += 1
+        broker = get_broker()
+        for (_, future), message in zip(accepted, created):
+            broker.publish(chat_topic(message["receiver_id"]), {"type": "message", "message": message})
+            if not future.done():
+                future.set_result(message)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "written": self.written,
+            "batches": self.batches,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+
+chat_writer = ChatWriter()
@@ -0,0 +1,348 @@
+"""
+Incremental indexer for WomanTech contract events.
+
+Each pass reads the chain head, then walks from the checkpoint to
+`head - confirmations` in windows of `concurrency * batch_blocks` blocks.
+The sub-ranges of a window are fetched with concurrent `eth_getLogs` calls
+(a range the node refuses is split in half and retried), decoded, ordered
+by (block, log index) and applied in one transaction together with the new
+checkpoint, so a crash never leaves the checkpoint ahead of the data.
+
+What is applied:
+- UserRegistered inserts the user if the wallet is unknown; an existing
+  off-chain profile is left untouched.
+- MentorshipConfirmed inserts a COMPLETED session keyed
+  `chain:<mentor>:<mentee>:<sessionId>` (skipped when either side is not a
+  user yet) and sets the mentor's reputation to the event's value.
+
+Reorgs: the checkpoint stores the hash of its block. If the node reports a
+different hash, the next pass restarts `reorg_depth` blocks earlier. Every
+write is idempotent and reputation is absolute, so replaying the canonical
+events converges; rows created only by orphaned events are not deleted,
+which is what `confirmations` guards against.
+"""
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import get_profile_cache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.chain import ChainCheckpoint
+from app.models.session import Session, SessionStatus
+from app.models.user import SubscriptionTier, User
+from app.services.chain import (
+    MENTORSHIP_CONFIRMED_TOPIC,
+    USER_REGISTERED_TOPIC,
+    RPCError,
+    decode_log,
+)
+from app.services.leaderboard import leaderboard
+from app.services.matching import mentor_matcher
+
+logger = logging.getLogger(__name__)
+
+INSERT_CHUNK = 500
+
+
+def chain_session_id(mentor: str, mentee: str, session_id: int) -> str:
+    """Deterministic `sessions.session_id` for an on-chain mentorship"""
+    return f"chain:{mentor}:{mentee}:{session_id}"
+
+
+def _insert(db: AsyncSession):
+    return postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+
+
+def _chunks(rows: List[Dict[str, Any]], size: int = INSERT_CHUNK) -> Iterable[List[Dict[str, Any]]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def chain_user_row(account: str, name: str, role, reputation: int = 0) -> Dict[str, Any]:
+    """`users` row for a wallet first seen on-chain"""
+    return {
+        "wallet_address": account,
+        "name": name or account,
+        "role": role,
+        "reputation": reputation,
+        "subscription_tier": SubscriptionTier.FREE,
+        "skills": "[]",
+        "is_verified": False,
+        "is_active": True,
+    }
+
+
+async def insert_missing_users(db: AsyncSession, rows: List[Dict[str, Any]]) -> Set[str]:
+    """Insert users whose wallet is unknown, returns the wallets inserted"""
+    insert_ = _insert(db)
+    created: Set[str] = set()
+    for chunk in _chunks(rows):
+        created.update(await db.scalars(
+            insert_(User).values(chunk)
+            .on_conflict_do_nothing(index_elements=["wallet_address"])
+            .returning(User.wallet_address)
+        ))
+    return created
+
+
+async def set_reputations(db: AsyncSession, changes: List[Dict[str, Any]]) -> None:
+    """Executemany reputation update from `{"wallet", "new_reputation"}` rows"""
+    if changes:
+        await db.execute(
+            update(User.__table__)
+            .where(User.__table__.c.wallet_address == bindparam("wallet"))
+            .values(reputation=bindparam("new_reputation")),
+            changes,
+        )
+
+
+async def apply_events(db: AsyncSession, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Write decoded events (in chain order) without committing
+
+    Returns counts and the wallets whose user row changed.
+    """
+    insert_ = _insert(db)
+    registrations: Dict[str, Dict[str, Any]] = {}
+    confirmations: List[Dict[str, Any]] = []
+    reputations: Dict[str, int] = {}
+    for event in events:
+        if event["event"] == "UserRegistered":
+            if event["role"] is not None:
+                registrations.setdefault(event["account"], event)
+        else:
+            confirmations.append(event)
+            reputations[event["mentor"]] = event["reputation"]
+
+    created_users = await insert_missing_users(db, [
+        chain_user_row(account, event["name"], event["role"])
+        for account, event in registrations.items()
+    ])
+
+    sessions_created = 0
+    sessions_skipped = 0
+    if confirmations:
+        participants = {e["mentor"] for e in confirmations} | {e["mentee"] for e in confirmations}
+        known = set(await db.scalars(
+            select(User.wallet_address).where(User.wallet_address.in_(participants))
+        ))
+        session_rows = []
+        for event in confirmations:
+            if event["mentor"] not in known or event["mentee"] not in known:
+                sessions_skipped += 1
+                continue
+            session_rows.append({
+                "session_id": chain_session_id(event["mentor"], event["mentee"], event["session_id"]),
+                "mentor_address": event["mentor"],
+                "mentee_address": event["mentee"],
+                "status": SessionStatus.COMPLETED,
+            })
+        for chunk in _chunks(session_rows):
+            sessions_created += len((await db.scalars(
+                insert_(Session).values(chunk)
+                .on_conflict_do_nothing(index_elements=["session_id"])
+                .returning(Session.id)
+            )).all())
+
+    # Only touch rows whose reputation actually differs
+    reputation_changes = []
+    if reputations:
+        current = await db.execute(
+            select(User.wallet_address, User.reputation)
+            .where(User.wallet_address.in_(reputations))
+        )
+        reputation_changes = [
+            {"wallet": wallet, "new_reputation": reputations[wallet]}
+            for wallet, reputation in current
+            if reputation != reputations[wallet]
+        ]
+        await set_reputations(db, reputation_changes)
+
+    return {
+        "users_created": len(created_users),
+        "sessions_created": sessions_created,
+        "sessions_skipped": sessions_skipped,
+        "reputation_updates": len(reputation_changes),
+        "changed_wallets": created_users | {change["wallet"] for change in reputation_changes},
+    }
+
+
+async def save_checkpoint(db: AsyncSession, name: str, block_number: int, block_hash: str) -> None:
+    """Upsert the checkpoint row without committing"""
+    stmt = _insert(db)(ChainCheckpoint).values(
+        name=name, block_number=block_number, block_hash=block_hash
+    )
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["name"],
+        set_={"block_number": stmt.excluded.block_number, "block_hash": stmt.excluded.block_hash},
+    ))
+
+
+async def refresh_user_indexes(db: AsyncSession, wallets: Set[str]) -> None:
+    """Reflect committed user changes in the in-process indexes and cache"""
+    if not wallets:
+        return
+    cache = get_profile_cache()
+    for user in await db.scalars(select(User).where(User.wallet_address.in_(wallets))):
+        await cache.delete(user.wallet_address)
+        mentor_matcher.sync_user(
+            user.id, user.role, user.is_active,
+            json.loads(user.skills) if user.skills else [],
+            user.reputation, user.hourly_rate, user.is_verified
+        )
+        leaderboard.sync_user(
+            user.id, user.role, user.is_active, user.reputation, user.wallet_address, user.name
+        )
+
+
+class ChainIndexer:
+    """Checkpointed, reorg-aware sync of contract events into the database"""
+
+    def __init__(
+        self,
+        rpc,
+        contract_address: str,
+        name: str = "womantech",
+        session_factory=AsyncSessionLocal,
+        start_block: int = settings.CHAIN_START_BLOCK,
+        batch_blocks: int = settings.CHAIN_BATCH_BLOCKS,
+        concurrency: int = settings.CHAIN_CONCURRENCY,
+        confirmations: int = settings.CHAIN_CONFIRMATIONS,
+        reorg_depth: int = settings.CHAIN_REORG_DEPTH,
+        poll_interval: float = settings.CHAIN_POLL_INTERVAL,
+    ):
+        self.rpc = rpc
+        self.contract_address = contract_address
+        self.name = name
+        self.session_factory = session_factory
+        self.start_block = start_block
+        self.batch_blocks = batch_blocks
+        self.concurrency = concurrency
+        self.confirmations = confirmations
+        self.reorg_depth = reorg_depth
+        self.poll_interval = poll_interval
+        self.blocks = 0
+        self.events = 0
+        self.users_created = 0
+        self.sessions_created = 0
+        self.sessions_skipped = 0
+        self.reputation_updates = 0
+        self.range_splits = 0
+        self.rewinds = 0
+        self.errors = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sync_once()
+            except Exception:
+                logger.exception("Chain indexer pass failed")
+                self.errors += 1
+            await asyncio.sleep(self.poll_interval)
+
+    async def _resume_from(self, db: AsyncSession) -> int:
+        checkpoint = await db.get(ChainCheckpoint, self.name)
+        if checkpoint is None:
+            return self.start_block
+        block = await self.rpc.get_block(checkpoint.block_number)
+        if block is not None and block["hash"] == checkpoint.block_hash:
+            return checkpoint.block_number + 1
+        self.rewinds += 1
+        resume = max(self.start_block, checkpoint.block_number - self.reorg_depth + 1)
+        logger.warning(
+            "Checkpoint block %s no longer canonical, replaying from %s",
+            checkpoint.block_number, resume
+        )
+        return resume
+
+    async def _fetch_logs(self, from_block: int, to_block: int) -> List[Dict[str, Any]]:
+        topics = [[USER_REGISTERED_TOPIC, MENTORSHIP_CONFIRMED_TOPIC]]
+        try:
+            return await self.rpc.get_logs(self.contract_address, from_block, to_block, topics)
+        except RPCError:
+            # Result-size or range limits: halve until a single block still fails
+            if from_block == to_block:
+                raise
+            self.range_splits += 1
+            middle = (from_block + to_block) // 2
+            left, right = await asyncio.gather(
+                self._fetch_logs(from_block, middle),
+                self._fetch_logs(middle + 1, to_block),
+            )
+            return left + right
+
+    async def sync_once(self) -> int:
+        """Index up to the confirmed head, returns the number of blocks applied"""
+        target = await self.rpc.block_number() - self.confirmations
+        async with self.session_factory() as db:
+            next_block = await self._resume_from(db)
+
+        applied = 0
+        while next_block <= target:
+            window_end = min(target, next_block + self.batch_blocks * self.concurrency - 1)
+            ranges: List[Tuple[int, int]] = [
+                (start, min(start + self.batch_blocks - 1, window_end))
+                for start in range(next_block, window_end + 1, self.batch_blocks)
+            ]
+            *batches, block = await asyncio.gather(
+                *(self._fetch_logs(start, end) for start, end in ranges),
+                self.rpc.get_block(window_end),
+            )
+            if block is None:
+                break  # node is behind the head it reported
+            events = sorted(
+                (
+                    event for logs in batches for log in logs
+                    if not log.get("removed")
+                    for event in [decode_log(log)] if event is not None
+                ),
+                key=lambda event: event["position"],
+            )
+
+            async with self.session_factory() as db:
+                result = await apply_events(db, events)
+                await save_checkpoint(db, self.name, window_end, block["hash"])
+                await db.commit()
+                await refresh_user_indexes(db, result["changed_wallets"])
+
+            self.blocks += window_end - next_block + 1
+            self.events += len(events)
+            self.users_created += result["users_created"]
+            self.sessions_created += result["sessions_created"]
+            self.sessions_skipped += result["sessions_skipped"]
+            self.reputation_updates += result["reputation_updates"]
+            applied += window_end - next_block + 1
+            next_block = window_end + 1
+        return applied
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "blocks": self.blocks,
+            "events": self.events,
+            "users_created": self.users_created,
+            "sessions_created": self.sessions_created,
+            "sessions_skipped": self.sessions_skipped,
+            "reputation_updates": self.reputation_updates,
+            "range_splits": self.range_splits,
+            "rewinds": self.rewinds,
+            "errors": self.errors,
+        }
@@ -0,0 +1,118 @@
+"""
+Invite codes.
+
+Codes are drawn from an unambiguous alphabet and inserted with
+ON CONFLICT (code) DO NOTHING, so a batch of thousands is written in one
+transaction and the rare collision is simply redrawn. Redemption is a single
+conditional UPDATE ... RETURNING on the unique code index: of several
+concurrent attempts exactly one matches the unused, unexpired row.
+"""
+import secrets
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.invite import Invite
+from app.models.user import UserRole
+
+# No 0/O, 1/I/L: codes get read out and typed by hand
+CODE_ALPHABET = "23456789ABCDEFGHJKMNPQRSTUVWXYZ"
+CODE_LENGTH = 10
+MAX_CODE_ATTEMPTS = 5
+
+
+class InviteUnavailable(ValueError):
+    """Raised when a code cannot be redeemed"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"Invite {reason}")
+        self.reason = reason  # "not found", "already used" or "expired"
+
+
+def generate_code() -> str:
+    return "".join(secrets.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH))
+
+
+def normalize_code(code: str) -> str:
+    return code.strip().upper().replace("-", "")
+
+
+async def create_invites(
+    db: AsyncSession,
+    emails: List[str],
+    role: UserRole,
+    expires_at: datetime,
+) -> List[Tuple[str, str]]:
+    """Insert one invite per email with fresh unique codes, returns (email, code) pairs; caller commits"""
+    if not emails:
+        return []
+    insert_ = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    created: Dict[int, str] = {}
+    pending = list(range(len(emails)))
+    for _ in range(MAX_CODE_ATTEMPTS):
+        codes: Dict[str, int] = {}
+        for index in pending:
+            code = generate_code()
+            while code in codes:
+                code = generate_code()
+            codes[code] = index
+        inserted = await db.execute(
+            insert_(Invite).on_conflict_do_nothing(index_elements=["code"]).returning(Invite.code),
+            [
+                {"email": emails[index], "code": code, "role": role, "is_used": False, "expires_at": expires_at}
+                for code, index in codes.items()
+            ],
+        )
+        for code in inserted.scalars():
+            created[codes[code]] = code
+        pending = [index for index in pending if index not in created]
+        if not pending:
+            return [(emails[index], created[index]) for index in range(len(emails))]
+    raise RuntimeError("Could not draw unique invite codes")
+
+
+async def redeem_invite(db: AsyncSession, code: str, user_id: int, now: Optional[datetime] = None):
+    """Claim an invite for a user in one conditional UPDATE; caller commits
+
+    Returns the claimed invite's (id, email, role, used_at); raises
+    InviteUnavailable with the reason otherwise.
+    """
+    now = now or datetime.utcnow()
+    code = normalize_code(code)
+    claimed = (await db.execute(
+        update(Invite)
+        .where(Invite.code == code, Invite.is_used == False, Invite.expires_at > now)
+        .values(is_used=True, used_at=now, used_by_id=user_id)
+        .returning(Invite.id, Invite.email, Invite.role, Invite.used_at)
+        .execution_options(synchronize_session=False)
+    )).first()
+    if claimed is not None:
+        return claimed
+    # Only the failure path reads the row, to report why
+    invite = (await db.execute(select(Invite.is_used).where(Invite.code == code))).first()
+    if invite is None:
+        raise InviteUnavailable("not found")
+    raise InviteUnavailable("already used" if invite.is_used else "expired")
+
+
+def purge_expired_invites(db: Session, before: datetime, batch_size: int = 1000) -> int:
+    """Delete unused invites that expired before `before`, committing per batch; returns rows deleted"""
+    total = 0
+    while True:
+        batch = (
+            select(Invite.id)
+            .where(Invite.is_used == False, Invite.expires_at < before)
+            .order_by(Invite.expires_at)
+            .limit(batch_size)
+        )
+        deleted = db.execute(
+            delete(Invite).where(Invite.id.in_(batch)).execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
@@ -0,0 +1,153 @@
+"""
+Reputation leaderboard.
+
+Active users are kept in one `SortedList` per role (plus one across all
+roles) keyed on (-reputation, id), the same order as the directory index.
+SortedList is an order-statistic structure: insert, remove, "position of
+this key" and slicing from a position are all O(log n), so top-N pages and
+"what's my rank?" never sort or scan the users table.
+
+Ranks use competition ranking (1, 2, 2, 4): a user's rank is one more than
+the number of users with strictly higher reputation.
+
+Entries are updated in place as users register, change or deactivate (and
+as on-chain reputation is indexed); the board loads itself from the
+database on startup or first use. Like the matching engine, it reflects the
+writes made through this process.
+"""
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User, UserRole
+
+# Board key for the ranking across all roles
+ALL_ROLES = None
+
+
+class Leaderboard:
+    """In-memory, per-role ranking of active users by reputation"""
+
+    def __init__(self):
+        self._boards: Dict[Optional[UserRole], SortedList] = {ALL_ROLES: SortedList()}
+        self._entries: Dict[int, Tuple[UserRole, int]] = {}  # user_id -> (role, reputation)
+        self._profiles: Dict[int, Tuple[str, str]] = {}  # user_id -> (wallet_address, name)
+        self.loaded = False
+        self._load_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _board(self, role: Optional[UserRole]) -> SortedList:
+        board = self._boards.get(role)
+        if board is None:
+            board = self._boards[role] = SortedList()
+        return board
+
+    def upsert(self, user_id: int, role: UserRole, reputation: int, wallet_address: str, name: str) -> None:
+        """Insert or move a user"""
+        reputation = reputation or 0
+        self._profiles[user_id] = (wallet_address, name)
+        if self._entries.get(user_id) == (role, reputation):
+            return
+        self.remove(user_id)
+        self._entries[user_id] = (role, reputation)
+        key = (-reputation, user_id)
+        self._board(role).add(key)
+        self._board(ALL_ROLES).add(key)
+
+    def remove(self, user_id: int) -> None:
+        """Drop a user if present"""
+        entry = self._entries.pop(user_id, None)
+        if entry is None:
+            return
+        role, reputation = entry
+        key = (-reputation, user_id)
+        self._boards[role].discard(key)
+        self._boards[ALL_ROLES].discard(key)
+
+    def sync_user(
+        self,
+        user_id: int,
+        role: UserRole,
+        is_active: bool,
+        reputation: int,
+        wallet_address: str,
+        name: str,
+    ) -> None:
+        """Reflect a user write: rank active users, drop everyone else"""
+        if not self.loaded:
+            return  # picked up by the initial load
+        if is_active:
+            self.upsert(user_id, role, reputation, wallet_address, name)
+        else:
+            self.remove(user_id)
+            self._profiles.pop(user_id, None)
+
+    def total(self, role: Optional[UserRole] = ALL_ROLES) -> int:
+        return len(self._boards.get(role, ()))
+
+    def _entry(self, rank_base: int, reputation: int, user_id: int) -> Dict[str, object]:
+        wallet_address, name = self._profiles[user_id]
+        return {
+            "rank": rank_base,
+            "user_id": user_id,
+            "wallet_address": wallet_address,
+            "name": name,
+            "reputation": reputation,
+        }
+
+    def rank_of_reputation(self, reputation: int, role: Optional[UserRole] = ALL_ROLES) -> int:
+        """Rank a user with `reputation` would have (1 + users with higher reputation)"""
+        return self._boards.get(role, SortedList()).bisect_left((-reputation, 0)) + 1
+
+    def page(self, role: Optional[UserRole] = ALL_ROLES, offset: int = 0, limit: int = 10) -> List[Dict[str, object]]:
+        """`limit` users from position `offset` in ranking order"""
+        board = self._boards.get(role)
+        if not board:
+            return []
+        entries = []
+        rank, previous = 0, None
+        for position, (negated, user_id) in enumerate(board.islice(offset, offset + limit), start=offset):
+            reputation = -negated
+            if reputation != previous:
+                rank = position + 1 if previous is not None else self.rank_of_reputation(reputation, role)
+                previous = reputation
+            entries.append(self._entry(rank, reputation, user_id))
+        return entries
+
+    def rank(self, user_id: int, role: Optional[UserRole] = ALL_ROLES) -> Optional[Dict[str, object]]:
+        """A user's leaderboard entry, None if they are not on that board"""
+        entry = self._entries.get(user_id)
+        if entry is None or (role is not ALL_ROLES and entry[0] != role):
+            return None
+        reputation = entry[1]
+        return self._entry(self.rank_of_reputation(reputation, role), reputation, user_id)
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        """Load every active user from the database on first use"""
+        if self.loaded:
+            return
+        async with self._load_lock:
+            if self.loaded:
+                return
+            result = await db.execute(
+                select(User.id, User.role, User.reputation, User.wallet_address, User.name)
+                .where(User.is_active == True)
+            )
+            rows = result.all()
+            self._entries = {user_id: (role, reputation or 0) for user_id, role, reputation, _, _ in rows}
+            self._profiles = {user_id: (wallet_address, name) for user_id, _, _, wallet_address, name in rows}
+            boards: Dict[Optional[UserRole], list] = {ALL_ROLES: []}
+            for user_id, (role, reputation) in self._entries.items():
+                key = (-reputation, user_id)
+                boards[ALL_ROLES].append(key)
+                boards.setdefault(role, []).append(key)
+            self._boards = {role: SortedList(keys) for role, keys in boards.items()}
+            self.loaded = True
+
+
+leaderboard = Leaderboard()
@@ -0,0 +1,236 @@
+"""
+Payments ledger.
+
+Every payment status change goes through `transition_payment` (or
+`record_payment` on creation), which updates the payment row and the
+running totals in the same transaction: per paying user, per session and
+per mentor of the session (the earning side). Balance reads are then a
+primary-key lookup on `user_payment_totals` / `session_payment_totals` /
+`mentor_payment_totals` instead of a SUM over the payment history.
+Amounts are rounded to cents on every update so SQLite's float arithmetic
+cannot drift.
+
+`rebuild_totals` and `verify_totals` recompute the totals from the raw
+payment rows for reconciliation (see scripts/reconcile_payments.py).
+"""
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.payment import (
+    MentorPaymentTotals,
+    Payment,
+    PaymentStatus,
+    SessionPaymentTotals,
+    UserPaymentTotals,
+)
+from app.models.session import Session as MentorshipSession
+from app.models.user import User
+
+# Which running total a payment in each status counts towards
+BUCKETS = {
+    PaymentStatus.PENDING: "pending",
+    PaymentStatus.PROCESSING: "pending",
+    PaymentStatus.COMPLETED: "completed",
+    PaymentStatus.REFUNDED: "refunded",
+    PaymentStatus.FAILED: None,
+}
+
+ALLOWED_TRANSITIONS = {
+    PaymentStatus.PENDING: {PaymentStatus.PROCESSING, PaymentStatus.COMPLETED, PaymentStatus.FAILED},
+    PaymentStatus.PROCESSING: {PaymentStatus.COMPLETED, PaymentStatus.FAILED},
+    PaymentStatus.COMPLETED: {PaymentStatus.REFUNDED},
+    PaymentStatus.FAILED: set(),
+    PaymentStatus.REFUNDED: set(),
+}
+
+CENT = Decimal("0.01")
+
+TOTAL_COLUMNS = (
+    "pending_amount", "completed_amount", "refunded_amount",
+    "pending_count", "completed_count", "refunded_count",
+)
+
+
+class InvalidTransition(ValueError):
+    """Raised when a payment cannot move to the requested status"""
+
+
+def _deltas(old: Optional[PaymentStatus], new: PaymentStatus, amount: Decimal) -> Dict[str, object]:
+    deltas: Dict[str, object] = {}
+    old_bucket = BUCKETS[old] if old is not None else None
+    new_bucket = BUCKETS[new]
+    if old_bucket == new_bucket:
+        return deltas
+    if old_bucket:
+        deltas[f"{old_bucket}_amount"] = -amount
+        deltas[f"{old_bucket}_count"] = -1
+    if new_bucket:
+        deltas[f"{new_bucket}_amount"] = amount
+        deltas[f"{new_bucket}_count"] = 1
+    return deltas
+
+
+def _add(current, column: str, delta):
+    if not column.endswith("_amount"):
+        return current + delta
+    # Round to cents; "+ 0" turns SQLite's -0.0 into 0.0
+    return func.round(current + delta, 2) + 0
+
+
+def _upsert(dialect: str):
+    return postgresql.insert if dialect == "postgresql" else sqlite.insert
+
+
+async def _apply_deltas(db: AsyncSession, payment_user_id: int, session_id: Optional[int], deltas: Dict[str, object]) -> None:
+    if not deltas:
+        return
+    insert_ = _upsert(db.get_bind().dialect.name)
+    targets = [(UserPaymentTotals, "user_id", payment_user_id)]
+    if session_id is not None:
+        targets.append((SessionPaymentTotals, "session_id", session_id))
+        mentor_id = await db.scalar(
+            select(User.id)
+            .join(MentorshipSession, MentorshipSession.mentor_address == User.wallet_address)
+            .where(MentorshipSession.id == session_id)
+        )
+        if mentor_id is not None:
+            targets.append((MentorPaymentTotals, "mentor_id", mentor_id))
+    for table, key, value in targets:
+        statement = insert_(table).values({key: value, **{column: 0 for column in TOTAL_COLUMNS}, **deltas})
+        statement = statement.on_conflict_do_update(
+            index_elements=[key],
+            set_={
+                **{column: _add(getattr(table, column), column, delta) for column, delta in deltas.items()},
+                "updated_at": func.now(),
+            },
+        )
+        await db.execute(statement)
+
+
+async def record_payment(db: AsyncSession, payment: Payment) -> None:
+    """Add a new payment (already flushed) to the totals; caller commits"""
+    await _apply_deltas(
+        db, payment.user_id, payment.session_id,
+        _deltas(None, payment.status or PaymentStatus.PENDING, payment.amount),
+    )
+
+
+async def transition_payment(
+    db: AsyncSession,
+    payment: Payment,
+    new_status: PaymentStatus,
+    **changes,
+) -> None:
+    """Move a payment to `new_status` and update the totals; caller commits
+
+    The status change is a conditional UPDATE on the current status, so a
+    concurrent transition of the same payment cannot be counted twice.
+    Extra column `changes` (e.g. stripe_charge_id) are written with it.
+    """
+    old_status = payment.status
+    if new_status == old_status and not changes:
+        return
+    if new_status != old_status and new_status not in ALLOWED_TRANSITIONS[old_status]:
+        raise InvalidTransition(f"Cannot move payment from {old_status.value} to {new_status.value}")
+
+    values = dict(changes, status=new_status)
+    if new_status == PaymentStatus.REFUNDED:
+        values.setdefault("refunded", True)
+        values.setdefault("refunded_at", datetime.utcnow())
+    result = await db.execute(
+        update(Payment)
+        .where(Payment.id == payment.id, Payment.status == old_status)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        raise InvalidTransition("Payment status changed concurrently")
+
+    await _apply_deltas(db, payment.user_id, payment.session_id, _deltas(old_status, new_status, payment.amount))
+    # Reflect the UPDATE on the instance without marking it dirty again
+    for column, value in values.items():
+        set_committed_value(payment, column, value)
+
+
+Totals = Dict[int, Dict[str, object]]
+
+
+def compute_totals(db: Session) -> Tuple[Totals, Totals, Totals]:
+    """Totals per user, per session and per mentor computed from the payment rows"""
+    per_user: Totals = defaultdict(lambda: {column: 0 for column in TOTAL_COLUMNS})
+    per_session: Totals = defaultdict(lambda: {column: 0 for column in TOTAL_COLUMNS})
+    per_mentor: Totals = defaultdict(lambda: {column: 0 for column in TOTAL_COLUMNS})
+    rows = db.execute(
+        select(
+            Payment.user_id, Payment.session_id, User.id, Payment.status,
+            func.sum(Payment.amount), func.count()
+        )
+        .outerjoin(MentorshipSession, MentorshipSession.id == Payment.session_id)
+        .outerjoin(User, User.wallet_address == MentorshipSession.mentor_address)
+        .group_by(Payment.user_id, Payment.session_id, User.id, Payment.status)
+    )
+    for user_id, session_id, mentor_id, status, amount, count in rows:
+        bucket = BUCKETS[status or PaymentStatus.PENDING]
+        if not bucket:
+            continue
+        targets = [per_user[user_id]]
+        if session_id is not None:
+            targets.append(per_session[session_id])
+        if mentor_id is not None:
+            targets.append(per_mentor[mentor_id])
+        for totals in targets:
+            totals[f"{bucket}_amount"] += Decimal(str(amount)).quantize(CENT)
+            totals[f"{bucket}_count"] += count
+    return dict(per_user), dict(per_session), dict(per_mentor)
+
+
+def rebuild_totals(db: Session) -> Tuple[int, int, int]:
+    """Replace the totals tables with values recomputed from payments"""
+    per_user, per_session, per_mentor = compute_totals(db)
+    for table, key, totals_by_key in (
+        (UserPaymentTotals, "user_id", per_user),
+        (SessionPaymentTotals, "session_id", per_session),
+        (MentorPaymentTotals, "mentor_id", per_mentor),
+    ):
+        db.execute(delete(table))
+        if totals_by_key:
+            db.execute(insert(table), [{key: owner, **totals} for owner, totals in totals_by_key.items()])
+    db.commit()
+    return len(per_user), len(per_session), len(per_mentor)
+
+
+def _normalize(totals: Dict[str, object]) -> Dict[str, object]:
+    return {
+        column: Decimal(str(totals.get(column) or 0)).quantize(CENT) if column.endswith("_amount")
+        else int(totals.get(column) or 0)
+        for column in TOTAL_COLUMNS
+    }
+
+
+def verify_totals(db: Session) -> List[str]:
+    """Describe every stored total that disagrees with the payment rows"""
+    mismatches = []
+    per_user, per_session, per_mentor = compute_totals(db)
+    for table, key, expected_totals in (
+        (UserPaymentTotals, "user_id", per_user),
+        (SessionPaymentTotals, "session_id", per_session),
+        (MentorPaymentTotals, "mentor_id", per_mentor),
+    ):
+        stored = {
+            getattr(row, key): {column: getattr(row, column) for column in TOTAL_COLUMNS}
+            for row in db.scalars(select(table))
+        }
+        for owner in sorted(stored.keys() | expected_totals.keys()):
+            expected = _normalize(expected_totals.get(owner, {}))
+            actual = _normalize(stored.get(owner, {}))
+            if expected != actual:
+                mismatches.append(f"{table.__tablename__} {key}={owner}: stored {actual}, expected {expected}")
+    return mismatches
@@ -0,0 +1,238 @@
+"""
+Mentor matching engine.
+
+Active mentors are held in compact NumPy arrays: reputation, hourly rate and
+verification flags indexed by slot, plus the mentor x skill one-hot matrix
+stored column-compressed (for each skill, the array of mentor slots having
+it). A mentee is scored against every mentor in one vectorized pass:
+
+    score = 0.6 * skill coverage + 0.3 * reputation / max reputation + 0.1 * verified
+
+where skill coverage is the share of the mentee's skills the mentor has.
+Concatenating the mentee's skill columns and counting slot occurrences
+yields every mentor sharing at least one skill together with the number of
+shared skills, so the arithmetic only runs over those candidates. The
+reputation and verification terms do not depend on the mentee and are kept
+precomputed per slot; rate and exclusion filters set scores to -inf rather
+than compacting the candidate arrays, and `argpartition` picks the top k.
+
+Rows are updated in place as users register, change or deactivate; the
+engine loads itself from the database on first use.
+"""
+import asyncio
+import json
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User, UserRole
+from app.services.skills import normalize_skills
+
+SKILL_WEIGHT = 0.6
+REPUTATION_WEIGHT = 0.3
+VERIFIED_WEIGHT = 0.1
+
+
+class MentorMatcher:
+    """In-memory, vectorized mentor index"""
+
+    def __init__(self, capacity: int = 1024):
+        self._skill_slots: Dict[str, Set[int]] = {}
+        self._skill_columns: Dict[str, np.ndarray] = {}  # cached arrays of _skill_slots
+        self._slot_skills: Dict[int, List[str]] = {}
+        self._slots: Dict[int, int] = {}
+        self._free: List[int] = []
+        self._size = 0
+        self._max_reputation: Optional[float] = 0.0
+        self._base_reputation = 0.0  # top reputation `_base` was computed with
+        self._allocate(capacity)
+        self.loaded = False
+        self._load_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _allocate(self, capacity: int) -> None:
+        size = self._size
+        arrays = {
+            "_reputation": np.zeros(capacity, dtype=np.float32),
+            "_base": np.zeros(capacity, dtype=np.float32),  # mentee-independent score
+            "_hourly_rate": np.full(capacity, np.nan, dtype=np.float32),
+            "_verified": np.zeros(capacity, dtype=bool),
+            "_in_use": np.zeros(capacity, dtype=bool),
+            "_ids": np.zeros(capacity, dtype=np.int64),
+        }
+        for name, array in arrays.items():
+            if size:
+                array[:size] = getattr(self, name)[:size]
+            setattr(self, name, array)
+
+    def _set_skills(self, slot: int, skills: List[str]) -> None:
+        previous = set(self._slot_skills.get(slot, ()))
+        current = set(skills)
+        for skill in previous - current:
+            self._skill_slots[skill].discard(slot)
+            self._skill_columns.pop(skill, None)
+        for skill in current - previous:
+            self._skill_slots.setdefault(skill, set()).add(slot)
+            self._skill_columns.pop(skill, None)
+        if current:
+            self._slot_skills[slot] = skills
+        else:
+            self._slot_skills.pop(slot, None)
+
+    def _skill_column(self, skill: str) -> Optional[np.ndarray]:
+        column = self._skill_columns.get(skill)
+        if column is None:
+            slots = self._skill_slots.get(skill)
+            if not slots:
+                return None
+            column = np.fromiter(slots, dtype=np.int64, count=len(slots))
+            self._skill_columns[skill] = column
+        return column
+
+    def upsert(
+        self,
+        user_id: int,
+        skills: Iterable[str],
+        reputation: int = 0,
+        hourly_rate: Optional[float] = None,
+        is_verified: bool = False,
+    ) -> None:
+        """Add or replace a mentor"""
+        slot = self._slots.get(user_id)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                if self._size == len(self._ids):
+                    self._allocate(self._size * 2)
+                slot = self._size
+                self._size += 1
+            self._slots[user_id] = slot
+        self._set_skills(slot, normalize_skills(skills))
+        if self._max_reputation is not None and self._in_use[slot] and self._reputation[slot] >= self._max_reputation:
+            self._max_reputation = None  # previous maximum may be gone
+        self._reputation[slot] = reputation or 0
+        if self._max_reputation is not None:
+            self._max_reputation = max(self._max_reputation, float(self._reputation[slot]))
+        self._hourly_rate[slot] = np.nan if hourly_rate is None else float(hourly_rate)
+        self._verified[slot] = bool(is_verified)
+        self._in_use[slot] = True
+        self._ids[slot] = user_id
+        # Exact while the top reputation is unchanged; otherwise top_k rebuilds
+        self._base[slot] = self._base_scores(slice(slot, slot + 1), self._base_reputation)[0]
+
+    def remove(self, user_id: int) -> None:
+        """Drop a mentor if present"""
+        slot = self._slots.pop(user_id, None)
+        if slot is None:
+            return
+        self._set_skills(slot, [])
+        self._in_use[slot] = False
+        self._free.append(slot)
+        if self._max_reputation is not None and self._reputation[slot] >= self._max_reputation:
+            self._max_reputation = None
+
+    def sync_user(
+        self,
+        user_id: int,
+        role: UserRole,
+        is_active: bool,
+        skills: Iterable[str],
+        reputation: int = 0,
+        hourly_rate: Optional[float] = None,
+        is_verified: bool = False,
+    ) -> None:
+        """Reflect a user write: index active mentors, drop everyone else"""
+        if not self.loaded:
+            return  # picked up by the initial load
+        if role == UserRole.MENTOR and is_active:
+            self.upsert(user_id, skills, reputation, hourly_rate, is_verified)
+        else:
+            self.remove(user_id)
+
+    def _top_reputation(self) -> float:
+        if self._max_reputation is None:
+            n = self._size
+            self._max_reputation = float(self._reputation[:n].max(initial=0, where=self._in_use[:n]))
+        return self._max_reputation
+
+    def _base_scores(self, slots, top_reputation: float) -> np.ndarray:
+        base = VERIFIED_WEIGHT * self._verified[slots].astype(np.float32)
+        if top_reputation > 0:
+            base += np.float32(REPUTATION_WEIGHT / top_reputation) * self._reputation[slots]
+        return base
+
+    def _refresh_base(self) -> None:
+        top_reputation = self._top_reputation()
+        if top_reputation != self._base_reputation:
+            self._base[:self._size] = self._base_scores(slice(0, self._size), top_reputation)
+            self._base_reputation = top_reputation
+
+    def warm(self) -> None:
+        """Build every skill column and base score ahead of the first query"""
+        for skill in self._skill_slots:
+            self._skill_column(skill)
+        self._refresh_base()
+
+    def top_k(
+        self,
+        skills: Iterable[str],
+        k: int = 20,
+        max_hourly_rate: Optional[float] = None,
+        exclude_id: Optional[int] = None,
+    ) -> List[Tuple[int, float, int]]:
+        """Best `k` mentors for a set of skills as (user_id, score, shared_skills)"""
+        skills = normalize_skills(skills)
+        if not self._slots or k <= 0:
+            return []
+
+        if skills:
+            columns = [column for column in map(self._skill_column, skills) if column is not None]
+            if not columns:
+                return []
+            candidates, shared = np.unique(np.concatenate(columns), return_counts=True)
+        else:
+            candidates = np.flatnonzero(self._in_use[:self._size])
+            shared = np.zeros(len(candidates), dtype=np.int64)
+
+        self._refresh_base()
+        score = self._base[candidates]
+        if skills:
+            score += np.float32(SKILL_WEIGHT / len(skills)) * shared
+        if max_hourly_rate is not None:
+            score[self._hourly_rate[candidates] > max_hourly_rate] = -np.inf  # NaN (no rate) passes
+        if exclude_id is not None and exclude_id in self._slots:
+            score[candidates == self._slots[exclude_id]] = -np.inf
+
+        count = min(k, len(candidates))
+        best = np.argpartition(score, len(score) - count)[len(score) - count:]
+        best = best[score[best] > -np.inf]
+        ids = self._ids[candidates[best]]
+        order = np.lexsort((ids, -score[best]))
+        return [
+            (int(ids[i]), round(float(score[best[i]]), 4), int(shared[best[i]]))
+            for i in order
+        ]
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        """Load every active mentor from the database on first use"""
+        if self.loaded:
+            return
+        async with self._load_lock:
+            if self.loaded:
+                return
+            result = await db.execute(
+                select(User.id, User.skills, User.reputation, User.hourly_rate, User.is_verified)
+                .where(User.role == UserRole.MENTOR, User.is_active == True)
+            )
+            for user_id, skills, reputation, hourly_rate, is_verified in result:
+                self.upsert(user_id, json.loads(skills) if skills else [], reputation, hourly_rate, is_verified)
+            self.warm()
+            self.loaded = True
+
+
+mentor_matcher = MentorMatcher()
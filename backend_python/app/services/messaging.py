@@ -0,0 +1,157 @@
+"""
+Message writes and inbox maintenance.
+
+Each message carries its `conversation_key`, so a thread page is one range
+scan of the (conversation_key, id) index. `conversation_members` holds one
+row per participant and conversation with the id of the latest message and
+the participant's unread count; sending upserts both rows and reading
+decrements by the messages actually flipped, in the same transaction. The
+inbox is then a single indexed join instead of a "latest message per
+conversation" aggregate.
+
+The helpers take a sync Session (callers commit); async handlers call them
+through `AsyncSession.run_sync`.
+"""
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import bindparam, case, delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.message import ConversationMember, Message, conversation_key
+from app.schemas.message import MESSAGE_RESPONSE_COLUMNS, message_row_to_dict
+
+# Rows per member upsert statement, keeps SQLite under its bound-parameter limit
+MEMBER_CHUNK_SIZE = 2000
+
+
+def _upsert_members(db: Session, members: List[Dict[str, Any]]) -> None:
+    insert_ = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    for start in range(0, len(members), MEMBER_CHUNK_SIZE):
+        statement = insert_(ConversationMember).values(members[start:start + MEMBER_CHUNK_SIZE])
+        excluded = statement.excluded
+        db.execute(statement.on_conflict_do_update(
+            index_elements=["user_id", "conversation_key"],
+            set_={
+                # Batches can commit out of id order; never move back to an older message
+                "last_message_id": case(
+                    (excluded.last_message_id > ConversationMember.last_message_id, excluded.last_message_id),
+                    else_=ConversationMember.last_message_id,
+                ),
+                "unread_count": ConversationMember.unread_count + excluded.unread_count,
+            },
+        ))
+
+
+def send_messages(db: Session, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Insert messages (sender_id, receiver_id, content) in one statement
+
+    Updates both participants' inbox rows; returns MessageResponse-shaped
+    dicts in input order.
+    """
+    if not messages:
+        return []
+    rows = [
+        {
+            "sender_id": message["sender_id"],
+            "receiver_id": message["receiver_id"],
+            "content": message["content"],
+            "conversation_key": conversation_key(message["sender_id"], message["receiver_id"]),
+            "is_read": False,
+        }
+        for message in messages
+    ]
+    # Ordered RETURNING would make insertmanyvalues fall back to one INSERT per
+    # row; instead match rows back by content (identical messages are interchangeable)
+    inserted = [
+        message_row_to_dict(row)
+        for row in db.execute(insert(Message).returning(*MESSAGE_RESPONSE_COLUMNS), rows)
+    ]
+    by_content = defaultdict(list)
+    for message in sorted(inserted, key=lambda message: message["id"], reverse=True):
+        by_content[(message["sender_id"], message["receiver_id"], message["content"])].append(message)
+    created = [by_content[(row["sender_id"], row["receiver_id"], row["content"])].pop() for row in rows]
+
+    members: Dict[tuple, Dict[str, Any]] = {}
+    for message in created:
+        for user_id, other_user_id, unread in (
+            (message["sender_id"], message["receiver_id"], 0),
+            (message["receiver_id"], message["sender_id"], 1),
+        ):
+            member = members.setdefault((user_id, message["conversation_key"]), {
+                "user_id": user_id,
+                "conversation_key": message["conversation_key"],
+                "other_user_id": other_user_id,
+                "last_message_id": 0,
+                "unread_count": 0,
+            })
+            member["last_message_id"] = max(member["last_message_id"], message["id"])
+            member["unread_count"] += unread
+    _upsert_members(db, list(members.values()))
+    return created
+
+
+def mark_conversation_read(db: Session, user_id: int, key: str, up_to_id: Optional[int] = None) -> int:
+    """Mark messages received in a conversation read (up to `up_to_id`), returns rows changed"""
+    statement = update(Message).where(
+        Message.conversation_key == key,
+        Message.receiver_id == user_id,
+        Message.is_read == False,
+    )
+    if up_to_id is not None:
+        statement = statement.where(Message.id <= up_to_id)
+    changed = db.execute(statement.values(is_read=True).execution_options(synchronize_session=False)).rowcount
+    if changed:
+        db.execute(
+            update(ConversationMember)
+            .where(ConversationMember.user_id == user_id, ConversationMember.conversation_key == key)
+            .values(unread_count=ConversationMember.unread_count - changed)
+            .execution_options(synchronize_session=False)
+        )
+    return changed
+
+
+def conversation_unread(db: Session, user_id: int, key: str) -> int:
+    return db.scalar(
+        select(ConversationMember.unread_count)
+        .where(ConversationMember.user_id == user_id, ConversationMember.conversation_key == key)
+    ) or 0
+
+
+def rebuild_conversations(db: Session) -> int:
+    """Backfill conversation keys and recompute `conversation_members`, returns rows written"""
+    missing = db.execute(
+        select(Message.id, Message.sender_id, Message.receiver_id).where(Message.conversation_key.is_(None))
+    ).all()
+    if missing:
+        db.connection().execute(
+            update(Message.__table__)
+            .where(Message.__table__.c.id == bindparam("message_id"))
+            .values(conversation_key=bindparam("key")),
+            [{"message_id": id, "key": conversation_key(sender_id, receiver_id)} for id, sender_id, receiver_id in missing],
+        )
+
+    members: Dict[tuple, Dict[str, Any]] = {}
+    unread = defaultdict(int)
+    for key, sender_id, receiver_id, last_id, unread_received in db.execute(
+        select(
+            Message.conversation_key, Message.sender_id, Message.receiver_id,
+            func.max(Message.id),
+            func.sum(case((Message.is_read == False, 1), else_=0)),
+        ).group_by(Message.conversation_key, Message.sender_id, Message.receiver_id)
+    ):
+        unread[(receiver_id, key)] += unread_received or 0
+        for user_id, other_user_id in ((sender_id, receiver_id), (receiver_id, sender_id)):
+            member = members.setdefault((user_id, key), {
+                "user_id": user_id, "conversation_key": key, "other_user_id": other_user_id, "last_message_id": 0,
+            })
+            member["last_message_id"] = max(member["last_message_id"], last_id)
+
+    db.execute(delete(ConversationMember))
+    if members:
+        db.execute(insert(ConversationMember), [
+            dict(member, unread_count=unread[owner]) for owner, member in members.items()
+        ])
+    db.commit()
+    return len(members)
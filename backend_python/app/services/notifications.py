@@ -0,0 +1,191 @@
+"""
+Notification writes and unread counters.
+
+All notification writes go through this module so `notification_counters`
+stays in step with the rows: inserts increment a user's unread count and
+mark-read decrements it by the number of rows actually flipped, in the same
+transaction. The unread badge is then a primary-key lookup instead of a
+COUNT over the user's notifications.
+
+The helpers take a sync Session (callers commit); async handlers call them
+through `AsyncSession.run_sync`. New notifications for users with an open
+stream are published to the broker once the transaction commits.
+"""
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, event, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.broker import get_broker, notification_topic
+from app.models.notification import Notification, NotificationCounter, NotificationType
+from app.models.user import User, UserRole
+from app.schemas.notification import NOTIFICATION_RESPONSE_COLUMNS, notification_row_to_dict
+
+# Rows per counter upsert statement, keeps SQLite under its bound-parameter limit
+COUNTER_CHUNK_SIZE = 5000
+
+
+# Session.info key for notifications to publish after commit
+PENDING_PUBLISH = "pending_notifications"
+
+
+class UnknownUsers(ValueError):
+    """Raised when notification recipients do not exist"""
+
+    def __init__(self, user_ids: List[int]):
+        super().__init__(f"Unknown user ids: {user_ids}")
+        self.user_ids = user_ids
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed(db: Session) -> None:
+    broker = get_broker()
+    for notification in db.info.pop(PENDING_PUBLISH, ()):
+        broker.publish(notification_topic(notification["user_id"]), notification)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_uncommitted(db: Session) -> None:
+    db.info.pop(PENDING_PUBLISH, None)
+
+
+def _insert(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """Bulk insert notification rows, queueing the ones with a live stream for publishing"""
+    broker = get_broker()
+    streaming = {
+        user_id for user_id in {row["user_id"] for row in rows}
+        if broker.has_subscribers(notification_topic(user_id))
+    }
+    if not streaming:
+        db.execute(insert(Notification), rows)
+        return
+    created = db.execute(insert(Notification).returning(*NOTIFICATION_RESPONSE_COLUMNS), rows)
+    db.info.setdefault(PENDING_PUBLISH, []).extend(
+        notification for notification in map(notification_row_to_dict, created)
+        if notification["user_id"] in streaming
+    )
+
+
+def _upsert(db: Session):
+    return postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+
+
+def adjust_unread(db: Session, deltas: Dict[int, int]) -> None:
+    """Add each delta to the user's unread counter, creating missing counters"""
+    rows = [{"user_id": user_id, "unread_count": delta} for user_id, delta in deltas.items() if delta]
+    insert_ = _upsert(db)
+    for start in range(0, len(rows), COUNTER_CHUNK_SIZE):
+        statement = insert_(NotificationCounter).values(rows[start:start + COUNTER_CHUNK_SIZE])
+        db.execute(statement.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={"unread_count": NotificationCounter.unread_count + statement.excluded.unread_count},
+        ))
+
+
+def notify_users(
+    db: Session,
+    user_ids: Iterable[int],
+    type: NotificationType,
+    title: str,
+    message: str,
+    data: Optional[Dict[str, Any]] = None,
+) -> int:
+    """Insert the same notification for every user in one bulk statement, returns rows written"""
+    user_ids = list(dict.fromkeys(user_ids))
+    if not user_ids:
+        return 0
+    _insert(db, [
+        {"user_id": user_id, "type": type, "title": title, "message": message, "data": data, "is_read": False}
+        for user_id in user_ids
+    ])
+    adjust_unread(db, dict.fromkeys(user_ids, 1))
+    return len(user_ids)
+
+
+def notify_active_users(
+    db: Session,
+    user_ids: Iterable[int],
+    type: NotificationType,
+    title: str,
+    message: str,
+    data: Optional[Dict[str, Any]] = None,
+) -> int:
+    """`notify_users` restricted to active users
+
+    Deactivated users are skipped; ids with no user at all raise `UnknownUsers`
+    before anything is written.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    known, active = set(), set()
+    for start in range(0, len(user_ids), COUNTER_CHUNK_SIZE):
+        for user_id, is_active in db.execute(
+            select(User.id, User.is_active).where(User.id.in_(user_ids[start:start + COUNTER_CHUNK_SIZE]))
+        ):
+            known.add(user_id)
+            if is_active:
+                active.add(user_id)
+    unknown = [user_id for user_id in user_ids if user_id not in known]
+    if unknown:
+        raise UnknownUsers(unknown)
+    return notify_users(db, [user_id for user_id in user_ids if user_id in active], type, title, message, data)
+
+
+def add_notifications(db: Session, notifications: List[Dict[str, Any]]) -> int:
+    """Insert individually addressed notifications in one bulk statement"""
+    if not notifications:
+        return 0
+    _insert(db, [dict(notification, is_read=False) for notification in notifications])
+    adjust_unread(db, Counter(notification["user_id"] for notification in notifications))
+    return len(notifications)
+
+
+def notify_role(
+    db: Session,
+    role: Optional[UserRole],
+    type: NotificationType,
+    title: str,
+    message: str,
+    data: Optional[Dict[str, Any]] = None,
+) -> int:
+    """Notify every active user with `role` (everyone when None)"""
+    query = select(User.id).where(User.is_active == True)
+    if role is not None:
+        query = query.where(User.role == role)
+    return notify_users(db, db.scalars(query), type, title, message, data)
+
+
+def mark_read(db: Session, user_id: int, notification_ids: Optional[Iterable[int]] = None) -> int:
+    """Mark some (or, without ids, all) of a user's notifications read, returns rows changed"""
+    statement = update(Notification).where(Notification.user_id == user_id, Notification.is_read == False)
+    if notification_ids is not None:
+        statement = statement.where(Notification.id.in_(list(notification_ids)))
+    changed = db.execute(statement.values(is_read=True).execution_options(synchronize_session=False)).rowcount
+    if changed:
+        adjust_unread(db, {user_id: -changed})
+    return changed
+
+
+def unread_count(db: Session, user_id: int) -> int:
+    """A user's unread notification count from the maintained counter"""
+    return db.scalar(
+        select(NotificationCounter.unread_count).where(NotificationCounter.user_id == user_id)
+    ) or 0
+
+
+def rebuild_unread_counters(db: Session) -> int:
+    """Recompute every counter from the notification rows, returns counters written"""
+    rows = [
+        {"user_id": user_id, "unread_count": count}
+        for user_id, count in db.execute(
+            select(Notification.user_id, func.count())
+            .where(Notification.is_read == False)
+            .group_by(Notification.user_id)
+        )
+    ]
+    db.execute(delete(NotificationCounter))
+    if rows:
+        db.execute(insert(NotificationCounter), rows)
+    db.commit()
+    return len(rows)
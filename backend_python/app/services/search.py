@@ -0,0 +1,129 @@
+"""
+Ranked full-text search over user name, bio and experience.
+
+SQLite uses an external-content FTS5 table (`users_fts`) kept in sync with
+`users` by triggers; PostgreSQL uses a weighted `tsvector` expression with a
+GIN index, which the database maintains on every write. Both are installed by
+`install_fulltext`, which is safe to run at every startup.
+"""
+import re
+from typing import List, Optional
+
+from sqlalchemy import column, or_, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User, UserRole
+from app.schemas.user import select_user_response
+
+# Name matches outrank bio matches, which outrank experience matches
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE users_fts USING fts5(
+        name, bio, experience,
+        content='users', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, name, bio, experience)
+        VALUES (new.id, new.name, new.bio, new.experience);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, name, bio, experience)
+        VALUES ('delete', old.id, old.name, old.bio, old.experience);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE OF name, bio, experience ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, name, bio, experience)
+        VALUES ('delete', old.id, old.name, old.bio, old.experience);
+        INSERT INTO users_fts(rowid, name, bio, experience)
+        VALUES (new.id, new.name, new.bio, new.experience);
+    END
+    """,
+    "INSERT INTO users_fts(users_fts) VALUES ('rebuild')",
+]
+SQLITE_RANK = "bm25(users_fts, 10.0, 4.0, 1.0)"
+
+POSTGRES_DOCUMENT = (
+    "(setweight(to_tsvector('english', coalesce(users.name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(users.bio, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(users.experience, '')), 'C'))"
+)
+POSTGRES_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_users_fulltext ON users USING GIN ({POSTGRES_DOCUMENT})",
+]
+
+users_fts = table("users_fts", column("rowid"))
+
+
+def install_fulltext(engine: Engine) -> None:
+    """Create the full-text index for the engine's dialect if missing"""
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_fts'"
+            )).first()
+            if not exists:
+                for statement in SQLITE_DDL:
+                    conn.execute(text(statement))
+        elif engine.dialect.name == "postgresql":
+            for statement in POSTGRES_DDL:
+                conn.execute(text(statement))
+
+
+def search_terms(query: str) -> List[str]:
+    """Split free text into search terms"""
+    return re.findall(r"\w+", query)
+
+
+def _fts5_query(terms: List[str]) -> str:
+    # Quote every term so user input can't inject FTS5 syntax; prefix-match the last
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+async def search_users_text(
+    db: AsyncSession,
+    query: str,
+    role: Optional[UserRole] = None,
+    limit: int = 10,
+):
+    """Active users matching every term of `query`, best match first"""
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    dialect = db.get_bind().dialect.name
+    statement = select_user_response().where(User.is_active == True)
+    if role:
+        statement = statement.where(User.role == role)
+
+    if dialect == "sqlite":
+        statement = (
+            statement.join(users_fts, users_fts.c.rowid == User.id)
+            .where(text("users_fts MATCH :fts_query"))
+            .order_by(text(SQLITE_RANK), User.id)
+            .params(fts_query=_fts5_query(terms))
+        )
+    elif dialect == "postgresql":
+        statement = (
+            statement.where(text(f"{POSTGRES_DOCUMENT} @@ plainto_tsquery('english', :fts_query)"))
+            .order_by(text(f"ts_rank({POSTGRES_DOCUMENT}, plainto_tsquery('english', :fts_query)) DESC"), User.id)
+            .params(fts_query=" ".join(terms))
+        )
+    else:
+        # No full-text index for other dialects: fall back to a LIKE scan
+        for term in terms:
+            pattern = f"%{term}%"
+            statement = statement.where(or_(
+                User.name.ilike(pattern), User.bio.ilike(pattern), User.experience.ilike(pattern)
+            ))
+        statement = statement.order_by(User.reputation.desc(), User.id)
+
+    return (await db.execute(statement.limit(limit))).all()
@@ -0,0 +1,73 @@
+"""
+Skill index maintenance and lookup.
+
+`User.skills` keeps the JSON list exactly as the user entered it (for display),
+while `user_skills` holds one normalized row per skill so search can use an
+index instead of a LIKE scan over the JSON text.
+"""
+import json
+from typing import Iterable, List, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.user_skill import UserSkill
+
+
+def normalize_skill(skill: str) -> str:
+    """Normalize a skill name for indexing and matching"""
+    return " ".join(skill.split()).lower()
+
+
+def normalize_skills(skills: Optional[Iterable[str]]) -> List[str]:
+    """Normalize and de-duplicate skill names, preserving order"""
+    seen = {}
+    for skill in skills or []:
+        key = normalize_skill(skill)
+        if key:
+            seen.setdefault(key, None)
+    return list(seen)
+
+
+def parse_skills_param(skills: Optional[str]) -> List[str]:
+    """Parse a comma-separated `skills` query parameter"""
+    if not skills:
+        return []
+    return normalize_skills(skills.split(","))
+
+
+def skill_rows(user_id: int, skills: Optional[Iterable[str]]) -> List[dict]:
+    """`user_skills` rows for a user's skills"""
+    return [{"user_id": user_id, "skill": skill} for skill in normalize_skills(skills)]
+
+
+def set_user_skills(db: Session, user_id: int, skills: Optional[Iterable[str]]) -> None:
+    """Replace the indexed skills of a user (caller commits)"""
+    db.execute(delete(UserSkill).where(UserSkill.user_id == user_id))
+    rows = skill_rows(user_id, skills)
+    if rows:
+        db.execute(insert(UserSkill), rows)
+
+
+def skill_filter(skill_keys: List[str], match_all: bool = False):
+    """Build a `User.id IN (...)` clause for users having any/all of the skills"""
+    matching = select(UserSkill.user_id).where(UserSkill.skill.in_(skill_keys))
+    if match_all and len(skill_keys) > 1:
+        matching = matching.group_by(UserSkill.user_id).having(
+            func.count(UserSkill.skill) == len(skill_keys)
+        )
+    return User.id.in_(matching)
+
+
+def rebuild_skill_index(db: Session) -> int:
+    """Rebuild `user_skills` from the JSON `User.skills` column, returns rows written"""
+    db.execute(delete(UserSkill))
+    rows = []
+    for user_id, skills_json in db.execute(select(User.id, User.skills)):
+        skills = json.loads(skills_json) if skills_json else []
+        rows.extend(skill_rows(user_id, skills))
+    if rows:
+        db.execute(insert(UserSkill), rows)
+    db.commit()
+    return len(rows)
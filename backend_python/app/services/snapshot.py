@@ -0,0 +1,168 @@
+"""
+Full snapshot of on-chain users via `WomanTech.getUsers`.
+
+`UserSnapshotLoader.fetch` pins a block, reads `totalUsers()` and pages
+through `getUsers(offset, limit)` with a small pool of workers sharing one
+work queue. When the node rejects a page (eth_call gas cap, response size
+limit) the page is split in half and the shared page size shrinks, so the
+remaining pages are requested at a size the node accepts.
+
+`diff_users` compares the snapshot with `users` and returns only what
+differs: wallets missing from the database (to insert) and reputations that
+drifted (to update; the contract is authoritative for reputation). Names
+and roles edited off-chain are reported, never overwritten.
+"""
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+import httpx
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.user import User
+from app.services.chain import (
+    TOTAL_USERS_SELECTOR,
+    RPCError,
+    decode_uint,
+    decode_users,
+    encode_get_users,
+)
+from app.services.indexer import chain_user_row, insert_missing_users, set_reputations
+
+LOOKUP_CHUNK = 500
+
+
+class UserSnapshotLoader:
+    """Concurrent, adaptively paged reader of the contract's user list"""
+
+    def __init__(
+        self,
+        rpc,
+        contract_address: str,
+        page_size: int = settings.CHAIN_SNAPSHOT_PAGE_SIZE,
+        workers: int = settings.CHAIN_CONCURRENCY,
+    ):
+        self.rpc = rpc
+        self.contract_address = contract_address
+        self.page_size = page_size
+        self.workers = workers
+        self.pages = 0
+        self.shrinks = 0
+
+    async def total_users(self, block: Optional[int] = None) -> int:
+        result = await self.rpc.eth_call(self.contract_address, TOTAL_USERS_SELECTOR, block)
+        return decode_uint(bytes.fromhex(result.removeprefix("0x")))
+
+    async def _get_page(self, offset: int, limit: int, block: int) -> List[Dict[str, Any]]:
+        result = await self.rpc.eth_call(self.contract_address, encode_get_users(offset, limit), block)
+        self.pages += 1
+        return decode_users(result)
+
+    async def fetch(self, block: Optional[int] = None) -> Tuple[int, List[Dict[str, Any]]]:
+        """All on-chain users in registration order, read at one block"""
+        if block is None:
+            block = await self.rpc.block_number()
+        total = await self.total_users(block)
+        retries: Deque[Tuple[int, int]] = deque()
+        pages: Dict[int, List[Dict[str, Any]]] = {}
+        next_offset = 0
+        in_flight = 0
+        failed = False
+        progress = asyncio.Condition()
+
+        async def claim() -> Optional[Tuple[int, int]]:
+            # Pages in flight may still be split and re-queued, so idle
+            # workers wait for them instead of exiting early
+            nonlocal next_offset, in_flight
+            async with progress:
+                while True:
+                    if failed:
+                        return None
+                    if retries:
+                        page = retries.popleft()
+                    elif next_offset < total:
+                        page = (next_offset, min(self.page_size, total - next_offset))
+                        next_offset += page[1]
+                    elif in_flight == 0:
+                        return None
+                    else:
+                        await progress.wait()
+                        continue
+                    in_flight += 1
+                    return page
+
+        async def worker() -> None:
+            nonlocal in_flight, failed
+            while (page := await claim()) is not None:
+                offset, limit = page
+                try:
+                    pages[offset] = await self._get_page(offset, limit, block)
+                except (RPCError, httpx.HTTPStatusError):
+                    if limit == 1:
+                        failed = True
+                        raise
+                    half = (limit + 1) // 2
+                    self.page_size = min(self.page_size, half)
+                    self.shrinks += 1
+                    retries.extend([(offset, half), (offset + half, limit - half)])
+                except Exception:
+                    failed = True
+                    raise
+                finally:
+                    async with progress:
+                        in_flight -= 1
+                        progress.notify_all()
+
+        await asyncio.gather(*(worker() for _ in range(self.workers)))
+        users = [user for offset in sorted(pages) for user in pages[offset]]
+        return block, users
+
+
+async def diff_users(db: AsyncSession, chain_users: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Minimal changes that bring `users` in line with a chain snapshot"""
+    chain_by_wallet = {
+        user["account"]: user for user in chain_users
+        if user["registered"] and user["role"] is not None
+    }
+    wallets = list(chain_by_wallet)
+    existing: Dict[str, Tuple[str, Any, int]] = {}
+    for start in range(0, len(wallets), LOOKUP_CHUNK):
+        rows = await db.execute(
+            select(User.wallet_address, User.name, User.role, User.reputation)
+            .where(User.wallet_address.in_(wallets[start:start + LOOKUP_CHUNK]))
+        )
+        existing.update((wallet, (name, role, reputation)) for wallet, name, role, reputation in rows)
+
+    inserts = []
+    reputations = []
+    name_mismatches = 0
+    role_mismatches = 0
+    for wallet, user in chain_by_wallet.items():
+        current = existing.get(wallet)
+        if current is None:
+            inserts.append(chain_user_row(wallet, user["name"], user["role"], user["reputation"]))
+            continue
+        name, role, reputation = current
+        if reputation != user["reputation"]:
+            reputations.append({"wallet": wallet, "new_reputation": user["reputation"]})
+        name_mismatches += name != user["name"]
+        role_mismatches += role != user["role"]
+
+    db_total = await db.scalar(select(func.count()).select_from(User))
+    return {
+        "chain_users": len(chain_by_wallet),
+        "inserts": inserts,
+        "reputations": reputations,
+        "name_mismatches": name_mismatches,
+        "role_mismatches": role_mismatches,
+        "db_only": db_total - len(existing),
+    }
+
+
+async def apply_diff(db: AsyncSession, diff: Dict[str, Any]) -> Set[str]:
+    """Write a diff without committing, returns the wallets changed"""
+    created = await insert_missing_users(db, diff["inserts"])
+    await set_reputations(db, diff["reputations"])
+    return created | {change["wallet"] for change in diff["reputations"]}
@@ -0,0 +1,279 @@
+"""
+Stripe webhook ingestion.
+
+The webhook route only verifies the signature and inserts the event into
+`stripe_events` (the event id is the primary key, so redeliveries are
+no-ops), then acks. `StripeEventWorker` drains unprocessed events in batches
+in the background: one query loads every payment the batch refers to, each
+event is applied through the ledger, and the whole batch commits once.
+
+Events referring to a payment that does not exist (yet) are retried up to
+MAX_ATTEMPTS times; events whose status change is not allowed (stale or
+out-of-order deliveries) or whose payload is malformed are marked processed
+with the reason in last_error. The batch is applied in a savepoint; if it
+fails, each event is retried in its own savepoint and the ones that raise
+keep their error. Attempts are counted outside the savepoints, so an event
+that always fails stops being picked up after MAX_ATTEMPTS instead of
+blocking the queue.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+import stripe
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.payment import Payment, PaymentStatus
+from app.models.stripe_event import StripeEvent
+from app.services.ledger import InvalidTransition, transition_payment
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+
+EVENT_STATUSES = {
+    "payment_intent.processing": PaymentStatus.PROCESSING,
+    "payment_intent.succeeded": PaymentStatus.COMPLETED,
+    "payment_intent.payment_failed": PaymentStatus.FAILED,
+    "payment_intent.canceled": PaymentStatus.FAILED,
+    "charge.succeeded": PaymentStatus.COMPLETED,
+    "charge.refunded": PaymentStatus.REFUNDED,
+}
+
+
+class InvalidEvent(ValueError):
+    """Raised for webhook payloads with a bad signature or shape"""
+
+
+def well_formed(event: Any) -> bool:
+    """Whether an event has the id, type and data.object the worker reads"""
+    return (
+        isinstance(event, dict)
+        and isinstance(event.get("id"), str)
+        and isinstance(event.get("type"), str)
+        and isinstance(event.get("data"), dict)
+        and isinstance(event["data"].get("object"), dict)
+    )
+
+
+def parse_event(payload: bytes, signature: Optional[str], secret: str) -> Dict[str, Any]:
+    """Verify a webhook's Stripe-Signature header and decode the event"""
+    if not signature:
+        raise InvalidEvent("Missing Stripe-Signature header")
+    try:
+        stripe.WebhookSignature.verify_header(
+            payload.decode("utf-8"), signature, secret, settings.STRIPE_WEBHOOK_TOLERANCE
+        )
+        event = orjson.loads(payload)
+    except (stripe.SignatureVerificationError, UnicodeDecodeError, orjson.JSONDecodeError) as exc:
+        raise InvalidEvent(str(exc)) from exc
+    if not well_formed(event):
+        raise InvalidEvent("Malformed event")
+    return event
+
+
+async def enqueue_event(db: AsyncSession, event: Dict[str, Any]) -> bool:
+    """Store an event for the worker; False if it was already received. Caller commits"""
+    insert_ = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    result = await db.execute(
+        insert_(StripeEvent)
+        .values(
+            id=event["id"],
+            type=event["type"],
+            payload=event,
+            stripe_created=event.get("created"),
+            attempts=0,
+        )
+        .on_conflict_do_nothing(index_elements=["id"])
+    )
+    return result.rowcount == 1
+
+
+def payment_update(event: Dict[str, Any]) -> Optional[Tuple[str, PaymentStatus, Dict[str, Any]]]:
+    """(payment intent id, new status, extra column changes) for an event, None if irrelevant"""
+    status = EVENT_STATUSES.get(event["type"])
+    if status is None:
+        return None
+    obj = event["data"]["object"]
+    if event["type"].startswith("payment_intent."):
+        intent_id, charge_id = obj.get("id"), obj.get("latest_charge")
+    else:
+        intent_id, charge_id = obj.get("payment_intent"), obj.get("id")
+        if status == PaymentStatus.REFUNDED and not obj.get("refunded"):
+            return None  # partial refund
+    if not intent_id:
+        return None
+
+    changes: Dict[str, Any] = {}
+    if charge_id and status in (PaymentStatus.COMPLETED, PaymentStatus.REFUNDED):
+        changes["stripe_charge_id"] = charge_id
+    if status == PaymentStatus.REFUNDED and event.get("created"):
+        changes["refunded_at"] = datetime.utcfromtimestamp(event["created"])
+    return intent_id, status, changes
+
+
+async def apply_event(db: AsyncSession, event: StripeEvent, payment: Optional[Payment]) -> None:
+    """Apply one stored event to its payment and record the outcome on the event
+
+    The caller has already counted this attempt in `event.attempts`.
+    """
+    if not well_formed(event.payload):
+        event.last_error = "Malformed event"
+        event.processed_at = datetime.utcnow()
+        return
+    update = payment_update(event.payload)
+    if update is not None:
+        intent_id, new_status, changes = update
+        if payment is None:
+            event.last_error = f"No payment for {intent_id}"
+            if event.attempts < MAX_ATTEMPTS:
+                return
+        elif payment.status != new_status:
+            try:
+                if new_status == PaymentStatus.REFUNDED and payment.status in (
+                    PaymentStatus.PENDING, PaymentStatus.PROCESSING
+                ):
+                    # The refund overtook the success event; a refund implies the charge completed
+                    await transition_payment(db, payment, PaymentStatus.COMPLETED)
+                await transition_payment(db, payment, new_status, **changes)
+                event.last_error = None
+            except InvalidTransition as exc:
+                event.last_error = str(exc)
+    event.processed_at = datetime.utcnow()
+
+
+class StripeEventWorker:
+    """Background task draining `stripe_events` in batches"""
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        batch_size: int = settings.STRIPE_EVENT_BATCH_SIZE,
+        poll_interval: float = settings.STRIPE_EVENT_POLL_INTERVAL,
+        linger: float = 0.05,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.linger = linger  # lets a burst of webhooks accumulate into one batch
+        self.processed = 0
+        self.batches = 0
+        self.errors = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def notify(self) -> None:
+        """Wake the worker after new events were committed"""
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                drained = await self.drain_once()
+            except Exception:
+                logger.exception("Failed to apply Stripe event batch")
+                self.errors += 1
+                drained = 0
+            if drained < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                    await asyncio.sleep(self.linger)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def drain_once(self) -> int:
+        """Apply one batch of pending events, returns the number of events handled"""
+        async with self.session_factory() as db:
+            events = (await db.scalars(
+                select(StripeEvent)
+                .where(StripeEvent.processed_at.is_(None), StripeEvent.attempts < MAX_ATTEMPTS)
+                .order_by(StripeEvent.stripe_created, StripeEvent.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )).all()
+            if not events:
+                return 0
+
+            # Counted and flushed before the savepoints, so a rollback keeps them
+            for event in events:
+                event.attempts += 1
+            updates = []
+            for event in events:
+                try:
+                    updates.append(payment_update(event.payload) if well_formed(event.payload) else None)
+                except Exception:
+                    updates.append(None)  # raises again in apply_event, inside a savepoint
+            intent_ids = {update[0] for update in updates if update is not None}
+            payments = {}
+            if intent_ids:
+                for payment in await db.scalars(
+                    select(Payment).where(Payment.stripe_payment_intent_id.in_(intent_ids))
+                ):
+                    payments.setdefault(payment.stripe_payment_intent_id, payment)
+
+            # Rolled back instances are expired; reload them by id, never via attributes
+            event_ids = [event.id for event in events]
+            payment_ids = [payment.id for payment in payments.values()]
+            try:
+                async with db.begin_nested():
+                    for event, update in zip(events, updates):
+                        await apply_event(db, event, payments.get(update[0]) if update else None)
+            except Exception:
+                logger.exception("Stripe event batch failed, applying its events one by one")
+                await self._reload(db, event_ids, payment_ids)
+                for event_id, event, update in zip(event_ids, events, updates):
+                    try:
+                        async with db.begin_nested():
+                            await apply_event(db, event, payments.get(update[0]) if update else None)
+                    except Exception as exc:
+                        self.errors += 1
+                        await self._reload(db, [event_id], payment_ids)
+                        event.last_error = f"{type(exc).__name__}: {exc}"[:500]
+            await db.commit()
+
+        self.processed += len(events)
+        self.batches += 1
+        return len(events)
+
+    @staticmethod
+    async def _reload(db: AsyncSession, event_ids: List[str], payment_ids: List[int]) -> None:
+        """Discard in-memory state a rolled back savepoint left on events and payments"""
+        await db.execute(
+            select(StripeEvent).where(StripeEvent.id.in_(event_ids))
+            .execution_options(populate_existing=True)
+        )
+        if payment_ids:
+            await db.execute(
+                select(Payment).where(Payment.id.in_(payment_ids))
+                .execution_options(populate_existing=True)
+            )
+
+    async def pending(self, db: AsyncSession) -> int:
+        """Events still waiting to be applied"""
+        return await db.scalar(
+            select(func.count()).select_from(StripeEvent)
+            .where(StripeEvent.processed_at.is_(None), StripeEvent.attempts < MAX_ATTEMPTS)
+        )
+
+
+stripe_event_worker = StripeEventWorker()
@@ -0,0 +1,33 @@
+"""
+Weak ETags and conditional GET handling.
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import Response
+
+# Responses carrying an ETag must be revalidated before reuse
+CACHE_CONTROL = "no-cache"
+
+
+def etag_for_bytes(body: bytes) -> str:
+    """Weak ETag from a response body"""
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    """304 response for a matching conditional request"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
@@ -0,0 +1,83 @@
+"""
+Keccak-256 and EIP-55 address checksums.
+
+Ethereum hashes with the original Keccak padding, not NIST SHA3-256, so
+`hashlib.sha3_256` cannot be used. The few hashes the backend needs (event
+topics, function selectors, address checksums) are tiny, so a plain Python
+permutation is fast enough and avoids a native dependency.
+"""
+from typing import List
+
+_RATE = 136  # bytes, 1600-bit state minus 2 * 256-bit capacity
+_MASK = (1 << 64) - 1
+
+_ROUND_CONSTANTS = [
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+]
+
+# Rotation offsets indexed [x][y]
+_ROTATIONS = [
+    [0, 36, 3, 41, 18],
+    [1, 44, 10, 45, 2],
+    [62, 6, 43, 15, 61],
+    [28, 55, 25, 21, 56],
+    [27, 20, 39, 8, 14],
+]
+
+
+def _rotl(value: int, shift: int) -> int:
+    return ((value << shift) | (value >> (64 - shift))) & _MASK if shift else value
+
+
+def _permute(lanes: List[int]) -> List[int]:
+    for round_constant in _ROUND_CONSTANTS:
+        # theta
+        c = [lanes[x] ^ lanes[x + 5] ^ lanes[x + 10] ^ lanes[x + 15] ^ lanes[x + 20] for x in range(5)]
+        d = [c[(x - 1) % 5] ^ _rotl(c[(x + 1) % 5], 1) for x in range(5)]
+        lanes = [lanes[i] ^ d[i % 5] for i in range(25)]
+        # rho and pi
+        b = [0] * 25
+        for x in range(5):
+            for y in range(5):
+                b[y + 5 * ((2 * x + 3 * y) % 5)] = _rotl(lanes[x + 5 * y], _ROTATIONS[x][y])
+        # chi
+        lanes = [
+            b[i] ^ (~b[(i + 1) % 5 + 5 * (i // 5)] & b[(i + 2) % 5 + 5 * (i // 5)])
+            for i in range(25)
+        ]
+        # iota
+        lanes[0] ^= round_constant
+    return lanes
+
+
+def keccak256(data: bytes) -> bytes:
+    """Keccak-256 digest as used by Ethereum"""
+    padded = bytearray(data)
+    padded.append(0x01)
+    padded.extend(b"\x00" * (-len(padded) % _RATE))
+    padded[-1] |= 0x80
+
+    lanes = [0] * 25
+    for offset in range(0, len(padded), _RATE):
+        block = padded[offset:offset + _RATE]
+        for i in range(_RATE // 8):
+            lanes[i] ^= int.from_bytes(block[8 * i:8 * i + 8], "little")
+        lanes = _permute(lanes)
+    return b"".join(lane.to_bytes(8, "little") for lane in lanes[:4])
+
+
+def to_checksum_address(address: str) -> str:
+    """EIP-55 mixed-case form of a hex address"""
+    hex_address = address.lower().removeprefix("0x")
+    if len(hex_address) != 40:
+        raise ValueError(f"Invalid address: {address}")
+    digest = keccak256(hex_address.encode()).hex()
+    return "0x" + "".join(
+        char.upper() if int(digest[i], 16) >= 8 else char
+        for i, char in enumerate(hex_address)
+    )
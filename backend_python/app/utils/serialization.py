@@ -0,0 +1,33 @@
+"""
+Fast JSON encoding for API responses.
+
+Handlers that return large payloads encode straight to bytes with orjson and
+return a `Response`, skipping FastAPI's `jsonable_encoder` pass over the data.
+"""
+from decimal import Decimal
+from typing import Any, Mapping, Optional
+
+import orjson
+from fastapi import Response
+
+
+def _default(obj: Any) -> Any:
+    # Match FastAPI's decimal encoding: int when integral, float otherwise
+    if isinstance(obj, Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode an object to JSON bytes"""
+    return orjson.dumps(obj, default=_default)
+
+
+def json_response(
+    content: Any,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """Build a JSON response from an object or already-encoded bytes"""
+    body = content if isinstance(content, bytes) else dumps(content)
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
@@ -1,21 +1,55 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import AsyncSessionLocal, async_engine, engine, Base
+from app.core.metrics import MetricsMiddleware, metrics
+from app.core import query_stats
+from app.core.schema import upgrade_schema
 
 # Import all models to ensure they're registered
-from app.models import user, session, payment, notification, message, invite
+from app.models import user, user_skill, session, payment, stripe_event, notification, message, invite, chain
 
-from app.api import users, sessions, payments
+from app.api import users, sessions, payments, notifications, messages, invites, webhooks
+from app.services.search import install_fulltext
+from app.services.chain import JsonRpcClient
+from app.services.chat import chat_writer
+from app.services.indexer import ChainIndexer
+from app.services.leaderboard import leaderboard
+from app.services.stripe_events import stripe_event_worker
 
-# Create database tables
+# Create database tables, then bring older databases up to date
 Base.metadata.create_all(bind=engine)
+upgrade_schema(engine)
+install_fulltext(engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with AsyncSessionLocal() as db:
+        await leaderboard.ensure_loaded(db)
+    await stripe_event_worker.start()
+    await chat_writer.start()
+    indexer = None
+    if settings.CHAIN_RPC_URL and settings.CONTRACT_ADDRESS:
+        indexer = ChainIndexer(
+            JsonRpcClient(settings.CHAIN_RPC_URL, settings.CHAIN_CONCURRENCY),
+            settings.CONTRACT_ADDRESS
+        )
+        await indexer.start()
+    app.state.chain_indexer = indexer
+    yield
+    if indexer is not None:
+        await indexer.stop()
+        await indexer.rpc.aclose()
+    await chat_writer.stop()
+    await stripe_event_worker.stop()
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -23,14 +57,35 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://localhost:8080", "http://127.0.0.1:3000", "http://127.0.0.1:8080"],
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag", "Server-Timing"],
 )
 
+if settings.QUERY_STATS_ENABLED:
+    query_stats.instrument_engine(engine)
+    query_stats.instrument_engine(async_engine.sync_engine)
+    app.add_middleware(
+        query_stats.QueryStatsMiddleware,
+        budget=settings.QUERY_BUDGET or None,
+        strict=settings.QUERY_STRICT,
+        n_plus_one_threshold=settings.QUERY_N_PLUS_ONE_THRESHOLD,
+    )
+
+# Outermost, so CORS handling is part of the measured latency
+if settings.METRICS_ENABLED:
+    metrics.instrument_engine("sync", engine)
+    metrics.instrument_engine("async", async_engine.sync_engine)
+    app.add_middleware(MetricsMiddleware, registry=metrics)
+
 # Include routers
 app.include_router(users.router, prefix="/api/users", tags=["users"])
 app.include_router(sessions.router, prefix="/api/sessions", tags=["sessions"])
 app.include_router(payments.router, prefix="/api/payments", tags=["payments"])
+app.include_router(notifications.router, prefix="/api/notifications", tags=["notifications"])
+app.include_router(messages.router, prefix="/api/messages", tags=["messages"])
+app.include_router(invites.router, prefix="/api/invites", tags=["invites"])
+app.include_router(webhooks.router, prefix="/api/webhooks", tags=["webhooks"])
 
 @app.get("/")
 async def root():
@@ -50,6 +105,11 @@ async def health_check():
         "environment": "development"
     }
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
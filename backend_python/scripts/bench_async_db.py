@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Async vs blocking database access benchmark
+
+Serves the same query two ways from `async def` handlers:
+  - blocking: sync SessionLocal-style session (stalls the event loop)
+  - async:    AsyncSession on aiosqlite (query runs off the loop)
+
+SQLite answers in-process, so each query also sleeps `--latency-ms` inside a
+SQL function to stand in for the network round trip to a database server.
+
+Each app is served by uvicorn on a background thread (its own event loop) and
+driven over HTTP at a fixed concurrency, while a probe client times a trivial
+`/ping` route on the same server, i.e. how long unrelated requests wait behind
+database work. Requires httpx.
+
+Usage: python scripts/bench_async_db.py [--users 1000] [--requests 300] [--concurrency 10] [--latency-ms 20]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import socket
+import tempfile
+import threading
+import time
+
+import httpx
+import uvicorn
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, event, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.database import Base
+from app.models import user, user_skill, session, payment, notification, message, invite
+from app.models.user import User, UserRole
+
+def seed(url: str, count: int):
+    """Create the schema and `count` users"""
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    rows = [
+        {
+            "wallet_address": f"0x{i:040x}",
+            "name": f"User {i}",
+            "role": UserRole.MENTOR if i % 3 == 0 else UserRole.MENTEE,
+            "reputation": i % 100,
+            "bio": f"Engineer number {i} who likes topic {i % 97}",
+            "skills": json.dumps(["Python"]),
+        }
+        for i in range(count)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(User), rows)
+    engine.dispose()
+
+def slow_query(latency_ms: float):
+    # Cheap primary-key lookup, so the cost is dominated by the simulated round trip
+    return select(User.name, func.simulated_latency(latency_ms)).where(User.id == 1)
+
+def add_latency_function(engine):
+    """Register simulated_latency(ms) on every new connection"""
+    def simulated_latency(ms):
+        time.sleep(ms / 1000)
+        return 0
+
+    @event.listens_for(engine, "connect")
+    def register(dbapi_connection, connection_record):
+        dbapi_connection.create_function("simulated_latency", 1, simulated_latency)
+
+def build_apps(url: str, pool_size: int, latency_ms: float):
+    """Build one app per access pattern, serving the same query"""
+    # The blocking pool must cover the full concurrency: a request waiting for
+    # a connection would block the loop that has to return one to the pool
+    sync_engine = create_engine(url, pool_size=pool_size)
+    SyncSession = sessionmaker(bind=sync_engine)
+    async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"), pool_size=pool_size)
+    add_latency_function(sync_engine)
+    add_latency_function(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine)
+
+    def get_sync_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    async def ping():
+        return {"pong": True}
+
+    blocking = FastAPI()
+    blocking.get("/ping")(ping)
+
+    @blocking.get("/query")
+    async def blocking_query(db: Session = Depends(get_sync_db)):
+        return {"name": db.execute(slow_query(latency_ms)).scalar()}
+
+    non_blocking = FastAPI()
+    non_blocking.get("/ping")(ping)
+
+    @non_blocking.get("/query")
+    async def async_query(db: AsyncSession = Depends(get_async_db)):
+        return {"name": (await db.execute(slow_query(latency_ms))).scalar()}
+
+    return {"blocking": blocking, "async": non_blocking}, (sync_engine, async_engine)
+
+def serve(app):
+    """Start uvicorn for `app` on a free port in a background thread"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+async def measure(app, total: int, concurrency: int):
+    """Drive `total` requests at `concurrency`, returning throughput and /ping latency"""
+    ping_latencies = []
+    done = asyncio.Event()
+    remaining = iter(range(total))
+    server, thread, base_url = serve(app)
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def worker():
+            for _ in remaining:
+                response = await client.get("/query")
+                response.raise_for_status()
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/ping")
+                ping_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.005)
+
+        await client.get("/query")  # warm up pools
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    server.should_exit = True
+    thread.join()
+    ping_latencies.sort()
+    return {
+        "requests_per_sec": round(total / elapsed, 1),
+        "ping_p50_ms": round(ping_latencies[len(ping_latencies) // 2] * 1000, 2),
+        "ping_p99_ms": round(ping_latencies[max(int(len(ping_latencies) * 0.99) - 1, 0)] * 1000, 2),
+    }
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench.db"
+        seed(url, args.users)
+        apps, (sync_engine, async_engine) = build_apps(url, args.concurrency, args.latency_ms)
+        results = {}
+        for name, app in apps.items():
+            results[name] = await measure(app, args.requests, args.concurrency)
+            print(f"{name:>9}: {results[name]}")
+        sync_engine.dispose()
+        await async_engine.dispose()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
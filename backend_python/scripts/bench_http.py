@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+HTTP benchmark of the main API routes, with regression baselines
+
+Seeds a throwaway SQLite database with synthetic users (see synthetic_data.py),
+starts `main:app` in-process over ASGI (or under uvicorn with --server) and
+drives each route at a fixed concurrency:
+
+  health    GET  /health
+  profile   GET  /api/users/{wallet_address}   (seeded wallets, random order)
+  search    GET  /api/users/search?skills=...  (popular and rare skills, with/without role)
+  register  POST /api/users/register           (a new wallet per request)
+
+Throughput and p50/p95/p99 latency per route are printed and written to
+--output as JSON; each route runs --repeat times and the lowest-p95 run is
+kept. With --baseline the run fails (exit 1) when a route's p95 is more than
+--threshold above the baseline (and at least --min-delta-ms slower), its
+throughput more than --threshold below, or its error rate more than
+--error-tolerance above. On SQLite concurrent registers can hit "database is
+locked", which shows up as a small error rate. Baselines are machine-specific;
+regenerate with --update-baseline on the machine that runs the comparison.
+
+Usage:
+    python scripts/bench_http.py [--users 20000] [--requests 1000] [--concurrency 16] [--server]
+    python scripts/bench_http.py --baseline scripts/baselines/bench_http.json
+    python scripts/bench_http.py --baseline scripts/baselines/bench_http.json --update-baseline
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import socket
+import tempfile
+import threading
+import time
+from hashlib import blake2b
+
+import httpx
+import numpy as np
+
+ROUTES = ("health", "profile", "search", "register")
+SEARCH_SKILLS = ["python", "javascript,react", "kubernetes", "rust", "solidity,web3", "three.js"]
+
+def percentiles(latencies):
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return round(float(p50), 3), round(float(p95), 3), round(float(p99), 3)
+
+def request_factory(route: str, wallets, run_id: str):
+    """Callable issuing one request of `route` on a client"""
+    rng = random.Random(route)
+    counter = iter(range(10 ** 9))
+    if route == "health":
+        return lambda client: client.get("/health")
+    if route == "profile":
+        return lambda client: client.get(f"/api/users/{rng.choice(wallets)}")
+    if route == "search":
+        def search(client):
+            params = {"skills": rng.choice(SEARCH_SKILLS), "limit": 20}
+            if rng.random() < 0.5:
+                params["role"] = "MENTOR"
+            return client.get("/api/users/search", params=params)
+        return search
+    def register(client):
+        n = next(counter)
+        wallet = "0x" + blake2b(f"bench:{run_id}:{n}".encode(), digest_size=20).hexdigest()
+        return client.post("/api/users/register", json={
+            "wallet_address": wallet,
+            "name": f"Bench User {n}",
+            "email": f"bench.{run_id}.{n}@example.com",
+            "role": "MENTEE",
+            "skills": ["Python", "React"],
+        })
+    return register
+
+async def drive(client, make_request, total: int, concurrency: int, warmup: int):
+    """Issue `total` requests from `concurrency` workers, returning route stats"""
+    for _ in range(warmup):
+        await make_request(client)
+    latencies, errors = [], 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await make_request(client)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    p50, p95, p99 = percentiles(latencies)
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": p50,
+        "p95_ms": p95,
+        "p99_ms": p99,
+    }
+
+async def best_of(args, client, make_request):
+    """Lowest-p95 of --repeat runs; scheduler noise only ever adds latency"""
+    runs = []
+    for _ in range(args.repeat):
+        runs.append(await drive(client, make_request, args.requests, args.concurrency, args.warmup))
+    return min(runs, key=lambda stats: stats["p95_ms"])
+
+def serve(app):
+    """Start uvicorn for `app` on a free port in a background thread"""
+    import uvicorn
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+async def benchmark(args, wallets):
+    import main
+
+    run_id = f"{int(time.time())}{os.getpid()}"
+    limits = httpx.Limits(max_connections=args.concurrency)
+    results = {}
+    if args.server:
+        server, thread, base_url = serve(main.app)
+        try:
+            async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+                for route in args.routes:
+                    results[route] = await best_of(args, client, request_factory(route, wallets, run_id))
+                    print(f"{route:>9}: {results[route]}")
+        finally:
+            server.should_exit = True
+            thread.join()
+    else:
+        # Unhandled errors (e.g. SQLite "database is locked") count as 500s
+        transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+        async with main.app.router.lifespan_context(main.app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+                for route in args.routes:
+                    results[route] = await best_of(args, client, request_factory(route, wallets, run_id))
+                    print(f"{route:>9}: {results[route]}")
+    return results
+
+def compare(results, baseline, threshold: float, min_delta_ms: float, error_tolerance: float):
+    """Describe every route that regressed against the baseline"""
+    regressions = []
+    for route, base in baseline["routes"].items():
+        current = results["routes"].get(route)
+        if current is None:
+            continue
+        if current["p95_ms"] > base["p95_ms"] * (1 + threshold) and current["p95_ms"] - base["p95_ms"] >= min_delta_ms:
+            regressions.append(f"{route}: p95 {current['p95_ms']}ms vs baseline {base['p95_ms']}ms")
+        if current["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+            regressions.append(
+                f"{route}: throughput {current['throughput_rps']}/s vs baseline {base['throughput_rps']}/s"
+            )
+        error_rate = current["errors"] / current["requests"]
+        base_rate = base.get("errors", 0) / base["requests"]
+        if error_rate > base_rate + error_tolerance:
+            regressions.append(f"{route}: {error_rate:.1%} errors vs baseline {base_rate:.1%}")
+    return regressions
+
+def run(args):
+    tmp = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_URL"] = f"sqlite:///{tmp.name}/bench.db"
+
+    # Settings and engines read DATABASE_URL at import time
+    from synthetic_data import seed_scale, wallet_for
+    from app.core.database import engine
+    from app.models.user import User
+    from sqlalchemy import select
+
+    if args.users:
+        print(f"🌱 Seeding {args.users:,} users...")
+        seed_scale(args.users, seed=args.seed, sessions_per_mentee=0, notifications_per_user=0)
+    with engine.connect() as conn:
+        wallets = list(conn.scalars(
+            select(User.wallet_address).where(User.is_active == True).limit(args.profiles)
+        ))
+    if not wallets:
+        sys.exit("No users to benchmark against; use --users")
+
+    mode = "uvicorn" if args.server else "asgi"
+    print(f"🏁 {mode}, best of {args.repeat} x {args.requests} requests per route at concurrency {args.concurrency}")
+    routes = asyncio.run(benchmark(args, wallets))
+    results = {
+        "meta": {
+            "mode": mode,
+            "users": args.users,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "machine": f"{platform.machine()} x{os.cpu_count()}",
+        },
+        "routes": routes,
+    }
+    engine.dispose()
+    if tmp is not None:
+        tmp.cleanup()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline and args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"📌 Baseline written to {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold, args.min_delta_ms, args.error_tolerance)
+        if regressions:
+            print("❌ Regressions against baseline:")
+            for regression in regressions:
+                print(f"   {regression}")
+            sys.exit(1)
+        print("✅ No regressions against baseline")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20000, help="synthetic users to seed (0 to use the database as is)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="benchmark this database instead of a temporary SQLite file")
+    parser.add_argument("--requests", type=int, default=1000, help="measured requests per route")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests per route first")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per route, the lowest p95 is kept")
+    parser.add_argument("--profiles", type=int, default=5000, help="distinct wallets requested by the profile route")
+    parser.add_argument("--routes", nargs="+", choices=ROUTES, default=list(ROUTES))
+    parser.add_argument("--server", action="store_true", help="serve with uvicorn over real sockets instead of ASGI")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="overwrite --baseline with this run")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore p95 increases smaller than this")
+    parser.add_argument("--error-tolerance", type=float, default=0.01, help="allowed increase in error rate")
+    run(parser.parse_args())
+
+if __name__ == "__main__":
+    main()
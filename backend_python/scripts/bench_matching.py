@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Mentor matching engine benchmark
+
+Fills a MentorMatcher with synthetic mentors (random skills from a fixed
+vocabulary, reputations, rates) and times top-k queries.
+
+Usage: python scripts/bench_matching.py [--mentors 100000] [--skills 300] [--queries 500] [--k 20]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import statistics
+import time
+
+from app.services.matching import MentorMatcher
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mentors", type=int, default=100000)
+    parser.add_argument("--skills", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = [f"skill-{i}" for i in range(args.skills)]
+    matcher = MentorMatcher()
+
+    start = time.perf_counter()
+    for user_id in range(1, args.mentors + 1):
+        matcher.upsert(
+            user_id,
+            rng.sample(vocabulary, rng.randint(3, 8)),
+            reputation=rng.randint(0, 100),
+            hourly_rate=rng.choice([None, rng.uniform(20, 250)]),
+            is_verified=rng.random() < 0.3,
+        )
+    matcher.warm()  # as ensure_loaded does
+    load_seconds = time.perf_counter() - start
+
+    queries = [rng.sample(vocabulary, rng.randint(1, 6)) for _ in range(args.queries)]
+    timings = []
+    for skills in queries:
+        start = time.perf_counter()
+        matcher.top_k(skills, k=args.k, max_hourly_rate=150)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+
+    print(f"mentors: {len(matcher)}, skills: {args.skills}, load: {load_seconds:.2f}s")
+    print(
+        f"top-{args.k}: p50 {statistics.median(timings):.3f} ms, "
+        f"p99 {timings[int(len(timings) * 0.99) - 1]:.3f} ms, max {timings[-1]:.3f} ms"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+User serialization benchmark
+
+Compares the per-response CPU cost of the previous search serialization
+(full ORM entities -> hand-built dicts -> jsonable_encoder -> JSONResponse)
+with the shared path (projected rows -> user_row_to_dict -> orjson bytes).
+
+Usage: python scripts/bench_serialization.py [--users 100 500] [--repeat 200]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import tempfile
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.database import Base
+from app.models import user, user_skill, session, payment, notification, message, invite
+from app.models.user import User, UserRole
+from app.schemas.user import select_user_response, user_row_to_dict
+from app.utils.serialization import json_response
+
+def legacy_response(db: Session, limit: int) -> bytes:
+    users = db.scalars(select(User).order_by(User.reputation.desc(), User.id).limit(limit)).all()
+    response_users = []
+    for user in users:
+        response_users.append({
+            "id": user.id,
+            "wallet_address": user.wallet_address,
+            "name": user.name,
+            "email": user.email,
+            "role": user.role,
+            "reputation": user.reputation,
+            "subscription_tier": user.subscription_tier,
+            "subscription_expiry": user.subscription_expiry,
+            "bio": user.bio,
+            "skills": json.loads(user.skills) if user.skills else [],
+            "experience": user.experience,
+            "hourly_rate": user.hourly_rate,
+            "profile_image": user.profile_image,
+            "is_verified": user.is_verified,
+            "is_active": user.is_active,
+            "last_active_at": user.last_active_at,
+            "created_at": user.created_at,
+            "updated_at": user.updated_at,
+        })
+    return JSONResponse(jsonable_encoder(response_users)).body
+
+def shared_response(db: Session, limit: int) -> bytes:
+    rows = db.execute(select_user_response().order_by(User.reputation.desc(), User.id).limit(limit)).all()
+    return json_response([user_row_to_dict(row) for row in rows]).body
+
+def seed(engine, count: int):
+    Base.metadata.create_all(bind=engine)
+    rows = [
+        {
+            "wallet_address": f"0x{i:040x}",
+            "name": f"User {i}",
+            "email": f"user{i}@example.com",
+            "role": UserRole.MENTOR,
+            "reputation": i % 100,
+            "bio": "Senior engineer who enjoys mentoring and writing about distributed systems.",
+            "skills": json.dumps(["Python", "AWS", "React", "System Design"]),
+            "experience": "8+ years",
+            "hourly_rate": 150,
+        }
+        for i in range(count)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(User), rows)
+
+def timed(fn, db, limit: int, repeat: int) -> float:
+    fn(db, limit)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(db, limit)
+        db.expunge_all()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        seed(engine, max(args.users))
+        with Session(engine) as db:
+            assert json.loads(legacy_response(db, 10)) == json.loads(shared_response(db, 10))
+            for limit in args.users:
+                legacy = timed(legacy_response, db, limit, args.repeat)
+                shared = timed(shared_response, db, limit, args.repeat)
+                print(f"{limit:>5} users: legacy {legacy:.2f} ms, shared {shared:.2f} ms ({legacy / shared:.1f}x)")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,13 @@
 """
 Demo Data Script for WomanTech Connect MVP
 Creates sample mentees and mentors with realistic profiles
+
+With --scale N, generates N seeded synthetic users and their activity instead
+(see synthetic_data.py):
+    python scripts/demo_data.py --scale 1000000 --workers 8
 """
 
+import argparse
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -14,6 +19,8 @@ from app.models.session import Session, SessionStatus
 from app.models.payment import Payment, PaymentStatus
 from app.models.notification import Notification, NotificationType
 from app.models.message import Message
+from app.services.notifications import add_notifications
+from app.services.skills import set_user_skills
 import json
 from datetime import datetime, timedelta
 import random
@@ -228,6 +235,8 @@ def create_demo_users():
             )
             
             db.add(user)
+            db.flush()
+            set_user_skills(db, user.id, user_data["skills"])
             created_users.append(user)
             print(f"Created user: {user_data['name']} ({user_data['role'].value})")
         
@@ -358,16 +367,14 @@ def create_demo_notifications():
             }
         ]
         
-        created_notifications = []
+        # One bulk insert, unread counters updated alongside
+        count = add_notifications(db, demo_notifications)
         for notif_data in demo_notifications:
-            notification = Notification(**notif_data)
-            db.add(notification)
-            created_notifications.append(notification)
             print(f"Created notification: {notif_data['title']}")
         
         db.commit()
-        print(f"\n✅ Created {len(created_notifications)} demo notifications")
-        return created_notifications
+        print(f"\n✅ Created {count} demo notifications")
+        return demo_notifications
         
     except Exception as e:
         db.rollback()
@@ -376,8 +383,39 @@ def create_demo_notifications():
     finally:
         db.close()
 
+def create_scale_data(args):
+    """Generate synthetic data at scale"""
+    from synthetic_data import seed_scale
+
+    workers = args.workers or (1 if engine.dialect.name == "sqlite" else os.cpu_count())
+    print(f"🚀 Generating {args.scale:,} synthetic users (seed {args.seed}, {workers} workers)...\n")
+    totals = seed_scale(
+        args.scale,
+        seed=args.seed,
+        workers=workers,
+        partition_size=args.partition_size,
+        sessions_per_mentee=args.sessions_per_mentee,
+        messages_per_session=args.messages_per_session,
+        notifications_per_user=args.notifications_per_user,
+    )
+    print(f"\n🎉 Generated {sum(totals.values()):,} rows")
+
 def main():
     """Main function to create all demo data"""
+    parser = argparse.ArgumentParser(description="Create demo data")
+    parser.add_argument("--scale", type=int, help="generate this many synthetic users instead of the demo set")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, help="processes (default: 1 on SQLite, CPU count otherwise)")
+    parser.add_argument("--partition-size", type=int, default=50000, help="users per partition")
+    parser.add_argument("--sessions-per-mentee", type=float, default=3.0)
+    parser.add_argument("--messages-per-session", type=float, default=4.0)
+    parser.add_argument("--notifications-per-user", type=float, default=5.0)
+    args = parser.parse_args()
+
+    if args.scale:
+        create_scale_data(args)
+        return
+
     print("🚀 Creating WomanTech Connect Demo Data...\n")
     
     try:
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Fake Stripe event generator for the webhook pipeline
+
+Creates `--payments` pending payments, then bursts signed payment_intent /
+charge events at POST /api/webhooks/stripe the way Stripe does: every
+payment is processed and then succeeds or fails, some succeeded ones are
+refunded, and a share of the events is delivered twice. Waits for the
+background worker to drain the queue and checks every payment's final status
+and the ledger totals.
+
+By default the app runs in-process (no network) on a temporary SQLite
+database; pass --url to target a running server started with the same
+STRIPE_WEBHOOK_SECRET as --secret.
+
+Usage: python scripts/fake_stripe_events.py [--payments 200] [--duplicates 0.2] [--url http://localhost:8000]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import hashlib
+import hmac
+import json
+import random
+import tempfile
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+def sign(payload: bytes, secret: str, timestamp: int) -> str:
+    """Stripe-Signature header value for a payload"""
+    signed = f"{timestamp}.".encode() + payload
+    signature = hmac.new(secret.encode(), signed, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+def make_event(event_type: str, obj: dict, created: int) -> dict:
+    return {
+        "id": f"evt_{uuid.uuid4().hex[:24]}",
+        "object": "event",
+        "type": event_type,
+        "created": created,
+        "livemode": False,
+        "data": {"object": obj},
+    }
+
+def payment_events(intent_id: str, outcome: str, created: int) -> list:
+    """The events Stripe would send for one payment intent"""
+    charge_id = f"ch_{intent_id[3:]}"
+    events = [make_event("payment_intent.processing", {"id": intent_id, "object": "payment_intent"}, created)]
+    if outcome == "FAILED":
+        events.append(make_event("payment_intent.payment_failed", {"id": intent_id, "object": "payment_intent"}, created + 1))
+        return events
+    events.append(make_event(
+        "payment_intent.succeeded",
+        {"id": intent_id, "object": "payment_intent", "latest_charge": charge_id},
+        created + 1,
+    ))
+    if outcome == "REFUNDED":
+        events.append(make_event(
+            "charge.refunded",
+            {"id": charge_id, "object": "charge", "payment_intent": intent_id, "refunded": True},
+            created + 2,
+        ))
+    return events
+
+class InProcessClient:
+    """Drives the app through FastAPI's TestClient, lifespan (and worker) included"""
+
+    def __init__(self):
+        from fastapi.testclient import TestClient
+        from main import app
+        self.client = TestClient(app)
+        self.client.__enter__()
+
+    def request(self, method: str, path: str, body=None, headers=None):
+        response = self.client.request(method, path, content=body, headers=headers)
+        return response.status_code, response.json()
+
+    def close(self):
+        self.client.__exit__(None, None, None)
+
+class HttpClient:
+    """Drives a running server over HTTP"""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+
+    def request(self, method: str, path: str, body=None, headers=None):
+        request = urllib.request.Request(self.url + path, data=body, method=method, headers=headers or {})
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as exc:
+            return exc.code, json.loads(exc.read())
+
+    def close(self):
+        pass
+
+def post_json(client, path: str, data: dict, headers=None):
+    return client.request("POST", path, json.dumps(data).encode(), {"Content-Type": "application/json", **(headers or {})})
+
+def main():
+    parser = argparse.ArgumentParser(description="Burst fake Stripe events at the webhook")
+    parser.add_argument("--payments", type=int, default=200)
+    parser.add_argument("--duplicates", type=float, default=0.2, help="share of events delivered twice")
+    parser.add_argument("--refunds", type=float, default=0.2, help="share of succeeded payments refunded")
+    parser.add_argument("--failures", type=float, default=0.1, help="share of payments that fail")
+    parser.add_argument("--secret", default="whsec_fake")
+    parser.add_argument("--url", help="running server to target instead of an in-process app")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    if args.url:
+        client = HttpClient(args.url)
+    else:
+        os.environ["STRIPE_WEBHOOK_SECRET"] = args.secret
+        if "DATABASE_URL" not in os.environ:
+            os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/fake_stripe.db"
+        client = InProcessClient()
+
+    try:
+        run = uuid.uuid4().hex[:8]
+        status_code, user_data = post_json(client, "/api/users/register", {
+            "wallet_address": f"0xfake{run}", "name": "Fake Stripe Customer", "role": "MENTEE",
+        })
+        assert status_code == 200, user_data
+
+        expected, events = {}, []
+        created = int(time.time()) - 3600
+        for i in range(args.payments):
+            intent_id = f"pi_{run}{i:08d}"
+            status_code, payment_data = post_json(client, "/api/payments/", {
+                "user_id": user_data["id"], "amount": f"{rng.randint(1000, 20000) / 100:.2f}",
+                "stripe_payment_intent_id": intent_id,
+            })
+            assert status_code == 201, payment_data
+            roll = rng.random()
+            outcome = "FAILED" if roll < args.failures else "REFUNDED" if roll < args.failures + args.refunds else "COMPLETED"
+            expected[payment_data["id"]] = outcome
+            events.extend(payment_events(intent_id, outcome, created + i))
+
+        deliveries = events + [event for event in events if rng.random() < args.duplicates]
+        # Stripe does not guarantee ordering across payment intents
+        rng.shuffle(deliveries)
+        acks, duplicates = [], 0
+        started = time.perf_counter()
+        for event in deliveries:
+            payload = json.dumps(event).encode()
+            headers = {"Content-Type": "application/json", "Stripe-Signature": sign(payload, args.secret, int(time.time()))}
+            sent = time.perf_counter()
+            status_code, ack = client.request("POST", "/api/webhooks/stripe", payload, headers)
+            acks.append(time.perf_counter() - sent)
+            assert status_code == 200, ack
+            duplicates += ack["duplicate"]
+        elapsed = time.perf_counter() - started
+
+        status_code, bad = client.request("POST", "/api/webhooks/stripe", b"{}", {"Stripe-Signature": sign(b"{}", "wrong", int(time.time()))})
+        assert status_code == 400, bad
+
+        deadline = time.monotonic() + args.timeout
+        while True:
+            _, stats = client.request("GET", "/api/webhooks/stripe/stats")
+            if stats["pending"] == 0 or time.monotonic() > deadline:
+                break
+            time.sleep(0.1)
+
+        wrong = []
+        for payment_id, outcome in expected.items():
+            _, payment_data = client.request("GET", f"/api/payments/{payment_id}")
+            if payment_data["status"] != outcome:
+                wrong.append((payment_id, outcome, payment_data["status"]))
+        _, totals = client.request("GET", f"/api/payments/summary/users/{user_data['id']}")
+        counts = {outcome: list(expected.values()).count(outcome) for outcome in ("COMPLETED", "REFUNDED")}
+
+        acks.sort()
+        print(f"Delivered {len(deliveries)} events ({duplicates} duplicates acked) in {elapsed:.2f}s")
+        print(f"Ack latency: p50 {acks[len(acks) // 2] * 1000:.2f} ms, p99 {acks[int(len(acks) * 0.99)] * 1000:.2f} ms")
+        print(f"Worker: {stats}")
+        print(f"Totals: {totals}")
+        if stats["pending"]:
+            print(f"❌ {stats['pending']} events still pending after {args.timeout}s")
+            return 1
+        if wrong:
+            print(f"❌ {len(wrong)} payments in the wrong status, e.g. {wrong[:5]}")
+            return 1
+        if totals["completed_count"] != counts["COMPLETED"] or totals["refunded_count"] != counts["REFUNDED"]:
+            print(f"❌ Ledger totals do not match, expected {counts}")
+            return 1
+        print(f"✅ All {len(expected)} payments reached their expected status")
+        return 0
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
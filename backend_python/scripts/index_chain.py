@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Sync WomanTech contract events into the database.
+
+Runs one indexing pass from the stored checkpoint (or --from-block) up to
+the confirmed head, or keeps polling with --follow. With --fixture the
+events come from a recorded JSON file instead of a node, and --record saves
+whatever a live node returned in that format.
+
+Usage:
+    python scripts/index_chain.py --rpc-url http://127.0.0.1:8545 --contract 0x...
+    python scripts/index_chain.py --fixture scripts/fixtures/womantech_events.json
+    python scripts/index_chain.py --rpc-url ... --contract 0x... --record events.json
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine, Base
+from app.models import user, user_skill, session, payment, notification, message, invite, chain
+from app.services.chain import JsonRpcClient, RecordedRpc, RecordingRpc
+from app.services.indexer import ChainIndexer
+
+FIXTURE_CONTRACT = "0x5FbDB2315678afecb367f032d93F642f64180aa3"  # first anvil deployment
+
+async def run(args):
+    if args.fixture:
+        rpc = RecordedRpc.from_file(args.fixture)
+        contract = args.contract or FIXTURE_CONTRACT
+    else:
+        if not args.rpc_url or not args.contract:
+            sys.exit("--rpc-url and --contract (or CHAIN_RPC_URL / CONTRACT_ADDRESS) are required")
+        rpc = JsonRpcClient(args.rpc_url, args.concurrency)
+        if args.record:
+            rpc = RecordingRpc(rpc)
+        contract = args.contract
+
+    indexer = ChainIndexer(
+        rpc, contract,
+        session_factory=AsyncSessionLocal,
+        start_block=args.from_block,
+        batch_blocks=args.batch_blocks,
+        concurrency=args.concurrency,
+        confirmations=0 if args.fixture else args.confirmations,
+        poll_interval=args.poll_interval,
+    )
+    try:
+        while True:
+            applied = await indexer.sync_once()
+            print(f"✅ Applied {applied} blocks: {indexer.stats()}")
+            if not args.follow:
+                break
+            await asyncio.sleep(args.poll_interval)
+    finally:
+        if args.record:
+            with open(args.record, "wb") as f:
+                f.write(orjson.dumps(rpc.fixture(), option=orjson.OPT_INDENT_2))
+            print(f"📼 Recorded {len(rpc.logs)} logs to {args.record}")
+        await rpc.aclose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Index WomanTech contract events")
+    parser.add_argument("--rpc-url", default=settings.CHAIN_RPC_URL)
+    parser.add_argument("--contract", default=settings.CONTRACT_ADDRESS)
+    parser.add_argument("--from-block", type=int, default=settings.CHAIN_START_BLOCK,
+                        help="first block when no checkpoint is stored")
+    parser.add_argument("--batch-blocks", type=int, default=settings.CHAIN_BATCH_BLOCKS)
+    parser.add_argument("--concurrency", type=int, default=settings.CHAIN_CONCURRENCY)
+    parser.add_argument("--confirmations", type=int, default=settings.CHAIN_CONFIRMATIONS)
+    parser.add_argument("--poll-interval", type=float, default=settings.CHAIN_POLL_INTERVAL)
+    parser.add_argument("--follow", action="store_true", help="keep polling for new blocks")
+    parser.add_argument("--fixture", help="replay a recorded JSON fixture instead of a node")
+    parser.add_argument("--record", help="save the logs and block hashes seen to this file")
+    args = parser.parse_args()
+    if args.fixture and args.record:
+        parser.error("--record captures calls to a live node; it cannot be combined with --fixture")
+
+    Base.metadata.create_all(bind=engine)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
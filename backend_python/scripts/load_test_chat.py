@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Chat WebSocket load test
+
+Starts the app under a single uvicorn worker on a temporary SQLite database,
+registers 2 x `--pairs` users and connects each pair over
+`/api/messages/ws`. Every sender then sends `--messages` messages to its
+partner as fast as the acks come back, and every receiver timestamps
+arrivals. Reports acked messages per second and the p50/p99 delivery
+latency (send to receipt on the partner's socket), plus the server's write
+batching counters. Requires websockets (installed with uvicorn[standard]).
+
+Usage: python scripts/load_test_chat.py [--pairs 100] [--messages 50]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import tempfile
+import time
+import urllib.request
+
+import websockets
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def post_json(url: str, data) -> dict:
+    request = urllib.request.Request(
+        url, data=json.dumps(data).encode(), method="POST", headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+def get_json(url: str) -> dict:
+    with urllib.request.urlopen(url) as response:
+        return json.loads(response.read())
+
+def percentile(values, share: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+async def sender(socket_, receiver_id: int, count: int):
+    for i in range(count):
+        await socket_.send(json.dumps({
+            "type": "send", "to": receiver_id, "client_id": str(i), "content": f"{time.perf_counter()!r}",
+        }))
+        while True:
+            frame = json.loads(await socket_.recv())
+            if frame["type"] == "ack":
+                break
+            if frame["type"] == "error":
+                raise RuntimeError(frame)
+
+async def receiver(socket_, count: int, latencies: list):
+    for _ in range(count):
+        frame = json.loads(await socket_.recv())
+        if frame["type"] == "message":
+            latencies.append(time.perf_counter() - float(frame["message"]["content"]))
+
+async def run(args, port: int, user_ids):
+    url = f"ws://127.0.0.1:{port}/api/messages/ws?user_id="
+    senders = await asyncio.gather(*(websockets.connect(url + str(user_id)) for user_id in user_ids[0::2]))
+    receivers = await asyncio.gather(*(websockets.connect(url + str(user_id)) for user_id in user_ids[1::2]))
+    print(f"Connected {len(senders) + len(receivers)} sockets")
+
+    latencies = []
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(sender(socket_, receiver_id, args.messages) for socket_, receiver_id in zip(senders, user_ids[1::2])),
+        *(receiver(socket_, args.messages, latencies) for socket_ in receivers),
+    )
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    total = len(senders) * args.messages
+    print(f"Sent {total} messages in {elapsed:.2f}s: {total / elapsed:.0f} messages/sec")
+    print(f"Delivery latency: p50 {percentile(latencies, 0.5) * 1000:.1f} ms, "
+          f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms")
+    stats = await asyncio.to_thread(get_json, f"http://127.0.0.1:{port}/api/messages/ws/stats")
+    writer = stats["writer"]
+    print(f"Writer: {writer['written']} messages in {writer['batches']} transactions "
+          f"({writer['written'] / max(writer['batches'], 1):.1f} per batch); broker: {stats['broker']}")
+    for socket_ in senders + receivers:
+        await socket_.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the chat WebSocket")
+    parser.add_argument("--pairs", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=50, help="messages per sender")
+    args = parser.parse_args()
+
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tempfile.mkdtemp()}/load_test_chat.db", DEBUG="False")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                get_json(f"http://127.0.0.1:{port}/health")
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.2)
+
+        users = [
+            {"wallet_address": f"0x{i:040x}", "name": f"Chat {i}", "role": "MENTEE" if i % 2 else "MENTOR"}
+            for i in range(2 * args.pairs)
+        ]
+        result = post_json(f"http://127.0.0.1:{port}/api/users/register/bulk", users)
+        asyncio.run(run(args, port, [row["id"] for row in result["results"]]))
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Delete unused invites that have expired, in batches.
+Safe to run from cron; each batch is its own short transaction.
+
+Usage: python scripts/purge_expired_invites.py [--grace-days 0] [--batch-size 1000]
+"""
+
+import argparse
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime, timedelta
+
+from app.core.database import SessionLocal, engine, Base
+from app.core.schema import upgrade_schema
+from app.models import user, user_skill, session, payment, notification, message, invite
+from app.services.invites import purge_expired_invites
+
+def main():
+    parser = argparse.ArgumentParser(description="Purge expired, unused invites")
+    parser.add_argument("--grace-days", type=int, default=0, help="keep invites expired less than this many days")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)  # invites.used_by_id and the (is_used, expires_at) index
+    db = SessionLocal()
+    try:
+        before = datetime.utcnow() - timedelta(days=args.grace_days)
+        count = purge_expired_invites(db, before, args.batch_size)
+        print(f"✅ Purged {count} expired invites")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
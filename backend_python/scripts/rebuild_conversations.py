@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Backfill message conversation keys and rebuild conversation_members.
+Run once after upgrading an existing database, or whenever the inbox drifts.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal, engine, Base
+from app.core.schema import upgrade_schema
+from app.models import user, user_skill, session, payment, notification, message, invite
+from app.services.messaging import rebuild_conversations
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    # Databases older than conversation keys lack messages.conversation_key and its index
+    for change in upgrade_schema(engine):
+        print(f"🔧 {change}")
+    db = SessionLocal()
+    try:
+        count = rebuild_conversations(db)
+        print(f"✅ Rebuilt {count} inbox entries")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Rebuild notification_counters from the notification rows.
+Run once after upgrading an existing database, or whenever the counters drift.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal, engine, Base
+from app.models import user, user_skill, session, payment, notification, message, invite
+from app.services.notifications import rebuild_unread_counters
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        count = rebuild_unread_counters(db)
+        print(f"✅ Rebuilt unread counters for {count} users")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Rebuild the normalized user_skills index from the users.skills JSON column.
+Run once after upgrading an existing database, or whenever the index drifts.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal, engine, Base
+from app.models import user, user_skill, session, payment, notification, message, invite
+from app.services.skills import rebuild_skill_index
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        count = rebuild_skill_index(db)
+        print(f"✅ Indexed {count} user skills")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
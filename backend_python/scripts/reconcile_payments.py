@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Reconcile the payment totals tables against the raw payment rows.
+
+By default only verifies and exits non-zero on any mismatch; pass --rebuild
+to recompute the totals tables from scratch.
+"""
+
+import argparse
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal, engine, Base
+from app.models import user, user_skill, session, payment, notification, message, invite
+from app.services.ledger import rebuild_totals, verify_totals
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rebuild", action="store_true", help="recompute the totals tables from payments")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if args.rebuild:
+            users, sessions, mentors = rebuild_totals(db)
+            print(f"✅ Rebuilt totals for {users} users, {sessions} sessions and {mentors} mentors")
+            return 0
+        mismatches = verify_totals(db)
+        for mismatch in mismatches:
+            print(f"❌ {mismatch}")
+        if mismatches:
+            print(f"{len(mismatches)} mismatched totals, run with --rebuild to fix")
+            return 1
+        print("✅ Payment totals match the payment rows")
+        return 0
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Load every on-chain WomanTech user and reconcile the users table with it.
+
+Reads the contract's user list at one block (getUsers pages fetched
+concurrently, page size shrinking if the node rejects a page), prints the
+diff against the database and applies the missing users and reputation
+updates unless --dry-run is given.
+
+Usage:
+    python scripts/snapshot_chain_users.py --rpc-url http://127.0.0.1:8545 --contract 0x... [--dry-run]
+    python scripts/snapshot_chain_users.py --fixture scripts/fixtures/womantech_events.json
+    python scripts/snapshot_chain_users.py --rpc-url ... --contract 0x... --record users.json
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine, Base
+from app.models import user, user_skill, session, payment, notification, message, invite, chain
+from app.services.chain import JsonRpcClient, RecordedRpc, RecordingRpc
+from app.services.indexer import refresh_user_indexes
+from app.services.snapshot import UserSnapshotLoader, apply_diff, diff_users
+
+FIXTURE_CONTRACT = "0x5FbDB2315678afecb367f032d93F642f64180aa3"  # first anvil deployment
+
+async def run(args):
+    if args.fixture:
+        rpc = RecordedRpc.from_file(args.fixture)
+        contract = args.contract or FIXTURE_CONTRACT
+    else:
+        if not args.rpc_url or not args.contract:
+            sys.exit("--rpc-url and --contract (or CHAIN_RPC_URL / CONTRACT_ADDRESS) are required")
+        rpc = JsonRpcClient(args.rpc_url, args.workers)
+        if args.record:
+            rpc = RecordingRpc(rpc)
+        contract = args.contract
+
+    loader = UserSnapshotLoader(rpc, contract, page_size=args.page_size, workers=args.workers)
+    try:
+        start = time.perf_counter()
+        block, chain_users = await loader.fetch(args.block)
+        print(
+            f"⛓️  {len(chain_users)} users at block {block} in {time.perf_counter() - start:.2f}s "
+            f"({loader.pages} pages, {loader.shrinks} shrinks, final page size {loader.page_size})"
+        )
+
+        async with AsyncSessionLocal() as db:
+            diff = await diff_users(db, chain_users)
+            print(
+                f"📋 {len(diff['inserts'])} missing, {len(diff['reputations'])} reputation updates, "
+                f"{diff['name_mismatches']} name / {diff['role_mismatches']} role mismatches (kept), "
+                f"{diff['db_only']} off-chain only"
+            )
+            if args.dry_run:
+                return
+            changed = await apply_diff(db, diff)
+            await db.commit()
+            await refresh_user_indexes(db, changed)
+            print(f"✅ Applied {len(changed)} user changes")
+    finally:
+        if args.record:
+            with open(args.record, "wb") as f:
+                f.write(orjson.dumps(rpc.fixture(), option=orjson.OPT_INDENT_2))
+            print(f"📼 Recorded {len(rpc.calls)} calls to {args.record}")
+        await rpc.aclose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot on-chain users and reconcile the database")
+    parser.add_argument("--rpc-url", default=settings.CHAIN_RPC_URL)
+    parser.add_argument("--contract", default=settings.CONTRACT_ADDRESS)
+    parser.add_argument("--block", type=int, help="block to read at (default: latest)")
+    parser.add_argument("--page-size", type=int, default=settings.CHAIN_SNAPSHOT_PAGE_SIZE)
+    parser.add_argument("--workers", type=int, default=settings.CHAIN_CONCURRENCY)
+    parser.add_argument("--dry-run", action="store_true", help="print the diff without writing")
+    parser.add_argument("--fixture", help="replay a recorded JSON fixture instead of a node")
+    parser.add_argument("--record", help="save the calls made to this file")
+    args = parser.parse_args()
+    if args.fixture and args.record:
+        parser.error("--record captures calls to a live node; it cannot be combined with --fixture")
+
+    Base.metadata.create_all(bind=engine)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+SSE stress test: many idle notification streams on one worker
+
+Starts the app under a single uvicorn worker on a temporary SQLite database,
+registers `--connections` users and opens one `GET /api/notifications/stream`
+per user. After holding the idle streams for `--hold` seconds it broadcasts
+one notification to all of them and measures how long the fan-out takes to
+reach every client, along with the server's resident memory per connection.
+
+Usage: python scripts/stress_sse.py [--connections 2000] [--hold 10]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import tempfile
+import time
+import urllib.request
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def post_json(url: str, data) -> dict:
+    request = urllib.request.Request(
+        url, data=json.dumps(data).encode(), method="POST", headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+def get_json(url: str) -> dict:
+    with urllib.request.urlopen(url) as response:
+        return json.loads(response.read())
+
+async def open_stream(port: int, user_id: int):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=1 << 16)
+    writer.write(
+        f"GET /api/notifications/stream?user_id={user_id} HTTP/1.1\r\n"
+        f"Host: 127.0.0.1\r\nAccept: text/event-stream\r\n\r\n".encode()
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    if b" 200 " not in status_line:
+        raise RuntimeError(f"Stream for user {user_id} failed: {status_line!r}")
+    while (await reader.readline()).strip():
+        pass  # response headers
+    return reader, writer
+
+async def wait_for_event(reader) -> float:
+    """Read until the first notification event, returns the arrival time"""
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise RuntimeError("Stream closed")
+        if b"event: notification" in line:
+            return time.perf_counter()
+
+async def run(args, port: int, server: subprocess.Popen, user_ids):
+    base = f"http://127.0.0.1:{port}"
+    baseline = rss_mb(server.pid)
+    semaphore = asyncio.Semaphore(200)
+
+    async def connect(user_id):
+        async with semaphore:
+            return await open_stream(port, user_id)
+
+    started = time.perf_counter()
+    streams = await asyncio.gather(*(connect(user_id) for user_id in user_ids))
+    print(f"Opened {len(streams)} streams in {time.perf_counter() - started:.2f}s")
+    await asyncio.sleep(1)
+    stats = await asyncio.to_thread(get_json, f"{base}/api/notifications/stream/stats")
+    print(f"Broker: {stats}")
+
+    await asyncio.sleep(args.hold)
+    held = rss_mb(server.pid)
+    print(f"Server RSS: {baseline:.1f} MB before, {held:.1f} MB with {len(streams)} idle streams "
+          f"({(held - baseline) * 1024 / len(streams):.1f} KB per stream)")
+
+    waiters = [asyncio.create_task(wait_for_event(reader)) for reader, _ in streams]
+    sent = time.perf_counter()
+    result = await asyncio.to_thread(post_json, f"{base}/api/notifications/broadcast", {
+        "role": "MENTEE", "title": "Stress", "message": "fan-out test",
+    })
+    arrivals = sorted(arrival - sent for arrival in await asyncio.gather(*waiters))
+    print(f"Broadcast {result['count']} notifications; delivered to all streams in {arrivals[-1] * 1000:.0f} ms "
+          f"(p50 {arrivals[len(arrivals) // 2] * 1000:.0f} ms)")
+
+    for _, writer in streams:
+        writer.close()
+    await asyncio.sleep(1)
+    stats = await asyncio.to_thread(get_json, f"{base}/api/notifications/stream/stats")
+    print(f"Broker after disconnect: {stats}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Hold many idle SSE streams on one worker")
+    parser.add_argument("--connections", type=int, default=2000)
+    parser.add_argument("--hold", type=float, default=10, help="seconds to hold the idle streams")
+    args = parser.parse_args()
+
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tempfile.mkdtemp()}/stress_sse.db", DEBUG="False")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning",
+         "--backlog", "4096"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                get_json(f"http://127.0.0.1:{port}/health")
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.2)
+
+        user_ids = []
+        for start in range(0, args.connections, 10000):
+            users = [
+                {"wallet_address": f"0x{i:040x}", "name": f"Stress {i}", "role": "MENTEE"}
+                for i in range(start, min(start + 10000, args.connections))
+            ]
+            result = post_json(f"http://127.0.0.1:{port}/api/users/register/bulk", users)
+            user_ids.extend(row["id"] for row in result["results"])
+        asyncio.run(run(args, port, server, user_ids))
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,519 @@
+"""
+Seeded synthetic data at scale, used by `demo_data.py --scale`.
+
+Users are split into fixed-size partitions and every partition draws from its
+own RNG seeded with (seed, partition), so the generated data depends only on
+the seed and the sizes, never on the number of worker processes (timestamps
+are relative to the time of the run).
+
+Phase 1 writes each partition's users, user_skills and notifications. Phase 2
+starts once every user exists (sessions reference mentors across partitions)
+and writes the sessions of each partition's mentees with their payments and
+messages. Rows are written with COPY on PostgreSQL and one driver-level
+executemany elsewhere, one transaction per partition and table. Derived tables (unread
+counters, payment totals, conversation members) are rebuilt once at the end.
+
+Distributions:
+- 30% mentors. Reputation is gamma distributed and capped at 100.
+- Skills are drawn without replacement from a Zipf-weighted vocabulary.
+- Mentor hourly rates are roughly normal around 120.
+- Sessions per mentee are Poisson; mentors are picked in proportion to
+  reputation. Past sessions are mostly COMPLETED, future ones
+  PENDING/CONFIRMED.
+- Payments follow the session status.
+- Messages are Poisson per session. Notifications are Poisson per user,
+  mostly read once older than a week.
+"""
+import csv
+import io
+import json
+import math
+import time
+from hashlib import blake2b
+from multiprocessing import Pool
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import create_engine, event, func, select, text
+
+from app.core.config import settings
+from app.core.database import Base, SessionLocal, engine
+from app.models.message import Message, conversation_key
+from app.models.notification import Notification, NotificationType
+from app.models.payment import Payment, PaymentStatus
+from app.models.session import Session, SessionStatus
+from app.models.user import SubscriptionTier, User, UserRole
+from app.models.user_skill import UserSkill
+from app.services.ledger import rebuild_totals
+from app.services.messaging import rebuild_conversations
+from app.services.notifications import rebuild_unread_counters
+from app.services.search import install_fulltext
+from app.services.skills import skill_rows
+
+DAY = 86400
+
+# Ordered by popularity; sampled with Zipf weights
+SKILLS = [
+    "JavaScript", "Python", "React", "Node.js", "TypeScript", "SQL", "AWS", "Docker",
+    "Machine Learning", "Java", "Product Management", "UX Design", "Kubernetes", "Go",
+    "Data Engineering", "Solidity", "Web3", "System Design", "DevOps", "Azure", "C#",
+    "Deep Learning", "PostgreSQL", "Rust", "Flutter", "Swift", "Kotlin", "GraphQL",
+    "Terraform", "CI/CD", "NLP", "Statistics", "Smart Contracts", "DeFi", "Figma",
+    "User Research", "Growth Hacking", "Startup Strategy", "Apache Spark", "Kafka",
+    "Cybersecurity", "Ethereum", "PyTorch", "TensorFlow", "Django", "Vue", "Angular",
+    "Scala", "R", "Three.js",
+]
+SKILL_LOG_WEIGHTS = -1.1 * np.log(np.arange(1, len(SKILLS) + 1))
+
+FIRST_NAMES = [
+    "Amara", "Zara", "Sofia", "Aisha", "Mei", "Priya", "Fatima", "Yuki", "Grace", "Nia",
+    "Leila", "Elena", "Chloe", "Imani", "Ana", "Hana", "Lucia", "Maya", "Rachel", "Precious",
+    "Ada", "Kemi", "Ines", "Noor", "Sara", "Thandi", "Wanjiru", "Olga", "Camila", "Ife",
+]
+LAST_NAMES = [
+    "Okafor", "Ahmed", "Rodriguez", "Patel", "Chen", "Sharma", "Al-Zahra", "Tanaka", "Hopper",
+    "Mensah", "Haddad", "Petrova", "Martin", "Johnson", "Silva", "Kim", "Garcia", "Cohen",
+    "Konuto", "Malope", "Lovelace", "Adeyemi", "Moreau", "Khan", "Nilsson", "Dlamini",
+    "Kamau", "Ivanova", "Lopez", "Bello",
+]
+MENTOR_TITLES = [
+    "Senior Software Engineer", "Staff Engineer", "Engineering Manager", "Data Scientist",
+    "Product Manager", "Cloud Architect", "Blockchain Developer", "Security Engineer",
+]
+MENTEE_TITLES = [
+    "Computer Science student", "Bootcamp graduate", "Junior developer", "Career switcher",
+    "Self-taught developer", "Intern",
+]
+MESSAGES = [
+    "Hi! Looking forward to our session.", "Could we go over my project structure?",
+    "Thanks for the resources you shared!", "I pushed the changes we discussed.",
+    "Can we move our session by an hour?", "Here is the link to my repo.",
+    "That explanation really helped, thank you.", "Any book you would recommend on this?",
+]
+NOTIFICATIONS = {
+    NotificationType.SESSION_REQUEST: ("New Session Request", "You have a new session request."),
+    NotificationType.SESSION_CONFIRMED: ("Session Confirmed", "Your upcoming session has been confirmed."),
+    NotificationType.SESSION_CANCELLED: ("Session Cancelled", "A session was cancelled."),
+    NotificationType.PAYMENT_RECEIVED: ("Payment Received", "A payment for your session was received."),
+    NotificationType.REPUTATION_UPDATED: ("Reputation Updated", "You gained reputation points!"),
+    NotificationType.SYSTEM_MESSAGE: ("Welcome to WomanTech Connect!", "Start by completing your profile."),
+}
+NOTIFICATION_TYPES = list(NOTIFICATIONS)
+NOTIFICATION_WEIGHTS = [0.2, 0.2, 0.05, 0.15, 0.25, 0.15]
+TIERS = list(SubscriptionTier)
+TIER_WEIGHTS = [0.6, 0.25, 0.12, 0.03]
+DURATIONS = np.array([30, 45, 60, 90, 120])
+DURATION_WEIGHTS = [0.2, 0.15, 0.45, 0.15, 0.05]
+PAST_STATUSES = [SessionStatus.COMPLETED, SessionStatus.CANCELLED, SessionStatus.NO_SHOW]
+PAST_STATUS_WEIGHTS = [0.8, 0.12, 0.08]
+FUTURE_STATUSES = [SessionStatus.PENDING, SessionStatus.CONFIRMED]
+FUTURE_STATUS_WEIGHTS = [0.4, 0.6]
+RATING_WEIGHTS = [0.02, 0.03, 0.1, 0.3, 0.55]
+MAX_SKILLS = 8
+
+# Column order of the generated tuples
+USER_COLUMNS = (
+    "id", "wallet_address", "name", "email", "role", "reputation", "subscription_tier", "bio",
+    "skills", "experience", "hourly_rate", "is_verified", "is_active", "last_active_at", "created_at",
+)
+USER_SKILL_COLUMNS = ("user_id", "skill")
+NOTIFICATION_COLUMNS = ("user_id", "type", "title", "message", "data", "is_read", "created_at")
+SESSION_COLUMNS = (
+    "id", "session_id", "mentor_address", "mentee_address", "price", "status", "scheduled_at",
+    "completed_at", "duration", "end_at", "rating", "review",
+)
+PAYMENT_COLUMNS = (
+    "session_id", "user_id", "amount", "currency", "status", "stripe_payment_intent_id",
+    "refunded", "refunded_at", "created_at",
+)
+MESSAGE_COLUMNS = ("sender_id", "receiver_id", "conversation_key", "content", "is_read", "created_at")
+
+# Set by the pool initializer in every worker process
+_plan: Dict[str, Any] = {}
+_mentors: Dict[str, np.ndarray] = {}
+_engine = None
+
+
+def wallet_for(seed: int, user_id: int) -> str:
+    """Deterministic wallet address of a synthetic user"""
+    return "0x" + blake2b(f"{seed}:{user_id}".encode(), digest_size=20).hexdigest()
+
+
+def _timestamps(seconds: np.ndarray) -> List[str]:
+    """UTC epoch seconds as 'YYYY-MM-DD HH:MM:SS.ffffff', the form SQLite rows use and COPY accepts"""
+    if not len(seconds):
+        return []
+    stamps = np.datetime_as_string((seconds * 1e6).astype("datetime64[us]"), unit="us")
+    return np.char.replace(stamps, "T", " ").tolist()
+
+
+def copy_rows(conn, table, columns: Sequence[str], rows: List[tuple]) -> None:
+    """Stream rows into a PostgreSQL table with COPY (psycopg2 or psycopg 3)"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    sql = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+        else:
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+
+def write_rows(conn, table, columns: Sequence[str], rows: List[tuple]) -> None:
+    """Bulk-write driver-ready tuples: COPY on PostgreSQL, one executemany elsewhere
+
+    Values are generated in storage form (enum names, 0/1 booleans, JSON text,
+    timestamp strings), so no per-row parameter processing is needed.
+    """
+    if not rows:
+        return
+    if conn.dialect.name == "postgresql":
+        copy_rows(conn, table, columns, rows)
+        return
+    placeholder = "?" if conn.dialect.paramstyle == "qmark" else "%s"
+    conn.exec_driver_sql(
+        f"INSERT INTO {table.name} ({', '.join(columns)}) "
+        f"VALUES ({', '.join([placeholder] * len(columns))})",
+        rows,
+    )
+
+
+def _make_engine():
+    """Engine owned by one worker process"""
+    if settings.DATABASE_URL.startswith("sqlite"):
+        worker_engine = create_engine(settings.DATABASE_URL, connect_args={"timeout": 600})
+
+        @event.listens_for(worker_engine, "connect")
+        def _fast_writes(dbapi_connection, _):
+            # Generated data can be regenerated; skip fsync while loading
+            dbapi_connection.execute("PRAGMA synchronous = OFF")
+
+        return worker_engine
+    return create_engine(settings.DATABASE_URL)
+
+
+def _init_worker(plan: Dict[str, Any], mentors: Optional[Dict[str, np.ndarray]] = None) -> None:
+    global _engine
+    _plan.clear()
+    _plan.update(plan)
+    _mentors.clear()
+    _mentors.update(mentors or {})
+    _engine = _make_engine()
+
+
+def _rng(partition: int, phase: int) -> np.random.Generator:
+    return np.random.default_rng([_plan["seed"], phase, partition])
+
+
+def generate_users(partition: int) -> Tuple[Dict[str, List[tuple]], Dict[str, np.ndarray]]:
+    """Rows of one user partition, plus what phase 2 needs about them"""
+    plan = _plan
+    rng = _rng(partition, 1)
+    first = partition * plan["partition_size"]
+    count = min(plan["partition_size"], plan["users"] - first)
+    ids = plan["user_base"] + first + np.arange(1, count + 1)
+    now = plan["now"]
+
+    is_mentor = rng.random(count) < 0.3
+    reputation = np.where(
+        is_mentor, rng.gamma(2.0, 18.0, count), rng.gamma(1.2, 8.0, count)
+    ).clip(0, 100).astype(int)
+    rate = np.round(rng.normal(120, 45, count).clip(25, 400) / 5) * 5
+    years = np.where(is_mentor, rng.integers(3, 16, count), rng.integers(0, 4, count))
+    tiers = rng.choice(len(TIERS), count, p=TIER_WEIGHTS)
+    verified = rng.random(count) < np.where(is_mentor, 0.6, 0.2)
+    active = rng.random(count) < 0.96
+    created = now - rng.random(count) * 730 * DAY
+    last_active = created + rng.random(count) * (now - created)
+    first_names = rng.integers(0, len(FIRST_NAMES), count)
+    last_names = rng.integers(0, len(LAST_NAMES), count)
+    titles = rng.integers(0, len(MENTOR_TITLES), count)
+
+    # Weighted sampling without replacement (Gumbel top-k)
+    keys = SKILL_LOG_WEIGHTS + rng.gumbel(size=(count, len(SKILLS)))
+    picks = np.argsort(-keys, axis=1)[:, :MAX_SKILLS].tolist()
+    skill_counts = np.where(
+        is_mentor, rng.integers(3, MAX_SKILLS + 1, count), rng.integers(2, 6, count)
+    ).tolist()
+
+    created_at = _timestamps(created)
+    last_active_at = _timestamps(last_active)
+    users, user_skills = [], []
+    for i, (user_id, mentor) in enumerate(zip(ids.tolist(), is_mentor.tolist())):
+        skills = [SKILLS[j] for j in picks[i][:skill_counts[i]]]
+        first_name, last_name = FIRST_NAMES[first_names[i]], LAST_NAMES[last_names[i]]
+        title = MENTOR_TITLES[titles[i]] if mentor else MENTEE_TITLES[titles[i] % len(MENTEE_TITLES)]
+        users.append((
+            user_id,
+            wallet_for(plan["seed"], user_id),
+            f"{first_name} {last_name}",
+            f"{first_name}.{last_name}.{user_id}@example.com".lower(),
+            UserRole.MENTOR.value if mentor else UserRole.MENTEE.value,
+            int(reputation[i]),
+            TIERS[tiers[i]].value,
+            f"{title} focused on {skills[0]} and {skills[1]}.",
+            json.dumps(skills),
+            f"{years[i]}+ years in {skills[0]}" if mentor else f"{years[i]} years of coding",
+            float(rate[i]) if mentor else None,
+            int(verified[i]),
+            int(active[i]),
+            last_active_at[i],
+            created_at[i],
+        ))
+        user_skills.extend((row["user_id"], row["skill"]) for row in skill_rows(user_id, skills))
+
+    # Notifications, mostly read once older than a week
+    per_user = rng.poisson(plan["notifications_per_user"], count)
+    owner = np.repeat(np.arange(count), per_user)
+    types = rng.choice(len(NOTIFICATION_TYPES), len(owner), p=NOTIFICATION_WEIGHTS).tolist()
+    sent = created[owner] + rng.random(len(owner)) * (now - created[owner])
+    read = (rng.random(len(owner)) < np.where(sent < now - 7 * DAY, 0.9, 0.4)).astype(int).tolist()
+    points = rng.integers(1, 11, len(owner)).tolist()
+    owner_ids = ids[owner].tolist()
+    sent_at = _timestamps(sent)
+    notifications = []
+    for i, user_id in enumerate(owner_ids):
+        kind = NOTIFICATION_TYPES[types[i]]
+        title, message = NOTIFICATIONS[kind]
+        data = json.dumps({"points": points[i]}) if kind == NotificationType.REPUTATION_UPDATED else None
+        notifications.append((user_id, kind.value, title, message, data, read[i], sent_at[i]))
+
+    active_mentors = is_mentor & active
+    summary = {
+        "mentor_ids": ids[active_mentors],
+        "mentor_reputation": reputation[active_mentors],
+        "mentor_rate": rate[active_mentors],
+        "mentee_ids": ids[~is_mentor],
+        "mentee_created": created[~is_mentor],
+    }
+    return {"users": users, "user_skills": user_skills, "notifications": notifications}, summary
+
+
+def generate_sessions(
+    partition: int, mentee_ids: np.ndarray, mentee_created: np.ndarray
+) -> Dict[str, List[tuple]]:
+    """Sessions of one partition's mentees with their payments and messages"""
+    plan = _plan
+    rng = _rng(partition, 2)
+    now = plan["now"]
+    seed = plan["seed"]
+
+    per_mentee = rng.poisson(plan["sessions_per_mentee"], len(mentee_ids))
+    mentee_index = np.repeat(np.arange(len(mentee_ids)), per_mentee)
+    count = len(mentee_index)
+    if count > plan["session_block"]:
+        raise RuntimeError(f"Partition {partition} needs {count} session ids, block is {plan['session_block']}")
+    session_ids = plan["session_base"] + partition * plan["session_block"] + np.arange(1, count + 1)
+
+    weights = _mentors["reputation"] + 5.0
+    mentor_index = rng.choice(len(weights), count, p=weights / weights.sum())
+    mentor_ids = _mentors["ids"][mentor_index].tolist()
+    session_mentees = mentee_ids[mentee_index].tolist()
+    start = mentee_created[mentee_index]
+    scheduled = start + rng.random(count) * (now + 30 * DAY - start)
+    scheduled = scheduled - scheduled % 900  # quarter-hour slots
+    duration = rng.choice(DURATIONS, count, p=DURATION_WEIGHTS)
+    end = scheduled + duration * 60
+    past = (end < now).tolist()
+    past_status = rng.choice(len(PAST_STATUSES), count, p=PAST_STATUS_WEIGHTS).tolist()
+    future_status = rng.choice(len(FUTURE_STATUSES), count, p=FUTURE_STATUS_WEIGHTS).tolist()
+    rated = (rng.random(count) < 0.7).tolist()
+    ratings = (rng.choice(5, count, p=RATING_WEIGHTS) + 1).tolist()
+    payment_roll = rng.random(count).tolist()
+    message_counts = rng.poisson(plan["messages_per_session"], count)
+    prices = np.round(_mentors["rate"][mentor_index] * duration / 60, 2).tolist()
+    duration = duration.tolist()
+
+    scheduled_at = _timestamps(scheduled)
+    end_at = _timestamps(end)
+    sessions, payments = [], []
+    cancelled = np.zeros(count, dtype=bool)
+    for i, session_id in enumerate(session_ids.tolist()):
+        status = PAST_STATUSES[past_status[i]] if past[i] else FUTURE_STATUSES[future_status[i]]
+        completed = status == SessionStatus.COMPLETED
+        rating = ratings[i] if completed and rated[i] else None
+        sessions.append((
+            session_id,
+            f"SYN_{session_id}",
+            wallet_for(seed, mentor_ids[i]),
+            wallet_for(seed, session_mentees[i]),
+            prices[i],
+            status.value,
+            scheduled_at[i],
+            end_at[i] if completed else None,
+            duration[i],
+            end_at[i],
+            rating,
+            "Great session, very helpful!" if rating and rating >= 4 else None,
+        ))
+
+        roll = payment_roll[i]
+        if completed:
+            payment_status = (
+                PaymentStatus.COMPLETED if roll < 0.95
+                else PaymentStatus.REFUNDED if roll < 0.98 else PaymentStatus.FAILED
+            )
+        elif status == SessionStatus.CONFIRMED:
+            payment_status = PaymentStatus.PENDING if roll < 0.7 else PaymentStatus.PROCESSING
+        elif status == SessionStatus.CANCELLED:
+            cancelled[i] = True
+            if roll >= 0.5:
+                continue
+            payment_status = PaymentStatus.REFUNDED
+        else:
+            continue
+        refunded = payment_status == PaymentStatus.REFUNDED
+        payments.append((
+            session_id, session_mentees[i], prices[i], "USD", payment_status.value,
+            f"pi_syn_{session_id}", int(refunded), end_at[i] if refunded else None, scheduled_at[i],
+        ))
+
+    # Messages for sessions that were not cancelled, in time order within each thread
+    message_counts[cancelled] = 0
+    thread = np.repeat(np.arange(count), message_counts)
+    position = np.arange(len(thread)) - np.repeat(np.cumsum(message_counts) - message_counts, message_counts)
+    sent = scheduled[thread] - 3 * DAY + position * 1200 + rng.random(len(thread)) * 600
+    read = (rng.random(len(thread)) < np.where(sent < now - DAY, 0.95, 0.5)).astype(int).tolist()
+    snippets = rng.integers(0, len(MESSAGES), len(thread)).tolist()
+    from_mentee = (position % 2 == 0).tolist()
+    sent_at = _timestamps(sent)
+    messages = []
+    for i, session_index in enumerate(thread.tolist()):
+        mentor_id, mentee_id = mentor_ids[session_index], session_mentees[session_index]
+        sender, receiver = (mentee_id, mentor_id) if from_mentee[i] else (mentor_id, mentee_id)
+        messages.append((
+            sender, receiver, conversation_key(sender, receiver), MESSAGES[snippets[i]], read[i], sent_at[i],
+        ))
+    return {"sessions": sessions, "payments": payments, "messages": messages}
+
+
+def _write(tables: List[Tuple[Any, Sequence[str], List[tuple]]]) -> Dict[str, int]:
+    counts = {}
+    for table, columns, rows in tables:
+        with _engine.begin() as conn:
+            write_rows(conn, table, columns, rows)
+        counts[table.name] = len(rows)
+    return counts
+
+
+def _users_task(partition: int):
+    rows, summary = generate_users(partition)
+    counts = _write([
+        (User.__table__, USER_COLUMNS, rows["users"]),
+        (UserSkill.__table__, USER_SKILL_COLUMNS, rows["user_skills"]),
+        (Notification.__table__, NOTIFICATION_COLUMNS, rows["notifications"]),
+    ])
+    return partition, counts, summary
+
+
+def _sessions_task(args):
+    partition, mentee_ids, mentee_created = args
+    rows = generate_sessions(partition, mentee_ids, mentee_created)
+    counts = _write([
+        (Session.__table__, SESSION_COLUMNS, rows["sessions"]),
+        (Payment.__table__, PAYMENT_COLUMNS, rows["payments"]),
+        (Message.__table__, MESSAGE_COLUMNS, rows["messages"]),
+    ])
+    return partition, counts
+
+
+def _run(task, items, workers: int, initargs: tuple):
+    """Map a task over partitions, in-process for a single worker"""
+    if workers <= 1:
+        _init_worker(*initargs)
+        for item in items:
+            yield task(item)
+        return
+    with Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+        yield from pool.imap_unordered(task, items)
+
+
+def _report(label: str, totals: Dict[str, int], started: float) -> None:
+    elapsed = time.perf_counter() - started
+    rows = sum(totals.values())
+    detail = ", ".join(f"{count:,} {name}" for name, count in totals.items())
+    print(f"   {label}: {detail} in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
+
+def seed_scale(
+    users: int,
+    seed: int = 42,
+    workers: int = 1,
+    partition_size: int = 50000,
+    sessions_per_mentee: float = 3.0,
+    messages_per_session: float = 4.0,
+    notifications_per_user: float = 5.0,
+) -> Dict[str, int]:
+    """Generate `users` synthetic users and their activity, returns row counts"""
+    Base.metadata.create_all(bind=engine)
+    install_fulltext(engine)
+    with engine.connect() as conn:
+        user_base = conn.scalar(select(func.max(User.id))) or 0
+        session_base = conn.scalar(select(func.max(Session.id))) or 0
+
+    partitions = math.ceil(users / partition_size)
+    plan = {
+        "seed": seed,
+        "users": users,
+        "partition_size": partition_size,
+        "user_base": user_base,
+        "session_base": session_base,
+        # Room for every partition's sessions: far above the Poisson mean
+        "session_block": int(partition_size * max(8, sessions_per_mentee * 4)),
+        "now": time.time(),
+        "sessions_per_mentee": sessions_per_mentee,
+        "messages_per_session": messages_per_session,
+        "notifications_per_user": notifications_per_user,
+    }
+    totals: Dict[str, int] = {}
+    started = time.perf_counter()
+
+    phase_totals: Dict[str, int] = {}
+    summaries = {}
+    for partition, counts, summary in _run(_users_task, range(partitions), workers, (plan,)):
+        summaries[partition] = summary
+        for name, count in counts.items():
+            phase_totals[name] = phase_totals.get(name, 0) + count
+    _report("users", phase_totals, started)
+    totals.update(phase_totals)
+
+    ordered = [summaries[partition] for partition in range(partitions)]
+    mentors = {
+        "ids": np.concatenate([s["mentor_ids"] for s in ordered]),
+        "reputation": np.concatenate([s["mentor_reputation"] for s in ordered]),
+        "rate": np.concatenate([s["mentor_rate"] for s in ordered]),
+    }
+    if len(mentors["ids"]) and sessions_per_mentee > 0:
+        phase_started = time.perf_counter()
+        phase_totals = {}
+        items = [(partition, s["mentee_ids"], s["mentee_created"]) for partition, s in enumerate(ordered)]
+        for partition, counts in _run(_sessions_task, items, workers, (plan, mentors)):
+            for name, count in counts.items():
+                phase_totals[name] = phase_totals.get(name, 0) + count
+        _report("activity", phase_totals, phase_started)
+        totals.update(phase_totals)
+
+    phase_started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        rebuild_unread_counters(db)
+        rebuild_totals(db)
+        rebuild_conversations(db)
+        if engine.dialect.name == "postgresql":
+            # Explicit ids bypassed the sequences
+            for table in ("users", "sessions"):
+                db.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+                ))
+            db.commit()
+    finally:
+        db.close()
+    print(f"   derived tables rebuilt in {time.perf_counter() - phase_started:.1f}s")
+    print(f"   total {time.perf_counter() - started:.1f}s")
+    return totals